@@ -0,0 +1,46 @@
+"""Memória por jogador do game.Jogador (estatísticas, preferências e históricos).
+
+Uso: python -m benchmarks.bench_memoria_jogadores [--jogadores N] [--partidas P]
+"""
+import argparse
+import random
+import tracemalloc
+
+from game import Jogador, Plataforma, Regiao
+
+
+def medir(quantidade: int, partidas: int) -> float:
+    """Bytes alocados por jogador para criar `quantidade` jogadores com `partidas` partidas cada"""
+    plataformas = list(Plataforma)
+    regioes = list(Regiao)
+    rng = random.Random(42)
+    
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    jogadores = []
+    for i in range(quantidade):
+        jogador = Jogador(f'Jogador_{i}', rng.choice(plataformas), rng.choice(regioes))
+        for _ in range(partidas):
+            jogador.adicionar_partida(rng.random() < 0.5, rng.randint(0, 20), rng.randint(0, 10),
+                                      rng.randint(0, 15), rng.randint(10, 30), rng.uniform(20, 100),
+                                      prever_mmr=False)
+            jogador.estatisticas.atualizar_mmr(rng.random() < 0.5, rng.uniform(800, 2000))
+        jogadores.append(jogador)
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (depois - antes) / quantidade
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jogadores', type=int, default=100000)
+    parser.add_argument('--partidas', type=int, default=0)
+    args = parser.parse_args()
+    
+    por_jogador = medir(args.jogadores, args.partidas)
+    print(f"{args.jogadores} jogadores, {args.partidas} partidas cada")
+    print(f"  Memória por jogador: {por_jogador:.0f} bytes")
+    print(f"  Projeção para 1M jogadores: {por_jogador * 1_000_000 / 2**20:.0f} MiB")
+
+if __name__ == "__main__":
+    main()
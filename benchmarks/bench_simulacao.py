@@ -0,0 +1,64 @@
+"""Simulação de partidas: laço com game.Partida x simulacao.MotorSimulacao.
+
+Uso: python -m benchmarks.bench_simulacao [--partidas N]
+"""
+import argparse
+import time
+import numpy as np
+
+from game import Partida
+from simulacao import MotorSimulacao, calcular_novo_elo_lote
+
+
+def calcular_novo_elo(elo_vencedor: int, elo_perdedor: int):
+    """Cópia de server.calcular_novo_elo (importar o servidor abriria o banco e aplicaria o monkey patch)"""
+    K = 32
+    esperado_vencedor = 1 / (1 + 10 ** ((elo_perdedor - elo_vencedor) / 400))
+    esperado_perdedor = 1 - esperado_vencedor
+    return int(elo_vencedor + K * (1 - esperado_vencedor)), int(elo_perdedor + K * (0 - esperado_perdedor))
+
+
+def simular_escalar(elos_j1, elos_j2):
+    """Uma partida por vez, como server.finalizar_partida"""
+    novos = []
+    for elo_j1, elo_j2 in zip(elos_j1, elos_j2):
+        resultado = Partida('j1', 'j2').simular_partida()
+        if resultado['kills_j1'] > resultado['kills_j2']:
+            novos.append(calcular_novo_elo(elo_j1, elo_j2))
+        else:
+            novos.append(calcular_novo_elo(elo_j2, elo_j1)[::-1])
+    return novos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--partidas', type=int, default=200000)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(42)
+    elos_j1 = rng.integers(0, 3000, args.partidas)
+    elos_j2 = rng.integers(0, 3000, args.partidas)
+    
+    # O Elo vetorizado precisa bater exatamente com a versão escalar
+    novo_vencedor, novo_perdedor = calcular_novo_elo_lote(elos_j1, elos_j2)
+    esperado = np.array([calcular_novo_elo(int(a), int(b)) for a, b in zip(elos_j1, elos_j2)])
+    assert np.array_equal(novo_vencedor, esperado[:, 0]) and np.array_equal(novo_perdedor, esperado[:, 1]), \
+        "Elo vetorizado difere da versão escalar"
+    
+    lista_j1, lista_j2 = elos_j1.tolist(), elos_j2.tolist()
+    inicio = time.perf_counter()
+    simular_escalar(lista_j1, lista_j2)
+    tempo_escalar = time.perf_counter() - inicio
+    
+    motor = MotorSimulacao(seed=42)
+    inicio = time.perf_counter()
+    motor.simular(elos_j1, elos_j2)
+    tempo_vetorizado = time.perf_counter() - inicio
+    
+    print(f"{args.partidas} partidas")
+    print(f"  Escalar (Partida):           {tempo_escalar:8.3f} s")
+    print(f"  Vetorizado (MotorSimulacao): {tempo_vetorizado:8.3f} s ({tempo_escalar / tempo_vetorizado:.0f}x)")
+    print("\nElo vetorizado idêntico ao da versão escalar.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Tempo de carga do estado: JSON (salvar_estado) x snapshot binário (salvar_snapshot).
+
+Uso: python -m benchmarks.bench_snapshot [--jogadores N] [--historico H] [--compressao NIVEL]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from game import Comportamento, EstiloJogo, Jogador, Plataforma, Regiao, SistemaMatchmaking
+
+
+def gerar_sistema(quantidade: int, historico: int, seed: int = 42) -> SistemaMatchmaking:
+    """Cria um SistemaMatchmaking com jogadores sintéticos (sem simular partidas)"""
+    rng = random.Random(seed)
+    plataformas = list(Plataforma)
+    regioes = list(Regiao)
+    estilos = list(EstiloJogo)
+    comportamentos = list(Comportamento)
+    
+    sistema = SistemaMatchmaking()
+    for i in range(quantidade):
+        jogador = Jogador(f'Jogador_{i}', rng.choice(plataformas), rng.choice(regioes))
+        estatisticas = jogador.estatisticas
+        estatisticas.kills = rng.randint(0, 5000)
+        estatisticas.deaths = rng.randint(0, 5000)
+        estatisticas.vitorias = rng.randint(0, 300)
+        estatisticas.derrotas = rng.randint(0, 300)
+        estatisticas.partidas_jogadas = estatisticas.vitorias + estatisticas.derrotas
+        estatisticas.ping_medio = rng.uniform(10, 150)
+        estatisticas.estilo_jogo = rng.choice(estilos)
+        estatisticas.comportamento = rng.choice(comportamentos)
+        estatisticas.mmr = rng.gauss(1500, 300)
+        for _ in range(historico):
+            estatisticas.mmr_historico.append(rng.gauss(1500, 300))
+        sistema.jogadores[jogador.nickname] = jogador
+    return sistema
+
+
+def serializar(jogador: Jogador) -> str:
+    return json.dumps(jogador.to_dict(), sort_keys=True)
+
+
+def tamanho(caminho: str) -> int:
+    if os.path.isdir(caminho):
+        return sum(os.path.getsize(os.path.join(caminho, nome)) for nome in os.listdir(caminho))
+    return os.path.getsize(caminho)
+
+
+def cronometrar(descricao: str, funcao):
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"  {descricao:<32} {duracao:8.2f} s")
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jogadores', type=int, default=1_000_000)
+    parser.add_argument('--historico', type=int, default=10, help='valores de MMR no histórico de cada jogador')
+    parser.add_argument('--compressao', type=int, default=6, help='nível de compressão do .npz')
+    args = parser.parse_args()
+    
+    print(f"Gerando {args.jogadores} jogadores...")
+    origem = gerar_sistema(args.jogadores, args.historico)
+    pasta = tempfile.mkdtemp(prefix='bench_snapshot_')
+    formatos = {
+        'JSON': os.path.join(pasta, 'estado.json'),
+        'Snapshot (.npy, mmap)': os.path.join(pasta, 'estado_snapshot'),
+        f'Snapshot (.npz, nível {args.compressao})': os.path.join(pasta, 'estado.npz')
+    }
+    
+    try:
+        print("\nGravação")
+        cronometrar('JSON', lambda: origem.salvar_estado(formatos['JSON']))
+        cronometrar('Snapshot (.npy, mmap)', lambda: origem.salvar_snapshot(formatos['Snapshot (.npy, mmap)']))
+        nome_npz = f'Snapshot (.npz, nível {args.compressao})'
+        cronometrar(nome_npz, lambda: origem.salvar_snapshot(formatos[nome_npz], nivel_compressao=args.compressao))
+        
+        print("\nTamanho")
+        for nome, caminho in formatos.items():
+            print(f"  {nome:<32} {tamanho(caminho) / 2**20:8.1f} MiB")
+        
+        print("\nCarga (inclui recriar os objetos Jogador e o índice de vizinhos)")
+        tempos = {}
+        for nome, caminho in formatos.items():
+            destino = SistemaMatchmaking()
+            carregar = destino.carregar_estado if nome == 'JSON' else destino.carregar_snapshot
+            tempos[nome] = cronometrar(nome, lambda: carregar(caminho))
+            assert len(destino.jogadores) == args.jogadores, f"{nome}: jogadores faltando"
+            amostra = f'Jogador_{args.jogadores // 2}'
+            assert serializar(destino.jogadores[amostra]) == serializar(origem.jogadores[amostra]), \
+                f"{nome}: dados diferentes após a carga"
+            destino.fechar()
+            # Libera o sistema carregado antes do próximo: dois de 1M não cabem junto com a origem
+            del destino, carregar
+            gc.collect()
+        
+        print()
+        for nome, duracao in tempos.items():
+            if nome != 'JSON':
+                print(f"  {nome}: {tempos['JSON'] / duracao:.1f}x mais rápido que JSON")
+    finally:
+        origem.fechar()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""Suíte de benchmarks dos caminhos críticos do matchmaking, de 1k a 1M jogadores.
+
+Mede server.encontrar_match, os métodos de SistemaIA usados no pareamento e
+os métodos do Database com populações sintéticas geradas com seed, grava os
+resultados em JSON e falha (código de saída 1) quando algum benchmark fica
+mais lento que o baseline além do limite configurado.
+
+Uso: python -m benchmarks.suite [--tamanhos 1000,10000,100000,1000000] [--saida resultados.json]
+                                [--baseline baseline.json] [--limite-regressao 0.25] [--apenas NOME]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database import Database
+from fila_matchmaking import FilaMatchmaking
+from game import EstiloJogo, Plataforma, Regiao
+from ia_matchmaking import IndiceVizinhos, MatrizCaracteristicas, obter_sistema_ia
+from sklearn.base import clone
+from sklearn.preprocessing import StandardScaler
+
+PASTA_TEMPORARIA = tempfile.mkdtemp(prefix='bench_suite_')
+
+TAMANHOS_PADRAO = (1_000, 10_000, 100_000, 1_000_000)
+LIMITE_REGRESSAO_PADRAO = 0.25  # 25% mais lento que o baseline
+FRACAO_EM_FILA = 0.001  # Jogadores marcados como em fila no banco
+PARTIDAS_JOGADOR_HISTORICO = 500  # Partidas do jogador usado nas consultas de histórico
+JOGADORES_TREINO = 3000  # População usada para treinar os modelos antes das medições
+
+# Faixas de treinar_ia.criar_dados_treinamento: (mmr, kills, deaths, vitorias, partidas,
+# ping, comportamento, abandonos, reports, tamanho do histórico de MMR)
+NIVEIS = (
+    ((800, 1200), (5, 15), (8, 20), (2, 8), (10, 30), (30, 100), (3, 5), (0, 2), (0, 2), 5),
+    ((1200, 1800), (10, 20), (5, 15), (5, 12), (30, 100), (20, 80), (4, 6), (0, 1), (0, 1), 10),
+    ((1800, 2500), (15, 25), (3, 10), (8, 15), (100, 300), (10, 50), (5, 7), (0, 0), (0, 0), 15)
+)
+CAMPOS_NIVEL = ('mmr', 'kills', 'deaths', 'vitorias', 'partidas_jogadas', 'ping_medio',
+                'comportamento', 'abandonos', 'reports')
+
+
+def gerar_jogadores(quantidade: int, seed: int = 42, prefixo: str = 'Jogador') -> List[Dict]:
+    """Versão com seed e em qualquer escala de treinar_ia.criar_dados_treinamento.
+    
+    Os jogadores são divididos igualmente entre os três níveis (iniciante,
+    intermediário e avançado), com as mesmas faixas de valores, e já vêm no
+    formato de Database.buscar_jogador (com 'elo') e de Jogador.to_dict (com 'mmr').
+    """
+    rng = np.random.default_rng(seed)
+    niveis = rng.integers(0, len(NIVEIS), quantidade)
+    plataformas = [plataforma.value for plataforma in Plataforma]
+    regioes = [regiao.value for regiao in Regiao]
+    estilos = [estilo.value for estilo in EstiloJogo]
+    indices_plataforma = rng.integers(0, len(plataformas), quantidade)
+    indices_regiao = rng.integers(0, len(regioes), quantidade)
+    indices_estilo = rng.integers(0, len(estilos), quantidade)
+    
+    # Cada coluna é sorteada de uma vez, com a faixa do nível de cada jogador
+    colunas = {}
+    for posicao, campo in enumerate(CAMPOS_NIVEL):
+        minimos = np.array([nivel[posicao][0] for nivel in NIVEIS])[niveis]
+        maximos = np.array([nivel[posicao][1] for nivel in NIVEIS])[niveis]
+        colunas[campo] = rng.integers(minimos, np.maximum(maximos, minimos + 1)).tolist()
+    tamanhos_historico = np.array([nivel[-1] for nivel in NIVEIS])[niveis]
+    minimos_mmr = np.array([nivel[0][0] for nivel in NIVEIS])[niveis]
+    maximos_mmr = np.array([nivel[0][1] for nivel in NIVEIS])[niveis]
+    historicos = rng.integers(minimos_mmr[:, None], maximos_mmr[:, None],
+                              (quantidade, max(tamanhos_historico))).tolist()
+    
+    jogadores = []
+    for i in range(quantidade):
+        estatisticas = {campo: colunas[campo][i] for campo in CAMPOS_NIVEL}
+        estatisticas['elo'] = estatisticas['mmr']
+        estatisticas['derrotas'] = max(estatisticas['partidas_jogadas'] - estatisticas['vitorias'], 0)
+        estatisticas['estilo_jogo'] = estilos[indices_estilo[i]]
+        estatisticas['mmr_historico'] = historicos[i][:tamanhos_historico[i]]
+        jogadores.append({
+            'nickname': f'{prefixo}_{i}',
+            'plataforma': plataformas[indices_plataforma[i]],
+            'regiao': regioes[indices_regiao[i]],
+            'estatisticas': estatisticas,
+            'preferences': {}
+        })
+    return jogadores
+
+
+def preparar_modelos(seed: int):
+    """Publica scaler, modelo e KMeans treinados com dados sintéticos, sem gravá-los em disco.
+    
+    Assim os tempos não dependem dos arquivos .pkl presentes.
+    """
+    sistema_ia = obter_sistema_ia()
+    treino = gerar_jogadores(JOGADORES_TREINO, seed, prefixo='Treino')
+    X, y = sistema_ia.preparar_dados_treinamento(treino)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    modelo = clone(sistema_ia.modelo_performance).fit(X_scaled, y)
+    sistema_ia.publicar_modelos(scaler, modelo, True, sistema_ia.treinar_clustering(X_scaled))
+
+
+class Contexto:
+    """Dados compartilhados pelos benchmarks de um tamanho de população"""
+
+    def __init__(self, tamanho: int, seed: int, operacoes: int):
+        self.tamanho = tamanho
+        self.seed = seed
+        self.operacoes = operacoes
+        self.rng = np.random.default_rng(seed)
+        self.sistema_ia = obter_sistema_ia()
+        self.jogadores = gerar_jogadores(tamanho, seed)
+        self._db: Optional[Database] = None
+
+    def amostra(self, quantidade: int) -> List[Dict]:
+        indices = self.rng.integers(0, self.tamanho, quantidade)
+        return [self.jogadores[i] for i in indices]
+
+    @property
+    def db(self) -> Database:
+        """Banco temporário com a população inteira, criado no primeiro uso"""
+        if self._db is None:
+            caminho = os.path.join(PASTA_TEMPORARIA, f'suite_{self.tamanho}.db')
+            self._db = Database(caminho)
+            self._db.adicionar_jogadores(self.jogadores)
+            for jogador in self.amostra(max(1, int(self.tamanho * FRACAO_EM_FILA))):
+                self._db.entrar_na_fila(jogador['nickname'])
+            
+            # Histórico de um jogador fixo para as consultas paginadas
+            jogador = self.jogadores[0]['nickname']
+            for oponente in self.amostra(PARTIDAS_JOGADOR_HISTORICO):
+                self._db.registrar_resultado_partida(jogador, oponente['nickname'], jogador, 1000, 1000, {})
+            self._db.escritor_resultados.descarregar()
+        return self._db
+
+    def fechar(self):
+        if self._db is not None:
+            self._db.fechar()
+            for sufixo in ('', '-wal', '-shm'):
+                caminho = self._db.db_name + sufixo
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+            self._db = None
+
+
+# Cada benchmark recebe o contexto e devolve (executar, operacoes, preparar): `executar` é
+# cronometrado, `preparar` (opcional) roda antes de cada repetição sem ser cronometrado.
+Medicao = Tuple[Callable[[], None], int, Optional[Callable[[], None]]]
+
+
+def bench_encontrar_match(ctx: Contexto) -> Medicao:
+    # Importar o servidor aplica o monkey patch do eventlet no processo inteiro: por isso os
+    # benchmarks 'server.*' rodam num subprocesso próprio (ver medir_em_subprocesso)
+    import server
+    
+    # encontrar_match lê a fila e a matriz globais do servidor
+    matriz = MatrizCaracteristicas(capacidade=ctx.tamanho)
+    server.matriz_fila = matriz
+    server.fila = FilaMatchmaking(ao_remover=matriz.remover)
+    for jogador in ctx.jogadores:
+        server.fila.adicionar(jogador['nickname'], jogador['estatisticas']['elo'],
+                              jogador['regiao'], jogador['plataforma'])
+        matriz.adicionar(jogador)
+    nicknames = [jogador['nickname'] for jogador in ctx.amostra(ctx.operacoes)]
+
+    def executar():
+        for nickname in nicknames:
+            server.encontrar_match(nickname)
+    return executar, len(nicknames), None
+
+
+def bench_agrupar_jogadores(ctx: Contexto) -> Medicao:
+    return lambda: ctx.sistema_ia.agrupar_jogadores(ctx.jogadores), 1, None
+
+
+def bench_recomendar_teammates(ctx: Contexto) -> Medicao:
+    # Como no SistemaMatchmaking, o índice é mantido fora da consulta: só a recomendação é medida
+    indice = IndiceVizinhos(ctx.sistema_ia)
+    indice.adicionar_lote(ctx.jogadores)
+    amostra = ctx.amostra(ctx.operacoes)
+
+    def executar():
+        for jogador in amostra:
+            ctx.sistema_ia.recomendar_teammates(jogador, ctx.jogadores, indice=indice)
+    return executar, len(amostra), None
+
+
+def bench_predizer_performance(ctx: Contexto) -> Medicao:
+    amostra = ctx.amostra(ctx.operacoes)
+
+    def executar():
+        for jogador in amostra:
+            ctx.sistema_ia.predizer_performance(jogador)
+    return executar, len(amostra), None
+
+
+def bench_predizer_performance_lote(ctx: Contexto) -> Medicao:
+    return lambda: ctx.sistema_ia.predizer_performance_lote(ctx.jogadores), 1, None
+
+
+def bench_calcular_score_compatibilidade(ctx: Contexto) -> Medicao:
+    pares = list(zip(ctx.amostra(ctx.operacoes * 10), ctx.amostra(ctx.operacoes * 10)))
+
+    def executar():
+        for jogador1, jogador2 in pares:
+            ctx.sistema_ia.calcular_score_compatibilidade(jogador1, jogador2)
+    return executar, len(pares), None
+
+
+def bench_scores_compatibilidade(ctx: Contexto) -> Medicao:
+    jogador = ctx.jogadores[0]
+    return lambda: ctx.sistema_ia.scores_compatibilidade(jogador, ctx.jogadores), 1, None
+
+
+def bench_db_adicionar_jogador(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    contador = iter(range(sys.maxsize))
+    lote: List[Dict] = []
+
+    def preparar():
+        nonlocal lote
+        lote = gerar_jogadores(ctx.operacoes, ctx.seed, prefixo=f'Novo{next(contador)}')
+
+    def executar():
+        for jogador in lote:
+            db.adicionar_jogador(jogador)
+    return executar, ctx.operacoes, preparar
+
+
+def bench_db_adicionar_jogadores(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    contador = iter(range(sys.maxsize))
+    lote: List[Dict] = []
+
+    def preparar():
+        nonlocal lote
+        lote = gerar_jogadores(ctx.operacoes * 10, ctx.seed, prefixo=f'Lote{next(contador)}')
+    return lambda: db.adicionar_jogadores(lote), 1, preparar
+
+
+def bench_db_buscar_jogador_cache(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nicknames = [jogador['nickname'] for jogador in ctx.amostra(ctx.operacoes)]
+    for nickname in nicknames:
+        db.buscar_jogador(nickname)
+
+    def executar():
+        for nickname in nicknames:
+            db.buscar_jogador(nickname)
+    return executar, len(nicknames), None
+
+
+def bench_db_buscar_jogador_banco(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nicknames = [jogador['nickname'] for jogador in ctx.amostra(ctx.operacoes)]
+
+    def executar():
+        for nickname in nicknames:
+            db.buscar_jogador(nickname)
+    return executar, len(nicknames), lambda: limpar_cache(db)
+
+
+def bench_db_buscar_jogadores(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nicknames = [jogador['nickname'] for jogador in ctx.amostra(ctx.operacoes)]
+    return lambda: db.buscar_jogadores(nicknames), 1, lambda: limpar_cache(db)
+
+
+def bench_db_buscar_candidatos_por_elo(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    consultas = [(jogador['regiao'], jogador['estatisticas']['elo']) for jogador in ctx.amostra(ctx.operacoes)]
+
+    def executar():
+        for regiao, elo in consultas:
+            db.buscar_candidatos_por_elo(regiao, elo - 50, elo + 50)
+    return executar, len(consultas), None
+
+
+def bench_db_buscar_jogadores_em_fila(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    return lambda: db.buscar_jogadores_em_fila(), 1, None
+
+
+def bench_db_entrar_sair_fila(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nicknames = [jogador['nickname'] for jogador in ctx.amostra(ctx.operacoes)]
+
+    def executar():
+        for nickname in nicknames:
+            db.entrar_na_fila(nickname)
+            db.sair_da_fila(nickname)
+    return executar, len(nicknames), None
+
+
+def bench_db_atualizar_elo(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    amostra = ctx.amostra(ctx.operacoes)
+
+    def executar():
+        for jogador in amostra:
+            db.atualizar_elo(jogador['nickname'], jogador['estatisticas']['elo'])
+    return executar, len(amostra), None
+
+
+def bench_db_atualizar_jogador(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    amostra = ctx.amostra(ctx.operacoes)
+
+    def executar():
+        for jogador in amostra:
+            db.atualizar_jogador(jogador)
+    return executar, len(amostra), None
+
+
+def bench_db_registrar_partida(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    pares = list(zip(ctx.amostra(ctx.operacoes), ctx.amostra(ctx.operacoes)))
+
+    def executar():
+        for jogador1, jogador2 in pares:
+            db.registrar_partida(jogador1['nickname'], jogador2['nickname'], jogador1['nickname'], {})
+    return executar, len(pares), None
+
+
+def bench_db_registrar_resultado_partida(ctx: Contexto) -> Medicao:
+    """Inclui a gravação em lote: a medição só termina quando o escritor confirma todos os resultados"""
+    db = ctx.db
+    pares = list(zip(ctx.amostra(ctx.operacoes), ctx.amostra(ctx.operacoes)))
+
+    def executar():
+        for jogador1, jogador2 in pares:
+            db.registrar_resultado_partida(jogador1['nickname'], jogador2['nickname'], jogador1['nickname'],
+                                           jogador1['estatisticas']['elo'], jogador2['estatisticas']['elo'], {})
+        db.escritor_resultados.descarregar()
+    return executar, len(pares), None
+
+
+def bench_db_buscar_historico_primeira_pagina(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nickname = ctx.jogadores[0]['nickname']
+
+    def executar():
+        for _ in range(ctx.operacoes):
+            db.buscar_historico_paginado(nickname, 20)
+    return executar, ctx.operacoes, None
+
+
+def bench_db_buscar_historico_pagina_profunda(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    nickname = ctx.jogadores[0]['nickname']
+    pagina = db.buscar_historico_paginado(nickname, 100)
+    for _ in range(3):
+        pagina = db.buscar_historico_paginado(nickname, 100, pagina['proximo_cursor'])
+    cursor_pagina = pagina['proximo_cursor']
+
+    def executar():
+        for _ in range(ctx.operacoes):
+            db.buscar_historico_paginado(nickname, 20, cursor_pagina)
+    return executar, ctx.operacoes, None
+
+
+def bench_db_gravar_flags_jogadores(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    amostra = ctx.amostra(ctx.operacoes * 10)
+    colunas = ctx.sistema_ia.pontuar_populacao(ctx.sistema_ia.colunas_moderacao(amostra))
+    nicknames = [jogador['nickname'] for jogador in amostra]
+    return (lambda: db.gravar_flags_jogadores(nicknames, colunas['prob_smurf'], colunas['eh_smurf'],
+                                              colunas['prob_toxicidade'], colunas['eh_toxico']),
+            1, None)
+
+
+def bench_db_buscar_flags_jogador(ctx: Contexto) -> Medicao:
+    db = ctx.db
+    amostra = ctx.amostra(ctx.operacoes)
+    colunas = ctx.sistema_ia.pontuar_populacao(ctx.sistema_ia.colunas_moderacao(amostra))
+    nicknames = [jogador['nickname'] for jogador in amostra]
+    db.gravar_flags_jogadores(nicknames, colunas['prob_smurf'], colunas['eh_smurf'],
+                              colunas['prob_toxicidade'], colunas['eh_toxico'])
+
+    def executar():
+        for nickname in nicknames:
+            db.buscar_flags_jogador(nickname)
+    return executar, len(nicknames), None
+
+
+def limpar_cache(db: Database):
+    with db._lock_cache:
+        db.cache_jogadores.clear()
+
+
+BENCHMARKS: Dict[str, Callable[[Contexto], Medicao]] = {
+    'server.encontrar_match': bench_encontrar_match,
+    'ia.agrupar_jogadores': bench_agrupar_jogadores,
+    'ia.recomendar_teammates': bench_recomendar_teammates,
+    'ia.predizer_performance': bench_predizer_performance,
+    'ia.predizer_performance_lote': bench_predizer_performance_lote,
+    'ia.calcular_score_compatibilidade': bench_calcular_score_compatibilidade,
+    'ia.scores_compatibilidade': bench_scores_compatibilidade,
+    'db.adicionar_jogador': bench_db_adicionar_jogador,
+    'db.adicionar_jogadores': bench_db_adicionar_jogadores,
+    'db.buscar_jogador_cache': bench_db_buscar_jogador_cache,
+    'db.buscar_jogador_banco': bench_db_buscar_jogador_banco,
+    'db.buscar_jogadores': bench_db_buscar_jogadores,
+    'db.buscar_candidatos_por_elo': bench_db_buscar_candidatos_por_elo,
+    'db.buscar_jogadores_em_fila': bench_db_buscar_jogadores_em_fila,
+    'db.entrar_sair_fila': bench_db_entrar_sair_fila,
+    'db.atualizar_elo': bench_db_atualizar_elo,
+    'db.atualizar_jogador': bench_db_atualizar_jogador,
+    'db.registrar_partida': bench_db_registrar_partida,
+    'db.registrar_resultado_partida': bench_db_registrar_resultado_partida,
+    'db.buscar_historico_primeira_pagina': bench_db_buscar_historico_primeira_pagina,
+    'db.buscar_historico_pagina_profunda': bench_db_buscar_historico_pagina_profunda,
+    'db.gravar_flags_jogadores': bench_db_gravar_flags_jogadores,
+    'db.buscar_flags_jogador': bench_db_buscar_flags_jogador
+}
+
+
+def medir(nome: str, ctx: Contexto, repeticoes: int) -> Dict:
+    """Melhor tempo por operação entre `repeticoes` execuções do benchmark"""
+    executar, operacoes, preparar = BENCHMARKS[nome](ctx)
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        executar()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return {
+        'nome': nome,
+        'tamanho': ctx.tamanho,
+        'operacoes': operacoes,
+        'repeticoes': repeticoes,
+        'segundos_por_operacao': melhor / operacoes,
+        'operacoes_por_segundo': operacoes / melhor if melhor > 0 else float('inf')
+    }
+
+
+def medir_em_subprocesso(nome: str, tamanho: int, args: argparse.Namespace) -> Dict:
+    """Roda um benchmark 'server.*' num processo separado e devolve o resultado dele.
+    
+    O servidor aplica eventlet.monkey_patch() na importação; isolado no subprocesso,
+    o patch não altera threads, filas e sockets dos demais benchmarks.
+    """
+    saida = os.path.join(PASTA_TEMPORARIA, f'subprocesso_{tamanho}.json')
+    comando = [sys.executable, '-m', 'benchmarks.suite', '--no-processo', '--apenas', nome,
+               '--tamanhos', str(tamanho), '--operacoes', str(args.operacoes),
+               '--repeticoes', str(args.repeticoes), '--seed', str(args.seed), '--saida', saida]
+    ambiente = dict(os.environ, MATCHMAKING_DB=os.path.join(PASTA_TEMPORARIA, 'servidor.db'))
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.run(comando, cwd=raiz, env=ambiente, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Benchmark {nome} falhou no subprocesso:\n{processo.stderr}")
+    with open(saida) as f:
+        return json.load(f)['resultados'][0]
+
+
+def comparar(resultados: List[Dict], baseline: List[Dict], limite: float) -> List[str]:
+    """Benchmarks (presentes nos dois arquivos) mais lentos que o baseline além do limite"""
+    referencia = {(item['nome'], item['tamanho']): item['segundos_por_operacao'] for item in baseline}
+    regressoes = []
+    for item in resultados:
+        anterior = referencia.get((item['nome'], item['tamanho']))
+        if anterior is None or anterior <= 0:
+            continue
+        variacao = item['segundos_por_operacao'] / anterior - 1
+        if variacao > limite:
+            regressoes.append(f"{item['nome']} ({item['tamanho']} jogadores): "
+                              f"{anterior * 1000:.3f} ms -> {item['segundos_por_operacao'] * 1000:.3f} ms "
+                              f"(+{variacao:.0%})")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanhos', default=','.join(map(str, TAMANHOS_PADRAO)),
+                        help='tamanhos de população separados por vírgula')
+    parser.add_argument('--operacoes', type=int, default=200, help='chamadas por medição nos benchmarks por chamada')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--apenas', action='append', default=[],
+                        help='roda só os benchmarks cujo nome contém o texto (pode repetir)')
+    parser.add_argument('--saida', default='resultados_benchmark.json')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--limite-regressao', type=float, default=LIMITE_REGRESSAO_PADRAO,
+                        help='fração de piora tolerada em relação ao baseline (0.25 = 25%%)')
+    # Usado por medir_em_subprocesso: roda os benchmarks 'server.*' no próprio processo
+    parser.add_argument('--no-processo', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    # Os logs de INFO dos módulos (um por jogador em agrupar_jogadores) dominariam a saída
+    logging.disable(logging.INFO)
+    
+    preparar_modelos(args.seed)
+    tamanhos = [int(tamanho) for tamanho in args.tamanhos.split(',') if tamanho]
+    nomes = [nome for nome in BENCHMARKS if not args.apenas or any(filtro in nome for filtro in args.apenas)]
+    resultados = []
+    try:
+        for tamanho in tamanhos:
+            print(f"\n=== {tamanho} jogadores ===")
+            ctx = Contexto(tamanho, args.seed, args.operacoes)
+            try:
+                for nome in nomes:
+                    if nome.startswith('server.') and not args.no_processo:
+                        resultado = medir_em_subprocesso(nome, tamanho, args)
+                    else:
+                        resultado = medir(nome, ctx, args.repeticoes)
+                    resultados.append(resultado)
+                    print(f"  {nome:<40} {resultado['segundos_por_operacao'] * 1000:12.4f} ms/op "
+                          f"{resultado['operacoes_por_segundo']:14.1f} op/s")
+            finally:
+                ctx.fechar()
+                del ctx
+                gc.collect()
+    finally:
+        if 'server' in sys.modules:
+            sys.modules['server'].db.fechar()
+        shutil.rmtree(PASTA_TEMPORARIA, ignore_errors=True)
+    
+    saida = {
+        'metadados': {
+            'data': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'processador': platform.processor(),
+            'seed': args.seed,
+            'operacoes': args.operacoes,
+            'repeticoes': args.repeticoes
+        },
+        'resultados': resultados
+    }
+    with open(args.saida, 'w') as f:
+        json.dump(saida, f, indent=2)
+    print(f"\nResultados salvos em {args.saida}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['resultados']
+        regressoes = comparar(resultados, baseline, args.limite_regressao)
+        if regressoes:
+            print(f"\nRegressões acima de {args.limite_regressao:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"\nNenhuma regressão acima de {args.limite_regressao:.0%} em relação a {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -1,206 +1,967 @@
-import sqlite3
-from typing import List, Dict, Optional
-import json
-from datetime import datetime
-import logging
-
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-class Database:
-    def __init__(self, db_name: str = "matchmaking.db"):
-        self.conn = sqlite3.connect(db_name)
-        self.criar_tabelas()
-
-    def criar_tabelas(self):
-        cursor = self.conn.cursor()
-        
-        # Tabela de jogadores
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS jogadores (
-            nickname TEXT PRIMARY KEY,
-            plataforma TEXT NOT NULL,
-            regiao TEXT NOT NULL,
-            estatisticas TEXT NOT NULL,
-            preferences TEXT NOT NULL,
-            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            ultimo_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            em_fila BOOLEAN DEFAULT FALSE
-        )
-        ''')
-        
-        # Tabela de partidas
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS partidas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            jogador1 TEXT NOT NULL,
-            jogador2 TEXT NOT NULL,
-            vencedor TEXT NOT NULL,
-            dados_partida TEXT NOT NULL,
-            data_partida TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (jogador1) REFERENCES jogadores(nickname),
-            FOREIGN KEY (jogador2) REFERENCES jogadores(nickname)
-        )
-        ''')
-        
-        self.conn.commit()
-        logger.info("Tabelas criadas com sucesso")
-
-    def adicionar_jogador(self, jogador: Dict):
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute('''
-            INSERT INTO jogadores (nickname, plataforma, regiao, estatisticas, preferences)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (
-                jogador['nickname'],
-                jogador['plataforma'],
-                jogador['regiao'],
-                json.dumps(jogador['estatisticas']),
-                json.dumps(jogador['preferences'])
-            ))
-            self.conn.commit()
-            logger.info(f"Jogador {jogador['nickname']} adicionado com sucesso")
-        except sqlite3.IntegrityError:
-            logger.warning(f"Jogador {jogador['nickname']} já existe no banco")
-        except Exception as e:
-            logger.error(f"Erro ao adicionar jogador {jogador['nickname']}: {e}")
-
-    def atualizar_elo(self, nickname: str, novo_elo: int):
-        cursor = self.conn.cursor()
-        try:
-            # Busca o jogador
-            cursor.execute('SELECT estatisticas FROM jogadores WHERE nickname = ?', (nickname,))
-            row = cursor.fetchone()
-            if not row:
-                logger.error(f"Jogador {nickname} não encontrado para atualização de elo")
-                return
-                
-            # Atualiza o elo nas estatísticas
-            estatisticas = json.loads(row[0])
-            estatisticas['elo'] = novo_elo
-            
-            # Atualiza no banco
-            cursor.execute('''
-            UPDATE jogadores
-            SET estatisticas = ?
-            WHERE nickname = ?
-            ''', (json.dumps(estatisticas), nickname))
-            
-            self.conn.commit()
-            logger.info(f"Elo do jogador {nickname} atualizado para {novo_elo}")
-        except Exception as e:
-            logger.error(f"Erro ao atualizar elo do jogador {nickname}: {e}")
-
-    def atualizar_jogador(self, jogador: Dict):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        UPDATE jogadores
-        SET estatisticas = ?, preferences = ?, ultimo_login = CURRENT_TIMESTAMP
-        WHERE nickname = ?
-        ''', (
-            json.dumps(jogador['estatisticas']),
-            json.dumps(jogador['preferences']),
-            jogador['nickname']
-        ))
-        self.conn.commit()
-
-    def buscar_jogador(self, nickname: str) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute('SELECT * FROM jogadores WHERE nickname = ?', (nickname,))
-            row = cursor.fetchone()
-            
-            if row:
-                logger.info(f"Jogador {nickname} encontrado no banco")
-                return {
-                    'nickname': row[0],
-                    'plataforma': row[1],
-                    'regiao': row[2],
-                    'estatisticas': json.loads(row[3]),
-                    'preferences': json.loads(row[4]),
-                    'data_criacao': row[5],
-                    'ultimo_login': row[6],
-                    'em_fila': bool(row[7])
-                }
-            logger.warning(f"Jogador {nickname} não encontrado no banco")
-            return None
-        except Exception as e:
-            logger.error(f"Erro ao buscar jogador {nickname}: {e}")
-            return None
-
-    def buscar_jogadores_em_fila(self) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM jogadores WHERE em_fila = TRUE')
-        rows = cursor.fetchall()
-        
-        jogadores = []
-        for row in rows:
-            jogadores.append({
-                'nickname': row[0],
-                'plataforma': row[1],
-                'regiao': row[2],
-                'estatisticas': json.loads(row[3]),
-                'preferences': json.loads(row[4]),
-                'data_criacao': row[5],
-                'ultimo_login': row[6],
-                'em_fila': bool(row[7])
-            })
-        return jogadores
-
-    def entrar_na_fila(self, nickname: str):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        UPDATE jogadores
-        SET em_fila = TRUE, ultimo_login = CURRENT_TIMESTAMP
-        WHERE nickname = ?
-        ''', (nickname,))
-        self.conn.commit()
-
-    def sair_da_fila(self, nickname: str):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        UPDATE jogadores
-        SET em_fila = FALSE
-        WHERE nickname = ?
-        ''', (nickname,))
-        self.conn.commit()
-
-    def registrar_partida(self, jogador1: str, jogador2: str, vencedor: str, dados_partida: Dict):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        INSERT INTO partidas (jogador1, jogador2, vencedor, dados_partida)
-        VALUES (?, ?, ?, ?)
-        ''', (
-            jogador1,
-            jogador2,
-            vencedor,
-            json.dumps(dados_partida)
-        ))
-        self.conn.commit()
-
-    def buscar_historico_partidas(self, nickname: str, limite: int = 10) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        SELECT * FROM partidas
-        WHERE jogador1 = ? OR jogador2 = ?
-        ORDER BY data_partida DESC
-        LIMIT ?
-        ''', (nickname, nickname, limite))
-        rows = cursor.fetchall()
-        
-        partidas = []
-        for row in rows:
-            partidas.append({
-                'id': row[0],
-                'jogador1': row[1],
-                'jogador2': row[2],
-                'vencedor': row[3],
-                'dados_partida': json.loads(row[4]),
-                'data_partida': row[5]
-            })
-        return partidas
-
-    def fechar(self):
-        self.conn.close() 
\ No newline at end of file
+import sqlite3
+from typing import Callable, Iterator, List, Dict, Optional
+from collections import OrderedDict
+import json
+from datetime import datetime
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+import queue
+import time
+import logging
+from metricas import LATENCIA_BANCO, cronometrado
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Quantidade máxima de jogadores mantidos no cache em memória
+TAMANHO_CACHE_JOGADORES = 10000
+# Quantidade de parâmetros por consulta IN (...), abaixo do limite do SQLite
+TAMANHO_LOTE_CONSULTA = 500
+
+# Group commit dos resultados de partidas
+TAMANHO_LOTE_RESULTADOS = 64  # Resultados por transação
+PRAZO_LOTE_RESULTADOS = 0.05  # Segundos máximos que um resultado espera para ser gravado
+
+# Tamanho máximo de uma página do histórico de partidas
+LIMITE_PAGINA_HISTORICO = 100
+
+# Jogadores lidos por consulta nas varreduras da tabela inteira (iterar_jogadores)
+TAMANHO_LOTE_VARREDURA = 50000
+
+# Estatísticas lidas por iterar_dados_moderacao, na ordem das colunas de cada linha.
+# Campos que não são colunas tipadas saem do JSON `estatisticas` (NULL quando ausentes).
+# O início e o tamanho do histórico de MMR vêm do resumo (`mmr_inicial`/`mmr_historico_total`)
+# quando presente, como em SistemaIA.ganho_mmr, ou da própria lista `mmr_historico`.
+_RESUMO_MMR = ("json_extract(estatisticas, '$.mmr_inicial') IS NOT NULL "
+               "AND json_extract(estatisticas, '$.mmr_historico_total') IS NOT NULL")
+CAMPOS_MODERACAO = (
+    ('vitorias', 'vitorias'),
+    ('derrotas', 'derrotas'),
+    ('kills', 'kills'),
+    ('deaths', 'deaths'),
+    ('partidas_jogadas', "json_extract(estatisticas, '$.partidas_jogadas')"),
+    ('abandonos', "json_extract(estatisticas, '$.abandonos')"),
+    ('reports', "json_extract(estatisticas, '$.reports')"),
+    ('comportamento', "json_extract(estatisticas, '$.comportamento')"),
+    ('mmr', "json_extract(estatisticas, '$.mmr')"),
+    ('mmr_inicial', f"CASE WHEN {_RESUMO_MMR} THEN json_extract(estatisticas, '$.mmr_inicial') "
+                    "ELSE json_extract(estatisticas, '$.mmr_historico[0]') END"),
+    ('mmr_historico_total', f"CASE WHEN {_RESUMO_MMR} THEN json_extract(estatisticas, '$.mmr_historico_total') "
+                            "ELSE COALESCE(json_array_length(estatisticas, '$.mmr_historico'), 0) END")
+)
+
+# Quantidade máxima de conexões somente leitura abertas ao mesmo tempo
+TAMANHO_POOL_LEITURA = 8
+
+# Versão atual do schema (PRAGMA user_version)
+# 0: estatísticas apenas no JSON da coluna `estatisticas`
+# 1: estatísticas principais em colunas tipadas, `estatisticas` guarda só os campos extras
+VERSAO_SCHEMA = 1
+
+# Estatísticas armazenadas em colunas próprias: (coluna, tipo, valor padrão)
+COLUNAS_ESTATISTICAS = [
+    ('elo', 'INTEGER NOT NULL DEFAULT 1000', 1000),
+    ('kills', 'INTEGER NOT NULL DEFAULT 0', 0),
+    ('deaths', 'INTEGER NOT NULL DEFAULT 0', 0),
+    ('assists', 'INTEGER NOT NULL DEFAULT 0', 0),
+    ('vitorias', 'INTEGER NOT NULL DEFAULT 0', 0),
+    ('derrotas', 'INTEGER NOT NULL DEFAULT 0', 0),
+    ('ping_medio', 'REAL', None),
+    ('toxicidade', 'REAL', None)
+]
+NOMES_ESTATISTICAS = [coluna for coluna, _, _ in COLUNAS_ESTATISTICAS]
+
+# Colunas lidas da tabela de jogadores, na ordem esperada por _linha_para_jogador
+COLUNAS_JOGADOR = ', '.join(
+    ['nickname', 'plataforma', 'regiao', 'estatisticas', 'preferences',
+     'data_criacao', 'ultimo_login', 'em_fila'] + NOMES_ESTATISTICAS
+)
+
+class GerenciadorConexoes:
+    """Conexões SQLite compartilhadas entre a thread da fila e os handlers do servidor.
+    
+    Toda escrita passa por uma única conexão protegida por lock, já que o
+    SQLite só admite um escritor por vez. As leituras usam um pool de conexões
+    somente leitura que, com o banco em WAL, não esperam pelo escritor.
+    O tempo de espera por uma conexão é acumulado para monitoramento.
+    
+    Bancos sem arquivo (`:memory:` ou nome vazio) só existem na conexão que os
+    criou, então nesse caso as leituras também usam a conexão de escrita.
+    """
+
+    def __init__(self, db_name: str, tamanho_pool_leitura: int = TAMANHO_POOL_LEITURA):
+        self.db_name = db_name
+        self.tamanho_pool_leitura = tamanho_pool_leitura
+        self.sem_arquivo = db_name in ('', ':memory:')
+        
+        self._escrita = sqlite3.connect(db_name, check_same_thread=False)
+        # WAL permite leituras concorrentes com a escrita e reduz o custo de cada commit
+        self._escrita.execute('PRAGMA journal_mode=WAL')
+        self._escrita.execute('PRAGMA synchronous=NORMAL')
+        self._lock_escrita = threading.Lock()
+        
+        self._leitura_livres: queue.LifoQueue = queue.LifoQueue()
+        self._leitura_abertas = 0
+        self._lock_pool = threading.Lock()
+        
+        self.espera = {
+            'escrita': {'total': 0.0, 'maxima': 0.0, 'quantidade': 0},
+            'leitura': {'total': 0.0, 'maxima': 0.0, 'quantidade': 0}
+        }
+
+    def _registrar_espera(self, tipo: str, inicio: float):
+        espera = time.perf_counter() - inicio
+        estatistica = self.espera[tipo]
+        estatistica['total'] += espera
+        estatistica['quantidade'] += 1
+        if espera > estatistica['maxima']:
+            estatistica['maxima'] = espera
+
+    def _abrir_leitura(self) -> sqlite3.Connection:
+        uri = f"{Path(self.db_name).resolve().as_uri()}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def escrita(self):
+        """Conexão exclusiva de escrita"""
+        inicio = time.perf_counter()
+        with self._lock_escrita:
+            self._registrar_espera('escrita', inicio)
+            yield self._escrita
+
+    @contextmanager
+    def leitura(self):
+        """Conexão somente leitura emprestada do pool"""
+        inicio = time.perf_counter()
+        if self.sem_arquivo:
+            with self._lock_escrita:
+                self._registrar_espera('leitura', inicio)
+                yield self._escrita
+            return
+        
+        try:
+            conn = self._leitura_livres.get_nowait()
+        except queue.Empty:
+            with self._lock_pool:
+                abrir = self._leitura_abertas < self.tamanho_pool_leitura
+                if abrir:
+                    self._leitura_abertas += 1
+            conn = self._abrir_leitura() if abrir else self._leitura_livres.get()
+        self._registrar_espera('leitura', inicio)
+        
+        try:
+            yield conn
+        finally:
+            self._leitura_livres.put(conn)
+
+    def estatisticas(self) -> Dict:
+        """Tempo de espera por conexões (em segundos) e tamanho do pool"""
+        resultado = {'conexoes_leitura_abertas': self._leitura_abertas}
+        for tipo, estatistica in self.espera.items():
+            quantidade = estatistica['quantidade']
+            resultado[f'espera_{tipo}_media'] = estatistica['total'] / quantidade if quantidade else 0.0
+            resultado[f'espera_{tipo}_maxima'] = estatistica['maxima']
+            resultado[f'aquisicoes_{tipo}'] = quantidade
+        return resultado
+
+    def fechar(self):
+        while True:
+            try:
+                self._leitura_livres.get_nowait().close()
+            except queue.Empty:
+                break
+        self._escrita.close()
+
+class EscritorResultados:
+    """Grava resultados de partidas em transações agrupadas (group commit).
+    
+    Os resultados são enfileirados e uma thread própria os grava em lotes,
+    quando o lote atinge `tamanho_lote` ou quando o resultado mais antigo
+    espera `prazo` segundos. Cada lote é uma única transação, então as duas
+    atualizações de elo e a linha da partida sempre entram juntas, e o custo
+    do fsync é dividido entre todas as partidas do lote.
+    
+    `ao_gravar`, se informado, é chamado depois de cada lote com os resultados
+    efetivamente gravados e com os que falharam.
+    """
+
+    def __init__(self, conexoes: GerenciadorConexoes, tamanho_lote: int = TAMANHO_LOTE_RESULTADOS,
+                 prazo: float = PRAZO_LOTE_RESULTADOS, ao_gravar: Optional[Callable[[List[Dict], List[Dict]], None]] = None):
+        self.conexoes = conexoes
+        self.tamanho_lote = tamanho_lote
+        self.prazo = prazo
+        self.ao_gravar = ao_gravar
+        self.fila: queue.Queue = queue.Queue()
+        self.lotes_gravados = 0
+        self.resultados_gravados = 0
+        self.resultados_com_erro = 0
+        self._encerrar = threading.Event()
+        # Contadores usados por descarregar() para esperar os resultados já enfileirados
+        self._processados = threading.Condition()
+        self._total_enfileirados = 0
+        self._total_processados = 0
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, resultado: Dict):
+        """Agenda a gravação de um resultado de partida.
+        
+        Depois de `fechar()` a thread não consome mais a fila, então o
+        resultado é gravado na hora pela thread de quem chamou.
+        """
+        with self._processados:
+            self._total_enfileirados += 1
+            encerrado = self._encerrar.is_set()
+            if not encerrado:
+                self.fila.put(resultado)
+        if encerrado:
+            self._processar([resultado])
+
+    def descarregar(self):
+        """Espera até que todos os resultados enfileirados até agora tenham sido processados"""
+        with self._processados:
+            alvo = self._total_enfileirados
+            self._processados.wait_for(lambda: self._total_processados >= alvo)
+
+    def _coletar_lote(self) -> List[Dict]:
+        try:
+            lote = [self.fila.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        
+        limite = time.monotonic() + self.prazo
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self.fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _gravar_resultado(self, conn: sqlite3.Connection, resultado: Dict):
+        conn.execute('UPDATE jogadores SET elo = ? WHERE nickname = ?',
+                     (resultado['novo_elo_j1'], resultado['jogador1']))
+        conn.execute('UPDATE jogadores SET elo = ? WHERE nickname = ?',
+                     (resultado['novo_elo_j2'], resultado['jogador2']))
+        conn.execute('''
+        INSERT INTO partidas (jogador1, jogador2, vencedor, dados_partida)
+        VALUES (?, ?, ?, ?)
+        ''', (
+            resultado['jogador1'],
+            resultado['jogador2'],
+            resultado['vencedor'],
+            json.dumps(resultado['dados_partida'])
+        ))
+
+    @cronometrado(LATENCIA_BANCO, 'gravar_lote_resultados')
+    def _gravar_lote(self, conn: sqlite3.Connection, lote: List[Dict]) -> List[Dict]:
+        """Grava o lote numa transação e retorna os resultados que foram confirmados"""
+        try:
+            with conn:
+                for resultado in lote:
+                    self._gravar_resultado(conn, resultado)
+            self.lotes_gravados += 1
+            self.resultados_gravados += len(lote)
+            return lote
+        except Exception as e:
+            logger.error(f"Erro ao gravar lote de {len(lote)} resultados, gravando um a um: {e}")
+            return self._gravar_individualmente(conn, lote)
+
+    def _gravar_individualmente(self, conn: sqlite3.Connection, lote: List[Dict]) -> List[Dict]:
+        """Grava cada resultado na própria transação, para que um resultado inválido não descarte o lote inteiro"""
+        gravados = []
+        for resultado in lote:
+            try:
+                with conn:
+                    self._gravar_resultado(conn, resultado)
+                self.resultados_gravados += 1
+                gravados.append(resultado)
+            except Exception as e:
+                self.resultados_com_erro += 1
+                logger.error(f"Erro ao gravar partida {resultado.get('jogador1')} vs {resultado.get('jogador2')}: {e}")
+        return gravados
+
+    def _processar(self, lote: List[Dict]):
+        """Grava um lote e avisa `ao_gravar`, sem deixar um erro derrubar o escritor"""
+        gravados = []
+        try:
+            with self.conexoes.escrita() as conn:
+                gravados = self._gravar_lote(conn, lote)
+        except Exception as e:
+            self.resultados_com_erro += len(lote)
+            logger.error(f"Erro ao gravar lote de {len(lote)} resultados: {e}")
+        
+        try:
+            if self.ao_gravar:
+                confirmados = {id(resultado) for resultado in gravados}
+                self.ao_gravar(gravados, [r for r in lote if id(r) not in confirmados])
+        except Exception as e:
+            logger.error(f"Erro ao confirmar lote de {len(lote)} resultados: {e}")
+        finally:
+            with self._processados:
+                self._total_processados += len(lote)
+                self._processados.notify_all()
+
+    def _executar(self):
+        while not (self._encerrar.is_set() and self.fila.empty()):
+            try:
+                lote = self._coletar_lote()
+                if lote:
+                    self._processar(lote)
+            except Exception as e:
+                logger.error(f"Erro no escritor de resultados: {e}")
+
+    def estatisticas(self) -> Dict:
+        return {
+            'pendentes': self.fila.qsize(),
+            'lotes_gravados': self.lotes_gravados,
+            'resultados_gravados': self.resultados_gravados,
+            'resultados_com_erro': self.resultados_com_erro
+        }
+
+    def fechar(self):
+        """Grava os resultados pendentes e encerra a thread"""
+        with self._processados:
+            self._encerrar.set()
+        self._thread.join()
+
+class Database:
+    def __init__(self, db_name: str = "matchmaking.db", tamanho_cache: int = TAMANHO_CACHE_JOGADORES):
+        self.db_name = db_name
+        self.conexoes = GerenciadorConexoes(db_name)
+        
+        # Cache LRU de jogadores por nickname (write-through)
+        self.cache_jogadores: OrderedDict = OrderedDict()
+        self.tamanho_cache = tamanho_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock_cache = threading.Lock()
+        # Elo dos resultados enfileirados e ainda não gravados, aplicado às leituras do banco
+        self._elos_pendentes: Dict[str, int] = {}
+        # Leituras do banco em andamento por nickname; uma escrita no jogador cancela a
+        # reserva, para que a linha lida antes da escrita não substitua o valor novo no cache
+        self._reservas: Dict[str, object] = {}
+        
+        self.criar_tabelas()
+        self.escritor_resultados = EscritorResultados(self.conexoes, ao_gravar=self._confirmar_elos)
+
+    def _copiar_jogador(self, jogador: Dict) -> Dict:
+        """Copia os dicionários mutáveis para que o chamador não altere o cache"""
+        copia = dict(jogador)
+        copia['estatisticas'] = dict(jogador['estatisticas'])
+        copia['preferences'] = dict(jogador['preferences'])
+        return copia
+
+    def _cache_obter(self, nickname: str) -> Optional[Dict]:
+        with self._lock_cache:
+            jogador = self.cache_jogadores.get(nickname)
+            if jogador is None:
+                self.cache_misses += 1
+                return None
+            self.cache_jogadores.move_to_end(nickname)
+            self.cache_hits += 1
+            return self._copiar_jogador(jogador)
+
+    def _cache_reservar(self, nicknames: List[str]) -> Dict[str, object]:
+        """Marca o início de uma leitura do banco para cada nickname"""
+        with self._lock_cache:
+            reservas = {}
+            for nickname in nicknames:
+                reservas[nickname] = self._reservas[nickname] = object()
+            return reservas
+
+    def _cache_liberar(self, reservas: Dict[str, object]):
+        with self._lock_cache:
+            for nickname, reserva in reservas.items():
+                if self._reservas.get(nickname) is reserva:
+                    del self._reservas[nickname]
+
+    def _cache_guardar(self, jogador: Dict, reserva: object):
+        """Guarda um jogador lido do banco, a menos que ele tenha sido escrito durante a leitura"""
+        with self._lock_cache:
+            if self._reservas.get(jogador['nickname']) is not reserva:
+                return
+            self.cache_jogadores[jogador['nickname']] = self._copiar_jogador(jogador)
+            self.cache_jogadores.move_to_end(jogador['nickname'])
+            while len(self.cache_jogadores) > self.tamanho_cache:
+                self.cache_jogadores.popitem(last=False)
+
+    def _confirmar_elos(self, gravados: List[Dict], com_erro: List[Dict]):
+        """Descarta os elos pendentes dos resultados processados pelo escritor em lote.
+        
+        O elo de um resultado que falhou já estava no cache mas nunca chegou ao
+        banco, então a entrada do cache é descartada para que a próxima leitura
+        volte a ver o valor gravado.
+        """
+        with self._lock_cache:
+            for lote, falhou in ((gravados, False), (com_erro, True)):
+                for resultado in lote:
+                    for nickname, novo_elo in ((resultado['jogador1'], resultado['novo_elo_j1']),
+                                               (resultado['jogador2'], resultado['novo_elo_j2'])):
+                        # Um resultado mais novo do mesmo jogador pode ainda estar na fila
+                        if self._elos_pendentes.get(nickname) == novo_elo:
+                            del self._elos_pendentes[nickname]
+                        self._reservas.pop(nickname, None)
+                        if falhou:
+                            self.cache_jogadores.pop(nickname, None)
+
+    def _cache_invalidar(self, nickname: str):
+        with self._lock_cache:
+            self.cache_jogadores.pop(nickname, None)
+            self._reservas.pop(nickname, None)
+
+    def estatisticas_cache(self) -> Dict:
+        """Retorna os contadores do cache de jogadores"""
+        with self._lock_cache:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'tamanho': len(self.cache_jogadores),
+                'capacidade': self.tamanho_cache,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'taxa_acerto': self.cache_hits / total if total else 0.0
+            }
+
+    def criar_tabelas(self):
+        with self.conexoes.escrita() as conn:
+            self._criar_tabelas(conn)
+        logger.info("Tabelas criadas com sucesso")
+
+    def _criar_tabelas(self, conn: sqlite3.Connection):
+        cursor = conn.cursor()
+        
+        # Tabela de jogadores
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jogadores (
+            nickname TEXT PRIMARY KEY,
+            plataforma TEXT NOT NULL,
+            regiao TEXT NOT NULL,
+            estatisticas TEXT NOT NULL,
+            preferences TEXT NOT NULL,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultimo_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            em_fila BOOLEAN DEFAULT FALSE
+        )
+        ''')
+        
+        # Tabela de partidas
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS partidas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            jogador1 TEXT NOT NULL,
+            jogador2 TEXT NOT NULL,
+            vencedor TEXT NOT NULL,
+            dados_partida TEXT NOT NULL,
+            data_partida TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (jogador1) REFERENCES jogadores(nickname),
+            FOREIGN KEY (jogador2) REFERENCES jogadores(nickname)
+        )
+        ''')
+        
+        conn.commit()
+        
+        # Resultado da última varredura de moderação (smurf/toxicidade)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS flags_jogadores (
+            nickname TEXT PRIMARY KEY,
+            prob_smurf REAL NOT NULL,
+            eh_smurf BOOLEAN NOT NULL,
+            prob_toxicidade REAL NOT NULL,
+            eh_toxico BOOLEAN NOT NULL,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (nickname) REFERENCES jogadores(nickname)
+        )
+        ''')
+        
+        conn.commit()
+        
+        # Leva tabelas novas ou antigas para a versão atual do schema
+        self.migrar_schema(conn)
+        
+        # Índices para buscas por faixa de elo e por região
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jogadores_elo ON jogadores (elo)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jogadores_regiao_elo ON jogadores (regiao, elo)')
+        
+        # Índices do histórico: cada jogador + ordem cronológica (id desempata partidas no mesmo segundo)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_partidas_jogador1 ON partidas (jogador1, data_partida, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_partidas_jogador2 ON partidas (jogador2, data_partida, id)')
+        
+        conn.commit()
+
+    def migrar_schema(self, conn: sqlite3.Connection):
+        """Migra o banco para a versão atual do schema, no próprio arquivo"""
+        cursor = conn.cursor()
+        versao = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if versao >= VERSAO_SCHEMA:
+            return
+        
+        try:
+            cursor.execute('BEGIN')
+            
+            if versao < 1:
+                # Cria as colunas tipadas das estatísticas
+                existentes = {row[1] for row in cursor.execute('PRAGMA table_info(jogadores)')}
+                for coluna, tipo, _ in COLUNAS_ESTATISTICAS:
+                    if coluna not in existentes:
+                        cursor.execute(f'ALTER TABLE jogadores ADD COLUMN {coluna} {tipo}')
+                
+                # Move as estatísticas do JSON para as colunas
+                atualizacoes = []
+                for nickname, estatisticas in cursor.execute(
+                        'SELECT nickname, estatisticas FROM jogadores').fetchall():
+                    valores, extras = self._separar_estatisticas(json.loads(estatisticas))
+                    atualizacoes.append((*valores, json.dumps(extras), nickname))
+                
+                atribuicoes = ', '.join(f'{coluna} = ?' for coluna in NOMES_ESTATISTICAS)
+                cursor.executemany(
+                    f'UPDATE jogadores SET {atribuicoes}, estatisticas = ? WHERE nickname = ?',
+                    atualizacoes
+                )
+                logger.info(f"Estatísticas de {len(atualizacoes)} jogadores migradas para colunas")
+            
+            cursor.execute(f'PRAGMA user_version = {VERSAO_SCHEMA}')
+            conn.commit()
+            logger.info(f"Schema migrado da versão {versao} para {VERSAO_SCHEMA}")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Erro ao migrar schema: {e}")
+            raise
+
+    def _separar_estatisticas(self, estatisticas: Dict) -> tuple:
+        """Separa as estatísticas em valores das colunas tipadas e campos extras do JSON"""
+        valores = tuple(
+            estatisticas.get(coluna, padrao) for coluna, _, padrao in COLUNAS_ESTATISTICAS
+        )
+        extras = {k: v for k, v in estatisticas.items() if k not in NOMES_ESTATISTICAS}
+        return valores, extras
+
+    def _linha_para_jogador(self, row: tuple) -> Dict:
+        # Campos extras do JSON + colunas tipadas (valores nulos são omitidos)
+        estatisticas = json.loads(row[3])
+        for coluna, valor in zip(NOMES_ESTATISTICAS, row[8:]):
+            if valor is not None:
+                estatisticas[coluna] = valor
+        
+        # O banco ainda não tem o elo de uma partida enfileirada no escritor em lote
+        with self._lock_cache:
+            elo_pendente = self._elos_pendentes.get(row[0])
+        if elo_pendente is not None:
+            estatisticas['elo'] = elo_pendente
+        
+        return {
+            'nickname': row[0],
+            'plataforma': row[1],
+            'regiao': row[2],
+            'estatisticas': estatisticas,
+            'preferences': json.loads(row[4]),
+            'data_criacao': row[5],
+            'ultimo_login': row[6],
+            'em_fila': bool(row[7])
+        }
+
+    @cronometrado(LATENCIA_BANCO, 'adicionar_jogador')
+    def adicionar_jogador(self, jogador: Dict):
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            try:
+                valores, extras = self._separar_estatisticas(jogador['estatisticas'])
+                cursor.execute(f'''
+                INSERT INTO jogadores (nickname, plataforma, regiao, estatisticas, preferences, {', '.join(NOMES_ESTATISTICAS)})
+                VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(NOMES_ESTATISTICAS))})
+                ''', (
+                    jogador['nickname'],
+                    jogador['plataforma'],
+                    jogador['regiao'],
+                    json.dumps(extras),
+                    json.dumps(jogador['preferences']),
+                    *valores
+                ))
+                conn.commit()
+                self._cache_invalidar(jogador['nickname'])
+                logger.info(f"Jogador {jogador['nickname']} adicionado com sucesso")
+            except sqlite3.IntegrityError:
+                logger.warning(f"Jogador {jogador['nickname']} já existe no banco")
+            except Exception as e:
+                logger.error(f"Erro ao adicionar jogador {jogador['nickname']}: {e}")
+
+    @cronometrado(LATENCIA_BANCO, 'adicionar_jogadores')
+    def adicionar_jogadores(self, jogadores: List[Dict]) -> int:
+        """Adiciona vários jogadores numa única transação, ignorando os que já existem"""
+        def linhas():
+            for jogador in jogadores:
+                valores, extras = self._separar_estatisticas(jogador['estatisticas'])
+                yield (
+                    jogador['nickname'],
+                    jogador['plataforma'],
+                    jogador['regiao'],
+                    json.dumps(extras),
+                    json.dumps(jogador['preferences']),
+                    *valores
+                )
+        
+        try:
+            with self.conexoes.escrita() as conn:
+                with conn:
+                    cursor = conn.executemany(f'''
+                    INSERT OR IGNORE INTO jogadores (nickname, plataforma, regiao, estatisticas, preferences, {', '.join(NOMES_ESTATISTICAS)})
+                    VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(NOMES_ESTATISTICAS))})
+                    ''', linhas())
+                    adicionados = cursor.rowcount
+            for jogador in jogadores:
+                self._cache_invalidar(jogador['nickname'])
+            logger.info(f"{adicionados} jogadores adicionados em lote")
+            return adicionados
+        except Exception as e:
+            logger.error(f"Erro ao adicionar jogadores em lote: {e}")
+            return 0
+
+    def _descarregar_pendentes(self, nickname: str):
+        """Grava antes os resultados enfileirados do jogador, que sobrescreveriam uma escrita direta"""
+        with self._lock_cache:
+            pendente = nickname in self._elos_pendentes
+        if pendente:
+            self.escritor_resultados.descarregar()
+
+    @cronometrado(LATENCIA_BANCO, 'atualizar_elo')
+    def atualizar_elo(self, nickname: str, novo_elo: int):
+        self._descarregar_pendentes(nickname)
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            try:
+                # Atualiza apenas a coluna indexada de elo
+                cursor.execute('UPDATE jogadores SET elo = ? WHERE nickname = ?', (novo_elo, nickname))
+                if cursor.rowcount == 0:
+                    logger.error(f"Jogador {nickname} não encontrado para atualização de elo")
+                    return
+                
+                conn.commit()
+                
+                # Mantém o cache consistente com o banco
+                with self._lock_cache:
+                    self._elos_pendentes.pop(nickname, None)
+                    self._reservas.pop(nickname, None)
+                    if nickname in self.cache_jogadores:
+                        self.cache_jogadores[nickname]['estatisticas']['elo'] = novo_elo
+                logger.info(f"Elo do jogador {nickname} atualizado para {novo_elo}")
+            except Exception as e:
+                logger.error(f"Erro ao atualizar elo do jogador {nickname}: {e}")
+
+    @cronometrado(LATENCIA_BANCO, 'atualizar_jogador')
+    def atualizar_jogador(self, jogador: Dict):
+        self._descarregar_pendentes(jogador['nickname'])
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            valores, extras = self._separar_estatisticas(jogador['estatisticas'])
+            atribuicoes = ', '.join(f'{coluna} = ?' for coluna in NOMES_ESTATISTICAS)
+            cursor.execute(f'''
+            UPDATE jogadores
+            SET estatisticas = ?, preferences = ?, {atribuicoes}, ultimo_login = CURRENT_TIMESTAMP
+            WHERE nickname = ?
+            ''', (
+                json.dumps(extras),
+                json.dumps(jogador['preferences']),
+                *valores,
+                jogador['nickname']
+            ))
+            conn.commit()
+            with self._lock_cache:
+                self._elos_pendentes.pop(jogador['nickname'], None)
+            self._cache_invalidar(jogador['nickname'])
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_jogador')
+    def buscar_jogador(self, nickname: str) -> Optional[Dict]:
+        jogador = self._cache_obter(nickname)
+        if jogador is not None:
+            return jogador
+        
+        reservas = self._cache_reservar([nickname])
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f'SELECT {COLUNAS_JOGADOR} FROM jogadores WHERE nickname = ?', (nickname,))
+                row = cursor.fetchone()
+                
+                if row:
+                    logger.debug(f"Jogador {nickname} encontrado no banco")
+                    jogador = self._linha_para_jogador(row)
+                    self._cache_guardar(jogador, reservas[nickname])
+                    return jogador
+                logger.warning(f"Jogador {nickname} não encontrado no banco")
+                return None
+            except Exception as e:
+                logger.error(f"Erro ao buscar jogador {nickname}: {e}")
+                return None
+            finally:
+                self._cache_liberar(reservas)
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_jogadores')
+    def buscar_jogadores(self, nicknames: List[str]) -> Dict[str, Dict]:
+        """Busca vários jogadores de uma vez, consultando o banco apenas para os que não estão no cache"""
+        jogadores = {}
+        faltando = []
+        for nickname in dict.fromkeys(nicknames):
+            jogador = self._cache_obter(nickname)
+            if jogador is not None:
+                jogadores[nickname] = jogador
+            else:
+                faltando.append(nickname)
+        
+        reservas = self._cache_reservar(faltando)
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            try:
+                for inicio in range(0, len(faltando), TAMANHO_LOTE_CONSULTA):
+                    lote = faltando[inicio:inicio + TAMANHO_LOTE_CONSULTA]
+                    marcadores = ', '.join('?' * len(lote))
+                    cursor.execute(f'SELECT {COLUNAS_JOGADOR} FROM jogadores WHERE nickname IN ({marcadores})', lote)
+                    for row in cursor.fetchall():
+                        jogador = self._linha_para_jogador(row)
+                        self._cache_guardar(jogador, reservas[jogador['nickname']])
+                        jogadores[jogador['nickname']] = jogador
+            except Exception as e:
+                logger.error(f"Erro ao buscar jogadores em lote: {e}")
+            finally:
+                self._cache_liberar(reservas)
+            
+            return jogadores
+
+    def _varrer_tabela(self, colunas: str, tamanho_lote: int) -> Iterator[List[tuple]]:
+        """Linhas de todos os jogadores em lotes, por ordem de nickname (paginação por chave).
+        
+        A primeira coluna de `colunas` deve ser o nickname.
+        """
+        ultimo_nickname = None
+        while True:
+            with self.conexoes.leitura() as conn:
+                if ultimo_nickname is None:
+                    linhas = conn.execute(f'SELECT {colunas} FROM jogadores ORDER BY nickname LIMIT ?',
+                                          (tamanho_lote,)).fetchall()
+                else:
+                    linhas = conn.execute(f'''
+                    SELECT {colunas} FROM jogadores WHERE nickname > ? ORDER BY nickname LIMIT ?
+                    ''', (ultimo_nickname, tamanho_lote)).fetchall()
+            if not linhas:
+                return
+            ultimo_nickname = linhas[-1][0]
+            yield linhas
+
+    def iterar_jogadores(self, tamanho_lote: int = TAMANHO_LOTE_VARREDURA) -> Iterator[List[Dict]]:
+        """Percorre todos os jogadores em lotes, por ordem de nickname (sem passar pelo cache)"""
+        for linhas in self._varrer_tabela(COLUNAS_JOGADOR, tamanho_lote):
+            yield [self._linha_para_jogador(linha) for linha in linhas]
+
+    def iterar_dados_moderacao(self, tamanho_lote: int = TAMANHO_LOTE_VARREDURA) -> Iterator[List[tuple]]:
+        """Percorre todos os jogadores em lotes de linhas (nickname, *CAMPOS_MODERACAO).
+        
+        Os campos são extraídos do JSON pelo próprio SQLite, sem decodificar
+        o jogador inteiro; campos ausentes vêm como None.
+        """
+        colunas = ', '.join(['nickname'] + [expressao for _, expressao in CAMPOS_MODERACAO])
+        yield from self._varrer_tabela(colunas, tamanho_lote)
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_candidatos_por_elo')
+    def buscar_candidatos_por_elo(self, regiao: str, elo_min: int, elo_max: int,
+                                  limite: int = 100) -> List[Dict]:
+        """Busca jogadores da região dentro da faixa de elo usando o índice (regiao, elo)"""
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+            SELECT {COLUNAS_JOGADOR} FROM jogadores
+            WHERE regiao = ? AND elo BETWEEN ? AND ?
+            ORDER BY elo
+            LIMIT ?
+            ''', (regiao, elo_min, elo_max, limite))
+            return [self._linha_para_jogador(row) for row in cursor.fetchall()]
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_jogadores_em_fila')
+    def buscar_jogadores_em_fila(self) -> List[Dict]:
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {COLUNAS_JOGADOR} FROM jogadores WHERE em_fila = TRUE')
+            
+            # Sem reserva prévia por nickname, o resultado da varredura não entra no cache
+            return [self._linha_para_jogador(row) for row in cursor.fetchall()]
+
+    @cronometrado(LATENCIA_BANCO, 'entrar_na_fila')
+    def entrar_na_fila(self, nickname: str):
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            UPDATE jogadores
+            SET em_fila = TRUE, ultimo_login = CURRENT_TIMESTAMP
+            WHERE nickname = ?
+            ''', (nickname,))
+            conn.commit()
+            self._cache_invalidar(nickname)
+
+    @cronometrado(LATENCIA_BANCO, 'sair_da_fila')
+    def sair_da_fila(self, nickname: str):
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            UPDATE jogadores
+            SET em_fila = FALSE
+            WHERE nickname = ?
+            ''', (nickname,))
+            conn.commit()
+            with self._lock_cache:
+                self._reservas.pop(nickname, None)
+                if nickname in self.cache_jogadores:
+                    self.cache_jogadores[nickname]['em_fila'] = False
+
+    @cronometrado(LATENCIA_BANCO, 'registrar_partida')
+    def registrar_partida(self, jogador1: str, jogador2: str, vencedor: str, dados_partida: Dict):
+        with self.conexoes.escrita() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO partidas (jogador1, jogador2, vencedor, dados_partida)
+            VALUES (?, ?, ?, ?)
+            ''', (
+                jogador1,
+                jogador2,
+                vencedor,
+                json.dumps(dados_partida)
+            ))
+            conn.commit()
+
+    @cronometrado(LATENCIA_BANCO, 'registrar_resultado_partida')
+    def registrar_resultado_partida(self, jogador1: str, jogador2: str, vencedor: str,
+                                    novo_elo_j1: int, novo_elo_j2: int, dados_partida: Dict):
+        """Registra o resultado de uma partida pelo escritor em lote (elo dos dois jogadores + partida)"""
+        # Atualiza o cache imediatamente para que as próximas leituras já vejam o novo elo;
+        # jogadores fora do cache recebem o elo pendente ao serem lidos do banco até a gravação do lote
+        with self._lock_cache:
+            for nickname, novo_elo in ((jogador1, novo_elo_j1), (jogador2, novo_elo_j2)):
+                self._elos_pendentes[nickname] = novo_elo
+                self._reservas.pop(nickname, None)
+                if nickname in self.cache_jogadores:
+                    self.cache_jogadores[nickname]['estatisticas']['elo'] = novo_elo
+        
+        self.escritor_resultados.enfileirar({
+            'jogador1': jogador1,
+            'jogador2': jogador2,
+            'vencedor': vencedor,
+            'novo_elo_j1': novo_elo_j1,
+            'novo_elo_j2': novo_elo_j2,
+            'dados_partida': dados_partida
+        })
+
+    def buscar_historico_partidas(self, nickname: str, limite: int = 10) -> List[Dict]:
+        return self.buscar_historico_paginado(nickname, limite)['partidas']
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_historico_paginado')
+    def buscar_historico_paginado(self, nickname: str, limite: int = 10,
+                                  cursor_pagina: Optional[Dict] = None) -> Dict:
+        """Busca uma página do histórico, da partida mais recente para a mais antiga.
+        
+        A paginação é por chave (keyset): `cursor_pagina` é o `proximo_cursor`
+        da página anterior, com `data_partida` e `id` da última partida vista.
+        Cada lado da partida (jogador1 / jogador2) é lido pelo próprio índice a
+        partir do cursor, então qualquer página custa o mesmo que a primeira.
+        """
+        limite = max(1, min(limite, LIMITE_PAGINA_HISTORICO))
+        
+        filtro = ''
+        parametros_cursor = ()
+        if cursor_pagina:
+            filtro = 'AND (data_partida, id) < (?, ?)'
+            parametros_cursor = (cursor_pagina['data_partida'], cursor_pagina['id'])
+        
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+            SELECT * FROM (
+                SELECT * FROM partidas WHERE jogador1 = ? {filtro}
+                ORDER BY data_partida DESC, id DESC LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT * FROM partidas WHERE jogador2 = ? AND jogador1 != ? {filtro}
+                ORDER BY data_partida DESC, id DESC LIMIT ?
+            )
+            ORDER BY data_partida DESC, id DESC
+            LIMIT ?
+            ''', (
+                nickname, *parametros_cursor, limite,
+                nickname, nickname, *parametros_cursor, limite,
+                limite
+            ))
+            rows = cursor.fetchall()
+        
+        partidas = []
+        for row in rows:
+            partidas.append({
+                'id': row[0],
+                'jogador1': row[1],
+                'jogador2': row[2],
+                'vencedor': row[3],
+                'dados_partida': json.loads(row[4]),
+                'data_partida': row[5]
+            })
+        
+        proximo_cursor = None
+        if len(partidas) == limite:
+            proximo_cursor = {'data_partida': partidas[-1]['data_partida'], 'id': partidas[-1]['id']}
+        return {'partidas': partidas, 'proximo_cursor': proximo_cursor}
+
+    @cronometrado(LATENCIA_BANCO, 'gravar_flags_jogadores')
+    def gravar_flags_jogadores(self, nicknames: List[str], prob_smurf, eh_smurf,
+                               prob_toxicidade, eh_toxico) -> int:
+        """Grava (substituindo) os flags de moderação de vários jogadores numa única transação.
+        
+        Cada argumento depois de `nicknames` é uma sequência alinhada com ele,
+        como as colunas retornadas por `SistemaIA.pontuar_populacao`.
+        """
+        linhas = zip(
+            nicknames,
+            map(float, prob_smurf),
+            map(bool, eh_smurf),
+            map(float, prob_toxicidade),
+            map(bool, eh_toxico)
+        )
+        try:
+            with self.conexoes.escrita() as conn:
+                with conn:
+                    cursor = conn.executemany('''
+                    INSERT OR REPLACE INTO flags_jogadores
+                        (nickname, prob_smurf, eh_smurf, prob_toxicidade, eh_toxico, atualizado_em)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ''', linhas)
+                    gravados = cursor.rowcount
+            logger.info(f"Flags de moderação gravados para {gravados} jogadores")
+            return gravados
+        except Exception as e:
+            logger.error(f"Erro ao gravar flags de moderação: {e}")
+            return 0
+
+    @cronometrado(LATENCIA_BANCO, 'buscar_flags_jogador')
+    def buscar_flags_jogador(self, nickname: str) -> Optional[Dict]:
+        with self.conexoes.leitura() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+            SELECT prob_smurf, eh_smurf, prob_toxicidade, eh_toxico, atualizado_em
+            FROM flags_jogadores WHERE nickname = ?
+            ''', (nickname,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'nickname': nickname,
+                'prob_smurf': row[0],
+                'eh_smurf': bool(row[1]),
+                'prob_toxicidade': row[2],
+                'eh_toxico': bool(row[3]),
+                'atualizado_em': row[4]
+            }
+
+    def estatisticas_conexoes(self) -> Dict:
+        """Retorna o tempo de espera por conexões do banco"""
+        return self.conexoes.estatisticas()
+
+    def fechar(self):
+        self.escritor_resultados.fechar()
+        self.conexoes.fechar() 
\ No newline at end of file
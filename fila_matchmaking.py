@@ -0,0 +1,212 @@
+from sortedcontainers import SortedList
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+import threading
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chave de particionamento da fila: (regiao, plataforma)
+ChaveFila = Tuple[str, str]
+
+
+class EntradaFila:
+    """Dados de um jogador enquanto ele está na fila"""
+    __slots__ = ('nickname', 'elo', 'chave', 'entrada')
+
+    def __init__(self, nickname: str, elo: int, chave: ChaveFila, entrada: datetime):
+        self.nickname = nickname
+        self.elo = elo
+        self.chave = chave
+        self.entrada = entrada
+
+
+class FilaMatchmaking:
+    """Fila de matchmaking indexada por elo, separada por região e plataforma.
+
+    Cada partição mantém os jogadores ordenados por (elo, nickname), então o
+    candidato de elo mais próximo é encontrado com uma busca binária. Um
+    segundo índice ordenado por horário de entrada permite remover os
+    jogadores expirados sem percorrer a fila inteira.
+    
+    `ao_remover`, se informado, é chamado com o nickname de cada jogador que
+    sai da fila, qualquer que seja o motivo (match, saída ou timeout).
+    """
+
+    def __init__(self, ao_remover: Optional[Callable[[str], None]] = None):
+        self.ao_remover = ao_remover
+        self._particoes: Dict[ChaveFila, SortedList] = {}
+        self._entradas: Dict[str, EntradaFila] = {}
+        self._por_entrada = SortedList()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, nickname: str) -> bool:
+        return nickname in self._entradas
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entradas))
+
+    def adicionar(self, nickname: str, elo: int, regiao: str, plataforma: str,
+                  entrada: Optional[datetime] = None) -> bool:
+        """Adiciona um jogador à fila. Retorna False se ele já estiver na fila"""
+        with self._lock:
+            if nickname in self._entradas:
+                return False
+
+            chave = (regiao, plataforma)
+            registro = EntradaFila(nickname, elo, chave, entrada or datetime.now())
+            self._entradas[nickname] = registro
+            self._particoes.setdefault(chave, SortedList()).add((elo, nickname))
+            self._por_entrada.add((registro.entrada, nickname))
+            return True
+
+    def remover(self, nickname: str) -> bool:
+        """Remove um jogador da fila. Retorna False se ele não estava na fila"""
+        with self._lock:
+            registro = self._entradas.pop(nickname, None)
+            if registro is None:
+                return False
+
+            particao = self._particoes[registro.chave]
+            particao.remove((registro.elo, nickname))
+            if not particao:
+                del self._particoes[registro.chave]
+            self._por_entrada.remove((registro.entrada, nickname))
+            if self.ao_remover:
+                self.ao_remover(nickname)
+            return True
+
+    def remover_par(self, jogador1: str, jogador2: str) -> bool:
+        """Remove os dois jogadores juntos, apenas se ambos ainda estiverem na fila"""
+        with self._lock:
+            if jogador1 not in self._entradas or jogador2 not in self._entradas:
+                return False
+            self.remover(jogador1)
+            self.remover(jogador2)
+            return True
+
+    def atualizar_elo(self, nickname: str, novo_elo: int):
+        """Reposiciona o jogador na partição após uma mudança de elo"""
+        with self._lock:
+            registro = self._entradas.get(nickname)
+            if registro is None or registro.elo == novo_elo:
+                return
+
+            particao = self._particoes[registro.chave]
+            particao.remove((registro.elo, nickname))
+            registro.elo = novo_elo
+            particao.add((novo_elo, nickname))
+
+    def buscar(self, nickname: str) -> Optional[EntradaFila]:
+        return self._entradas.get(nickname)
+
+    def tempo_entrada(self, nickname: str) -> Optional[datetime]:
+        registro = self._entradas.get(nickname)
+        return registro.entrada if registro else None
+
+    def contagem_por_faixa(self, largura_faixa: int) -> Dict[Tuple[str, str], int]:
+        """Quantidade de jogadores na fila por região e faixa de elo (ex.: '1000-1199')"""
+        with self._lock:
+            contagens: Dict[Tuple[str, str], int] = {}
+            for registro in self._entradas.values():
+                inicio = int(registro.elo) // largura_faixa * largura_faixa
+                chave = (registro.chave[0], f'{inicio}-{inicio + largura_faixa - 1}')
+                contagens[chave] = contagens.get(chave, 0) + 1
+            return contagens
+
+    def candidatos_proximos(self, nickname: str, limite: int) -> List[str]:
+        """Retorna até `limite` jogadores da mesma partição, do elo mais próximo ao mais distante"""
+        with self._lock:
+            registro = self._entradas.get(nickname)
+            if registro is None:
+                return []
+
+            particao = self._particoes[registro.chave]
+            posicao = particao.index((registro.elo, nickname))
+            abaixo = posicao - 1
+            acima = posicao + 1
+
+            candidatos = []
+            while len(candidatos) < limite and (abaixo >= 0 or acima < len(particao)):
+                diff_abaixo = registro.elo - particao[abaixo][0] if abaixo >= 0 else float('inf')
+                diff_acima = particao[acima][0] - registro.elo if acima < len(particao) else float('inf')
+                if diff_abaixo <= diff_acima:
+                    candidatos.append(particao[abaixo][1])
+                    abaixo -= 1
+                else:
+                    candidatos.append(particao[acima][1])
+                    acima += 1
+            return candidatos
+
+    def mais_proximo(self, nickname: str) -> Optional[str]:
+        """Encontra o jogador da mesma partição com o elo mais próximo"""
+        candidatos = self.candidatos_proximos(nickname, 1)
+        return candidatos[0] if candidatos else None
+
+    def esperando_desde(self, limite: datetime) -> List[str]:
+        """Jogadores que entraram na fila até `limite`, do mais antigo ao mais novo"""
+        with self._lock:
+            resultado = []
+            for entrada, nickname in self._por_entrada:
+                if entrada > limite:
+                    break
+                resultado.append(nickname)
+            return resultado
+
+    def elegiveis_por_particao(self, limite: datetime) -> Dict[ChaveFila, List[Tuple[int, str]]]:
+        """Agrupa por partição os jogadores que entraram até `limite`, ordenados por elo"""
+        with self._lock:
+            particoes: Dict[ChaveFila, List[Tuple[int, str]]] = {}
+            for nickname in self.esperando_desde(limite):
+                registro = self._entradas[nickname]
+                particoes.setdefault(registro.chave, []).append((registro.elo, nickname))
+            for jogadores in particoes.values():
+                jogadores.sort()
+            return particoes
+
+    def remover_expirados(self, limite: datetime) -> List[str]:
+        """Remove e retorna os jogadores que entraram na fila antes de `limite`"""
+        with self._lock:
+            expirados = []
+            for entrada, nickname in self._por_entrada:
+                if entrada >= limite:
+                    break
+                expirados.append(nickname)
+            for nickname in expirados:
+                self.remover(nickname)
+            return expirados
+
+
+def parear_por_elo(jogadores: List[Tuple[int, str]]) -> List[Tuple[str, str]]:
+    """Forma o máximo de pares com a menor soma de diferenças de elo.
+
+    Com os jogadores ordenados por elo, o pareamento ótimo usa apenas vizinhos
+    adjacentes. Quando a quantidade é ímpar, fica de fora o jogador (em posição
+    par) cuja exclusão minimiza o custo total, calculado com somas de prefixo
+    e sufixo em O(n).
+    """
+    jogadores = sorted(jogadores)
+    n = len(jogadores)
+    if n < 2:
+        return []
+
+    elos = [elo for elo, _ in jogadores]
+    excluido = None
+    if n % 2 == 1:
+        # prefixo[i]: custo de parear jogadores[0:i] (i par)
+        prefixo = [0] * (n + 1)
+        for i in range(2, n + 1, 2):
+            prefixo[i] = prefixo[i - 2] + elos[i - 1] - elos[i - 2]
+        # sufixo[i]: custo de parear jogadores[i:n] (n - i par)
+        sufixo = [0] * (n + 2)
+        for i in range(n - 2, 0, -2):
+            sufixo[i] = sufixo[i + 2] + elos[i + 1] - elos[i]
+        excluido = min(range(0, n, 2), key=lambda i: prefixo[i] + sufixo[i + 1])
+
+    restantes = [nickname for i, (_, nickname) in enumerate(jogadores) if i != excluido]
+    return [(restantes[i], restantes[i + 1]) for i in range(0, len(restantes) - 1, 2)]
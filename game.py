@@ -1,401 +1,898 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
-import json
-import random
-from enum import Enum
-import numpy as np
-from dataclasses import field
-from ia_matchmaking import SistemaIA
-
-class Plataforma(Enum):
-    PC = "PC"
-    PS4 = "PS4"
-    XBOX = "XBOX"
-    MOBILE = "MOBILE"
-
-class Regiao(Enum):
-    BR = "Brasil"
-    NA = "América do Norte"
-    EU = "Europa"
-    AS = "Ásia"
-
-class EstiloJogo(Enum):
-    AGRESSIVO = "Agressivo"
-    DEFENSIVO = "Defensivo"
-    SUPORTE = "Suporte"
-    HÍBRIDO = "Híbrido"
-
-class Comportamento(Enum):
-    EXCELENTE = 5
-    BOM = 4
-    REGULAR = 3
-    RUIM = 2
-    PÉSSIMO = 1
-
-@dataclass
-class Estatisticas:
-    kills: int = 0
-    deaths: int = 0
-    assists: int = 0
-    vitorias: int = 0
-    derrotas: int = 0
-    tempo_total_jogo: int = 0
-    partidas_jogadas: int = 0
-    abandonos: int = 0
-    reports: int = 0
-    ping_medio: float = 0.0
-    estilo_jogo: EstiloJogo = EstiloJogo.HÍBRIDO
-    comportamento: Comportamento = Comportamento.REGULAR
-    mmr: float = 1000.0  # Match Making Rating
-    mmr_historico: List[float] = field(default_factory=list)
-
-    @property
-    def kd_ratio(self) -> float:
-        return self.kills / self.deaths if self.deaths > 0 else self.kills
-
-    @property
-    def win_rate(self) -> float:
-        return (self.vitorias / self.partidas_jogadas * 100) if self.partidas_jogadas > 0 else 0
-
-    @property
-    def tempo_medio_partida(self) -> float:
-        return self.tempo_total_jogo / self.partidas_jogadas if self.partidas_jogadas > 0 else 0
-
-    @property
-    def taxa_abandono(self) -> float:
-        return (self.abandonos / self.partidas_jogadas * 100) if self.partidas_jogadas > 0 else 0
-
-    def atualizar_mmr(self, resultado: bool, mmr_oponente: float, k: float = 32):
-        expected = 1 / (1 + 10 ** ((mmr_oponente - self.mmr) / 400))
-        actual = 1 if resultado else 0
-        
-        # Ajusta o K baseado no comportamento
-        k_ajustado = k * (self.comportamento.value / 5)
-        
-        # Atualiza o MMR
-        self.mmr += k_ajustado * (actual - expected)
-        self.mmr_historico.append(self.mmr)
-
-class Jogador:
-    def __init__(self, nickname: str, plataforma: Plataforma, regiao: Regiao):
-        self.nickname = nickname
-        self.plataforma = plataforma
-        self.regiao = regiao
-        self.estatisticas = Estatisticas()
-        self.historico_partidas: List[Dict] = []
-        self.preferences = {
-            'modo_preferido': None,
-            'horario_preferido': None,
-            'idioma': 'pt-BR'
-        }
-        self.sistema_ia = SistemaIA()
-
-    def adicionar_partida(self, vitoria: bool, kills: int, deaths: int, assists: int, 
-                         tempo_partida: int, ping: float, abandonou: bool = False, 
-                         comportamento: Comportamento = Comportamento.REGULAR):
-        try:
-            self.estatisticas.kills += kills
-            self.estatisticas.deaths += deaths
-            self.estatisticas.assists += assists
-            self.estatisticas.tempo_total_jogo += tempo_partida
-            self.estatisticas.partidas_jogadas += 1
-            self.estatisticas.ping_medio = (self.estatisticas.ping_medio * (self.estatisticas.partidas_jogadas - 1) + ping) / self.estatisticas.partidas_jogadas
-            
-            if abandonou:
-                self.estatisticas.abandonos += 1
-                self.estatisticas.comportamento = max(Comportamento.PÉSSIMO, 
-                                                    Comportamento(self.estatisticas.comportamento.value - 1))
-            
-            if vitoria:
-                self.estatisticas.vitorias += 1
-            else:
-                self.estatisticas.derrotas += 1
-            
-            # Atualiza comportamento
-            if comportamento.value < self.estatisticas.comportamento.value:
-                self.estatisticas.comportamento = comportamento
-                
-            # Atualiza MMR usando o sistema de IA
-            dados_jogador = self.to_dict()
-            novo_mmr = self.sistema_ia.predizer_performance(dados_jogador)
-            self.estatisticas.mmr = novo_mmr
-            
-            # Adiciona ao histórico de MMR
-            self.estatisticas.mmr_historico.append(novo_mmr)
-
-            self.historico_partidas.append({
-                'data': datetime.now().isoformat(),
-                'resultado': 'Vitória' if vitoria else 'Derrota',
-                'kills': kills,
-                'deaths': deaths,
-                'assists': assists,
-                'tempo_partida': tempo_partida,
-                'ping': ping,
-                'abandonou': abandonou
-            })
-        except Exception as e:
-            print(f"Erro ao adicionar partida: {e}")
-
-    def to_dict(self) -> Dict:
-        return {
-            'nickname': self.nickname,
-            'plataforma': self.plataforma.value,
-            'regiao': self.regiao.value,
-            'estatisticas': {
-                'kills': self.estatisticas.kills,
-                'deaths': self.estatisticas.deaths,
-                'assists': self.estatisticas.assists,
-                'vitorias': self.estatisticas.vitorias,
-                'derrotas': self.estatisticas.derrotas,
-                'tempo_total_jogo': self.estatisticas.tempo_total_jogo,
-                'partidas_jogadas': self.estatisticas.partidas_jogadas,
-                'abandonos': self.estatisticas.abandonos,
-                'reports': self.estatisticas.reports,
-                'ping_medio': self.estatisticas.ping_medio,
-                'estilo_jogo': self.estatisticas.estilo_jogo.value,
-                'comportamento': self.estatisticas.comportamento.value,
-                'mmr': self.estatisticas.mmr,
-                'mmr_historico': self.estatisticas.mmr_historico
-            },
-            'preferences': self.preferences
-        }
-
-class SistemaMatchmaking:
-    def __init__(self):
-        self.jogadores: Dict[str, Jogador] = {}
-        self.partidas_em_andamento: List[Dict] = []
-        self.sistema_ia = SistemaIA()
-
-    def cadastrar_jogador(self, nickname: str, plataforma: Plataforma, regiao: Regiao) -> Jogador:
-        if nickname in self.jogadores:
-            raise ValueError("Nickname já está em uso")
-        
-        jogador = Jogador(nickname, plataforma, regiao)
-        self.jogadores[nickname] = jogador
-        
-        # Verifica se é possível smurf
-        dados_jogador = jogador.to_dict()
-        eh_smurf, prob_smurf = self.sistema_ia.detectar_smurf(dados_jogador)
-        if eh_smurf:
-            print(f"Alerta: Jogador {nickname} pode ser smurf (probabilidade: {prob_smurf:.2f})")
-            
-        return jogador
-
-    def encontrar_jogadores_compatíveis(self, jogador: Jogador, 
-                                     diferenca_mmr_max: int = 200,
-                                     regiao_preferida: bool = True) -> List[Tuple[Jogador, float]]:
-        try:
-            # Usa o sistema de IA para recomendar teammates
-            dados_jogador = jogador.to_dict()
-            todos_jogadores = [j.to_dict() for j in self.jogadores.values()]
-            
-            recomendacoes = self.sistema_ia.recomendar_teammates(
-                dados_jogador, 
-                todos_jogadores,
-                n_recomendacoes=10
-            )
-            
-            # Converte de volta para objetos Jogador
-            jogadores_compatíveis = []
-            for rec in recomendacoes:
-                jogador_rec = self.jogadores[rec['nickname']]
-                score = self.sistema_ia.calcular_score_compatibilidade(
-                    dados_jogador,
-                    rec
-                )
-                jogadores_compatíveis.append((jogador_rec, score))
-                
-            return jogadores_compatíveis
-        except Exception as e:
-            print(f"Erro ao encontrar jogadores compatíveis: {e}")
-            return []
-
-    def simular_partida(self, jogador1: Jogador, jogador2: Jogador) -> Dict:
-        try:
-            # Prediz performance dos jogadores
-            dados_j1 = jogador1.to_dict()
-            dados_j2 = jogador2.to_dict()
-            
-            pred_perf_j1 = self.sistema_ia.predizer_performance(dados_j1)
-            pred_perf_j2 = self.sistema_ia.predizer_performance(dados_j2)
-            
-            # Ajusta probabilidade de vitória baseado na predição
-            prob_base = 1 / (1 + 10 ** ((jogador2.estatisticas.mmr - jogador1.estatisticas.mmr) / 400))
-            prob_ajustada = prob_base * (pred_perf_j1 / (pred_perf_j1 + pred_perf_j2))
-            
-            vitoria_j1 = random.random() < prob_ajustada
-            
-            # Gera estatísticas aleatórias para a partida
-            kills_j1 = random.randint(0, 20)
-            deaths_j1 = random.randint(0, 10)
-            assists_j1 = random.randint(0, 15)
-            tempo_partida = random.randint(10, 30)
-            ping = random.uniform(20, 100)
-            
-            # Chance de abandono baseada no comportamento e toxicidade
-            eh_toxico_j1, prob_tox_j1 = self.sistema_ia.detectar_toxicidade(dados_j1)
-            abandonou = random.random() < (0.1 * (6 - jogador1.estatisticas.comportamento.value) * 
-                                         (1 + prob_tox_j1))
-            
-            # Atualiza os jogadores
-            jogador1.adicionar_partida(vitoria_j1, kills_j1, deaths_j1, assists_j1, 
-                                     tempo_partida, ping, abandonou)
-            jogador2.adicionar_partida(not vitoria_j1, deaths_j1, kills_j1, assists_j1, 
-                                     tempo_partida, ping)
-            
-            # Atualiza o MMR
-            jogador1.estatisticas.atualizar_mmr(vitoria_j1, jogador2.estatisticas.mmr)
-            jogador2.estatisticas.atualizar_mmr(not vitoria_j1, jogador1.estatisticas.mmr)
-            
-            # Treina o modelo com os novos dados
-            if len(self.jogadores) >= 10:
-                dados_treinamento = [j.to_dict() for j in self.jogadores.values()]
-                self.sistema_ia.treinar_modelo_performance(dados_treinamento)
-            
-            return {
-                'jogador1': jogador1.nickname,
-                'jogador2': jogador2.nickname,
-                'vencedor': jogador1.nickname if vitoria_j1 else jogador2.nickname,
-                'kills_j1': kills_j1,
-                'deaths_j1': deaths_j1,
-                'assists_j1': assists_j1,
-                'tempo_partida': tempo_partida,
-                'ping': ping,
-                'abandonou': abandonou,
-                'predicao_performance_j1': pred_perf_j1,
-                'predicao_performance_j2': pred_perf_j2
-            }
-        except Exception as e:
-            print(f"Erro ao simular partida: {e}")
-            return {}
-
-    def salvar_estado(self, arquivo: str):
-        try:
-            estado = {
-                'jogadores': {nick: jogador.to_dict() for nick, jogador in self.jogadores.items()}
-            }
-            with open(arquivo, 'w', encoding='utf-8') as f:
-                json.dump(estado, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Erro ao salvar estado: {e}")
-
-    def carregar_estado(self, arquivo: str):
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                estado = json.load(f)
-            
-            self.jogadores = {}
-            for nick, dados in estado['jogadores'].items():
-                jogador = Jogador(
-                    nick,
-                    Plataforma(dados['plataforma']),
-                    Regiao(dados['regiao'])
-                )
-                jogador.estatisticas = Estatisticas(**dados['estatisticas'])
-                jogador.preferences = dados['preferences']
-                self.jogadores[nick] = jogador
-        except Exception as e:
-            print(f"Erro ao carregar estado: {e}")
-
-class Partida:
-    def __init__(self, jogador1: str, jogador2: str):
-        self.jogador1 = jogador1
-        self.jogador2 = jogador2
-        self.kills_j1 = 0
-        self.kills_j2 = 0
-        self.deaths_j1 = 0
-        self.deaths_j2 = 0
-        self.assists_j1 = 0
-        self.assists_j2 = 0
-        self.tempo_partida = 0
-        self.ping = 0
-    
-    def simular_partida(self):
-        """Simula uma partida com resultados aleatórios"""
-        # Gera estatísticas aleatórias para o jogador 1
-        self.kills_j1 = random.randint(0, 20)
-        self.deaths_j1 = random.randint(0, 10)
-        self.assists_j1 = random.randint(0, 15)
-        
-        # Gera estatísticas aleatórias para o jogador 2
-        self.kills_j2 = random.randint(0, 20)
-        self.deaths_j2 = random.randint(0, 10)
-        self.assists_j2 = random.randint(0, 15)
-        
-        # Gera outros dados da partida
-        self.tempo_partida = random.randint(10, 30)
-        self.ping = random.uniform(20, 100)
-        
-        return {
-            'kills_j1': self.kills_j1,
-            'kills_j2': self.kills_j2,
-            'deaths_j1': self.deaths_j1,
-            'deaths_j2': self.deaths_j2,
-            'assists_j1': self.assists_j1,
-            'assists_j2': self.assists_j2,
-            'tempo_partida': self.tempo_partida,
-            'ping': self.ping
-        }
-
-def main():
-    try:
-        # Exemplo de uso
-        sistema = SistemaMatchmaking()
-        
-        # Cadastra alguns jogadores com diferentes estilos
-        jogadores = [
-            sistema.cadastrar_jogador("Player1", Plataforma.PC, Regiao.BR),
-            sistema.cadastrar_jogador("Player2", Plataforma.PS4, Regiao.BR),
-            sistema.cadastrar_jogador("Player3", Plataforma.XBOX, Regiao.NA),
-            sistema.cadastrar_jogador("Player4", Plataforma.MOBILE, Regiao.EU)
-        ]
-        
-        # Define estilos de jogo
-        jogadores[0].estatisticas.estilo_jogo = EstiloJogo.AGRESSIVO
-        jogadores[1].estatisticas.estilo_jogo = EstiloJogo.SUPORTE
-        jogadores[2].estatisticas.estilo_jogo = EstiloJogo.DEFENSIVO
-        jogadores[3].estatisticas.estilo_jogo = EstiloJogo.HÍBRIDO
-        
-        # Simula algumas partidas
-        for _ in range(10):
-            for jogador in jogadores:
-                compatíveis = sistema.encontrar_jogadores_compatíveis(jogador)
-                if compatíveis:
-                    oponente, score = compatíveis[0]
-                    resultado = sistema.simular_partida(jogador, oponente)
-                    print(f"\nPartida entre {jogador.nickname} e {oponente.nickname}:")
-                    print(f"Score de compatibilidade: {score:.2f}")
-                    print(f"Predição de performance: {resultado['predicao_performance_j1']:.2f} vs {resultado['predicao_performance_j2']:.2f}")
-                    print(f"Vencedor: {resultado['vencedor']}")
-                    print(f"K/D/A: {resultado['kills_j1']}/{resultado['deaths_j1']}/{resultado['assists_j1']}")
-                    print(f"Ping: {resultado['ping']:.1f}ms")
-                    if resultado['abandonou']:
-                        print("Jogador abandonou a partida!")
-        
-        # Mostra estatísticas finais
-        print("\n=== ESTATÍSTICAS FINAIS ===")
-        for jogador in sorted(jogadores, key=lambda x: x.estatisticas.mmr, reverse=True):
-            print(f"\n{jogador.nickname}:")
-            print(f"MMR: {jogador.estatisticas.mmr:.2f}")
-            print(f"K/D Ratio: {jogador.estatisticas.kd_ratio:.2f}")
-            print(f"Win Rate: {jogador.estatisticas.win_rate:.1f}%")
-            print(f"Ping médio: {jogador.estatisticas.ping_medio:.1f}ms")
-            print(f"Estilo de jogo: {jogador.estatisticas.estilo_jogo.value}")
-            print(f"Comportamento: {jogador.estatisticas.comportamento.value}")
-            print(f"Taxa de abandono: {jogador.estatisticas.taxa_abandono:.1f}%")
-            
-            # Verifica se é smurf ou tóxico
-            dados_jogador = jogador.to_dict()
-            eh_smurf, prob_smurf = sistema.sistema_ia.detectar_smurf(dados_jogador)
-            eh_toxico, prob_tox = sistema.sistema_ia.detectar_toxicidade(dados_jogador)
-            
-            if eh_smurf:
-                print(f"⚠️ Possível smurf (probabilidade: {prob_smurf:.2f})")
-            if eh_toxico:
-                print(f"⚠️ Comportamento tóxico detectado (probabilidade: {prob_tox:.2f})")
-    except Exception as e:
-        print(f"Erro na execução do programa: {e}")
-
-if __name__ == "__main__":
+from typing import Iterator, List, Dict, Optional, Tuple
+from datetime import datetime
+import contextlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import zipfile
+from enum import Enum
+from array import array
+import numpy as np
+from ia_matchmaking import SistemaIA, IndiceVizinhos, TreinadorSegundoPlano, obter_sistema_ia
+
+class Plataforma(Enum):
+    PC = "PC"
+    PS4 = "PS4"
+    XBOX = "XBOX"
+    MOBILE = "MOBILE"
+
+class Regiao(Enum):
+    BR = "Brasil"
+    NA = "América do Norte"
+    EU = "Europa"
+    AS = "Ásia"
+
+class EstiloJogo(Enum):
+    AGRESSIVO = "Agressivo"
+    DEFENSIVO = "Defensivo"
+    SUPORTE = "Suporte"
+    HÍBRIDO = "Híbrido"
+
+class Comportamento(Enum):
+    EXCELENTE = 5
+    BOM = 4
+    REGULAR = 3
+    RUIM = 2
+    PÉSSIMO = 1
+
+# Enums guardados como inteiros pequenos nas estatísticas
+ESTILOS_JOGO = list(EstiloJogo)
+CODIGOS_ESTILO_JOGO = {estilo: codigo for codigo, estilo in enumerate(ESTILOS_JOGO)}
+
+# Histórico de MMR
+CAPACIDADE_HISTORICO_MMR = 64  # valores mais recentes guardados por jogador
+ALFA_EWMA_MMR = 0.1
+
+class HistoricoMMR:
+    """Histórico de MMR de capacidade fixa (buffer circular sobre um array de doubles).
+    
+    Guarda apenas os `capacidade` valores mais recentes, do mais antigo ao mais
+    novo, e mantém em O(1) um resumo de toda a história: primeiro valor
+    visto, mínimo, máximo, média móvel exponencial e total de registros.
+    O array cresce até a capacidade e depois passa a sobrescrever o valor
+    mais antigo, então a memória fica constante em contas antigas.
+    """
+    __slots__ = ('capacidade', '_valores', '_inicio', 'primeiro', 'minimo', 'maximo', 'ewma', 'total')
+
+    def __init__(self, valores=(), capacidade: int = CAPACIDADE_HISTORICO_MMR):
+        self.capacidade = capacidade
+        self._valores = array('d')
+        self._inicio = 0
+        self.primeiro: Optional[float] = None
+        self.minimo: Optional[float] = None
+        self.maximo: Optional[float] = None
+        self.ewma: Optional[float] = None
+        self.total = 0
+        for valor in valores:
+            self.append(valor)
+
+    def append(self, valor: float):
+        valor = float(valor)
+        if self.total == 0:
+            self.primeiro = self.minimo = self.maximo = self.ewma = valor
+        else:
+            self.minimo = min(self.minimo, valor)
+            self.maximo = max(self.maximo, valor)
+            self.ewma += ALFA_EWMA_MMR * (valor - self.ewma)
+        self.total += 1
+        
+        if len(self._valores) < self.capacidade:
+            self._valores.append(valor)
+        else:
+            self._valores[self._inicio] = valor
+            self._inicio = (self._inicio + 1) % self.capacidade
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def __getitem__(self, indice: int) -> float:
+        n = len(self._valores)
+        if indice < 0:
+            indice += n
+        if not 0 <= indice < n:
+            raise IndexError("índice fora do histórico de MMR")
+        return self._valores[(self._inicio + indice) % n]
+
+    def __iter__(self):
+        valores = self._valores
+        return iter(valores[self._inicio:] + valores[:self._inicio])
+
+    def resumo(self) -> Dict:
+        """Resumo de toda a história, inclusive dos valores que já saíram do buffer"""
+        return {
+            'mmr_inicial': self.primeiro,
+            'mmr_minimo': self.minimo,
+            'mmr_maximo': self.maximo,
+            'mmr_ewma': self.ewma,
+            'mmr_historico_total': self.total
+        }
+
+    @classmethod
+    def restaurar(cls, valores=(), mmr_inicial: Optional[float] = None, mmr_minimo: Optional[float] = None,
+                  mmr_maximo: Optional[float] = None, mmr_ewma: Optional[float] = None,
+                  mmr_historico_total: Optional[int] = None,
+                  capacidade: int = CAPACIDADE_HISTORICO_MMR) -> 'HistoricoMMR':
+        """Recria o histórico a partir dos valores e do resumo salvos por to_dict"""
+        resumo = (mmr_inicial, mmr_minimo, mmr_maximo, mmr_ewma)
+        if mmr_historico_total and None not in resumo and mmr_historico_total >= len(valores):
+            # Resumo completo: adota valores e resumo sem recalcular valor a valor
+            historico = cls(capacidade=capacidade)
+            historico._valores = array('d', valores[len(valores) - capacidade:] if len(valores) > capacidade else valores)
+            historico.primeiro, historico.minimo, historico.maximo, historico.ewma = resumo
+            historico.total = mmr_historico_total
+            return historico
+        
+        historico = cls(valores, capacidade)
+        if mmr_historico_total is not None and mmr_historico_total >= historico.total:
+            historico.total = mmr_historico_total
+            historico.primeiro = mmr_inicial if mmr_inicial is not None else historico.primeiro
+            historico.minimo = mmr_minimo if mmr_minimo is not None else historico.minimo
+            historico.maximo = mmr_maximo if mmr_maximo is not None else historico.maximo
+            historico.ewma = mmr_ewma if mmr_ewma is not None else historico.ewma
+        return historico
+
+class Estatisticas:
+    """Estatísticas de um jogador em formato compacto.
+    
+    Usa __slots__ em vez de um __dict__ por instância; estilo de jogo e
+    comportamento ficam como inteiros pequenos (expostos como enums pelas
+    propriedades) e o histórico de MMR é um HistoricoMMR de capacidade fixa.
+    Igualdade e repr seguem os da antiga dataclass, campo a campo.
+    """
+    __slots__ = ('kills', 'deaths', 'assists', 'vitorias', 'derrotas', 'tempo_total_jogo',
+                 'partidas_jogadas', 'abandonos', 'reports', 'ping_medio', '_estilo_jogo',
+                 '_comportamento', 'mmr', 'mmr_historico')
+    # Campos na ordem do construtor, usados por __eq__ e __repr__
+    CAMPOS = ('kills', 'deaths', 'assists', 'vitorias', 'derrotas', 'tempo_total_jogo',
+              'partidas_jogadas', 'abandonos', 'reports', 'ping_medio', 'estilo_jogo',
+              'comportamento', 'mmr', 'mmr_historico')
+
+    def __init__(self, kills: int = 0, deaths: int = 0, assists: int = 0, vitorias: int = 0,
+                 derrotas: int = 0, tempo_total_jogo: int = 0, partidas_jogadas: int = 0,
+                 abandonos: int = 0, reports: int = 0, ping_medio: float = 0.0,
+                 estilo_jogo: EstiloJogo = EstiloJogo.HÍBRIDO,
+                 comportamento: Comportamento = Comportamento.REGULAR,
+                 mmr: float = 1000.0,  # Match Making Rating
+                 mmr_historico: Optional[List[float]] = None, **resumo_mmr):
+        self.kills = kills
+        self.deaths = deaths
+        self.assists = assists
+        self.vitorias = vitorias
+        self.derrotas = derrotas
+        self.tempo_total_jogo = tempo_total_jogo
+        self.partidas_jogadas = partidas_jogadas
+        self.abandonos = abandonos
+        self.reports = reports
+        self.ping_medio = ping_medio
+        self.estilo_jogo = estilo_jogo
+        self.comportamento = comportamento
+        self.mmr = mmr
+        # resumo_mmr: campos de HistoricoMMR.resumo() vindos de to_dict
+        self.mmr_historico = HistoricoMMR.restaurar(mmr_historico or (), **resumo_mmr)
+
+    def _valores(self) -> tuple:
+        # O histórico de MMR entra pelos valores guardados e pelo resumo de toda a história
+        return tuple(getattr(self, campo) for campo in self.CAMPOS[:-1]) + (
+            list(self.mmr_historico), self.mmr_historico.resumo())
+
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, Estatisticas):
+            return NotImplemented
+        return self._valores() == outro._valores()
+    
+    # Mutável, como a dataclass (eq=True sem frozen)
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        valores = ', '.join(f'{campo}={getattr(self, campo)!r}' for campo in self.CAMPOS[:-1])
+        return f'Estatisticas({valores}, mmr_historico={list(self.mmr_historico)!r})'
+
+    @property
+    def estilo_jogo(self) -> EstiloJogo:
+        return ESTILOS_JOGO[self._estilo_jogo]
+
+    @estilo_jogo.setter
+    def estilo_jogo(self, estilo):
+        # Aceita o enum ou o valor salvo por to_dict
+        self._estilo_jogo = CODIGOS_ESTILO_JOGO[EstiloJogo(estilo)]
+
+    @property
+    def comportamento(self) -> Comportamento:
+        return Comportamento(self._comportamento)
+
+    @comportamento.setter
+    def comportamento(self, comportamento):
+        self._comportamento = Comportamento(comportamento).value
+
+    @property
+    def kd_ratio(self) -> float:
+        return self.kills / self.deaths if self.deaths > 0 else self.kills
+
+    @property
+    def win_rate(self) -> float:
+        return (self.vitorias / self.partidas_jogadas * 100) if self.partidas_jogadas > 0 else 0
+
+    @property
+    def tempo_medio_partida(self) -> float:
+        return self.tempo_total_jogo / self.partidas_jogadas if self.partidas_jogadas > 0 else 0
+
+    @property
+    def taxa_abandono(self) -> float:
+        return (self.abandonos / self.partidas_jogadas * 100) if self.partidas_jogadas > 0 else 0
+
+    def atualizar_mmr(self, resultado: bool, mmr_oponente: float, k: float = 32):
+        expected = 1 / (1 + 10 ** ((mmr_oponente - self.mmr) / 400))
+        actual = 1 if resultado else 0
+        
+        # Ajusta o K baseado no comportamento
+        k_ajustado = k * (self.comportamento.value / 5)
+        
+        # Atualiza o MMR
+        self.mmr += k_ajustado * (actual - expected)
+        self.mmr_historico.append(self.mmr)
+
+PREFERENCIAS_PADRAO = {
+    'modo_preferido': None,
+    'horario_preferido': None,
+    'idioma': 'pt-BR'
+}
+
+# Campos de cada partida em Jogador.historico_partidas
+CAMPOS_HISTORICO_PARTIDA = ('data', 'resultado', 'kills', 'deaths', 'assists',
+                            'tempo_partida', 'ping', 'abandonou')
+
+class Jogador:
+    __slots__ = ('nickname', 'plataforma', 'regiao', 'estatisticas', '_partidas', '_preferences')
+
+    def __init__(self, nickname: str, plataforma: Plataforma, regiao: Regiao):
+        self.nickname = nickname
+        self.plataforma = plataforma
+        self.regiao = regiao
+        self.estatisticas = Estatisticas()
+        # Partidas guardadas em sequência num array de doubles, len(CAMPOS_HISTORICO_PARTIDA) valores por partida
+        self._partidas: Optional[array] = None
+        # Preferências só são copiadas quando alguém as altera
+        self._preferences: Optional[Dict] = None
+
+    @property
+    def preferences(self) -> Dict:
+        if self._preferences is None:
+            self._preferences = dict(PREFERENCIAS_PADRAO)
+        return self._preferences
+
+    @preferences.setter
+    def preferences(self, preferences: Dict):
+        self._preferences = preferences
+
+    @property
+    def historico_partidas(self) -> Tuple[Dict, ...]:
+        """Histórico de partidas no formato de dicionário (montado a partir das tuplas guardadas).
+        
+        É somente leitura: para registrar uma partida use adicionar_partida
+        ou, sem alterar as estatísticas, registrar_historico_partida.
+        """
+        partidas = self._partidas or ()
+        n = len(CAMPOS_HISTORICO_PARTIDA)
+        historico = []
+        for i in range(0, len(partidas), n):
+            data, vitoria, kills, deaths, assists, tempo_partida, ping, abandonou = partidas[i:i + n]
+            historico.append(dict(zip(CAMPOS_HISTORICO_PARTIDA, (
+                datetime.fromtimestamp(data).isoformat(), 'Vitória' if vitoria else 'Derrota',
+                int(kills), int(deaths), int(assists), int(tempo_partida), ping, bool(abandonou)
+            ))))
+        return tuple(historico)
+
+    def registrar_historico_partida(self, vitoria: bool, kills: int, deaths: int, assists: int,
+                                    tempo_partida: int, ping: float, abandonou: bool = False,
+                                    data: Optional[datetime] = None):
+        """Acrescenta uma partida ao histórico compacto, sem mexer nas estatísticas"""
+        if self._partidas is None:
+            self._partidas = array('d')
+        self._partidas.extend(((data or datetime.now()).timestamp(), vitoria, kills, deaths, assists,
+                               tempo_partida, ping, abandonou))
+
+    @property
+    def sistema_ia(self) -> SistemaIA:
+        # Modelos compartilhados por todos os jogadores (carregados uma única vez)
+        return obter_sistema_ia()
+
+    def adicionar_partida(self, vitoria: bool, kills: int, deaths: int, assists: int, 
+                         tempo_partida: int, ping: float, abandonou: bool = False, 
+                         comportamento: Comportamento = Comportamento.REGULAR,
+                         prever_mmr: bool = True):
+        """Registra uma partida. Com prever_mmr=False o MMR previsto pela IA fica a
+        cargo de quem chamou (ver SistemaMatchmaking.simular_rodada)"""
+        try:
+            self.estatisticas.kills += kills
+            self.estatisticas.deaths += deaths
+            self.estatisticas.assists += assists
+            self.estatisticas.tempo_total_jogo += tempo_partida
+            self.estatisticas.partidas_jogadas += 1
+            self.estatisticas.ping_medio = (self.estatisticas.ping_medio * (self.estatisticas.partidas_jogadas - 1) + ping) / self.estatisticas.partidas_jogadas
+            
+            if abandonou:
+                self.estatisticas.abandonos += 1
+                self.estatisticas.comportamento = max(Comportamento.PÉSSIMO.value,
+                                                      self.estatisticas.comportamento.value - 1)
+            
+            if vitoria:
+                self.estatisticas.vitorias += 1
+            else:
+                self.estatisticas.derrotas += 1
+            
+            # Atualiza comportamento
+            if comportamento.value < self.estatisticas.comportamento.value:
+                self.estatisticas.comportamento = comportamento
+                
+            # Atualiza MMR usando o sistema de IA
+            if prever_mmr:
+                dados_jogador = self.to_dict()
+                self.aplicar_mmr_previsto(self.sistema_ia.predizer_performance(dados_jogador))
+
+            self.registrar_historico_partida(vitoria, kills, deaths, assists, tempo_partida, ping, abandonou)
+        except Exception as e:
+            print(f"Erro ao adicionar partida: {e}")
+
+    def aplicar_mmr_previsto(self, novo_mmr: float):
+        self.estatisticas.mmr = novo_mmr
+        
+        # Adiciona ao histórico de MMR
+        self.estatisticas.mmr_historico.append(novo_mmr)
+
+    def to_dict(self) -> Dict:
+        return {
+            'nickname': self.nickname,
+            'plataforma': self.plataforma.value,
+            'regiao': self.regiao.value,
+            'estatisticas': {
+                'kills': self.estatisticas.kills,
+                'deaths': self.estatisticas.deaths,
+                'assists': self.estatisticas.assists,
+                'vitorias': self.estatisticas.vitorias,
+                'derrotas': self.estatisticas.derrotas,
+                'tempo_total_jogo': self.estatisticas.tempo_total_jogo,
+                'partidas_jogadas': self.estatisticas.partidas_jogadas,
+                'abandonos': self.estatisticas.abandonos,
+                'reports': self.estatisticas.reports,
+                'ping_medio': self.estatisticas.ping_medio,
+                'estilo_jogo': self.estatisticas.estilo_jogo.value,
+                'comportamento': self.estatisticas.comportamento.value,
+                'mmr': self.estatisticas.mmr,
+                'mmr_historico': list(self.estatisticas.mmr_historico),
+                **self.estatisticas.mmr_historico.resumo()
+            },
+            'preferences': self._preferences if self._preferences is not None else dict(PREFERENCIAS_PADRAO)
+        }
+
+# Snapshot binário do estado (ver SistemaMatchmaking.salvar_snapshot)
+VERSAO_SNAPSHOT = 1
+TAMANHO_LOTE_SNAPSHOT = 65536
+PLATAFORMAS = list(Plataforma)
+REGIOES = list(Regiao)
+CODIGOS_PLATAFORMA = {plataforma: codigo for codigo, plataforma in enumerate(PLATAFORMAS)}
+CODIGOS_REGIAO = {regiao: codigo for codigo, regiao in enumerate(REGIOES)}
+CAMPOS_INTEIROS_SNAPSHOT = ('kills', 'deaths', 'assists', 'vitorias', 'derrotas', 'tempo_total_jogo',
+                            'partidas_jogadas', 'abandonos', 'reports')
+# Colunas de tamanho variável: valores concatenados + offsets (n + 1) por jogador
+COLUNAS_VARIAVEIS_SNAPSHOT = {
+    'nicknames': np.uint8,
+    'mmr_historico': np.float64,
+    'partidas': np.float64,
+    'preferences': np.uint8
+}
+
+def _tamanhos_variaveis(jogador: 'Jogador') -> Dict[str, int]:
+    return {
+        'nicknames': len(jogador.nickname.encode('utf-8')),
+        'mmr_historico': len(jogador.estatisticas.mmr_historico),
+        'partidas': len(jogador._partidas or ()),
+        'preferences': len(_preferences_snapshot(jogador))
+    }
+
+def _preferences_snapshot(jogador: 'Jogador') -> bytes:
+    # Preferências padrão (nunca acessadas) não ocupam espaço no snapshot
+    if jogador._preferences is None:
+        return b''
+    return json.dumps(jogador._preferences, ensure_ascii=False).encode('utf-8')
+
+def _colunas_snapshot(jogadores: List['Jogador']) -> Dict[str, np.ndarray]:
+    """Colunas de um lote de jogadores, no formato gravado pelo snapshot"""
+    n = len(jogadores)
+    stats = [j.estatisticas for j in jogadores]
+    historicos = [e.mmr_historico for e in stats]
+
+    def resumo(campo: str) -> np.ndarray:
+        return np.array([np.nan if getattr(h, campo) is None else getattr(h, campo) for h in historicos],
+                        dtype=np.float64)
+    
+    colunas = {
+        'plataforma': np.fromiter((CODIGOS_PLATAFORMA[j.plataforma] for j in jogadores), dtype=np.int8, count=n),
+        'regiao': np.fromiter((CODIGOS_REGIAO[j.regiao] for j in jogadores), dtype=np.int8, count=n),
+        'estilo_jogo': np.fromiter((e._estilo_jogo for e in stats), dtype=np.int8, count=n),
+        'comportamento': np.fromiter((e._comportamento for e in stats), dtype=np.int8, count=n),
+        'ping_medio': np.fromiter((e.ping_medio for e in stats), dtype=np.float64, count=n),
+        'mmr': np.fromiter((e.mmr for e in stats), dtype=np.float64, count=n),
+        'mmr_inicial': resumo('primeiro'),
+        'mmr_minimo': resumo('minimo'),
+        'mmr_maximo': resumo('maximo'),
+        'mmr_ewma': resumo('ewma'),
+        'mmr_historico_total': np.fromiter((h.total for h in historicos), dtype=np.int64, count=n),
+        'nicknames': np.frombuffer(b''.join(j.nickname.encode('utf-8') for j in jogadores), dtype=np.uint8),
+        'mmr_historico': np.fromiter((v for h in historicos for v in h), dtype=np.float64),
+        'partidas': np.fromiter((v for j in jogadores for v in (j._partidas or ())), dtype=np.float64),
+        'preferences': np.frombuffer(b''.join(_preferences_snapshot(j) for j in jogadores), dtype=np.uint8)
+    }
+    for campo in CAMPOS_INTEIROS_SNAPSHOT:
+        colunas[campo] = np.fromiter((getattr(e, campo) for e in stats), dtype=np.int64, count=n)
+    return colunas
+
+class SistemaMatchmaking:
+    def __init__(self):
+        self.jogadores: Dict[str, Jogador] = {}
+        self.partidas_em_andamento: List[Dict] = []
+        # Retreino do modelo de performance fora do caminho das partidas
+        self.treinador = TreinadorSegundoPlano(self.dados_treinamento)
+        # Índice de vizinhos por região usado nas recomendações de teammates
+        self.indice = IndiceVizinhos()
+
+    @property
+    def sistema_ia(self) -> SistemaIA:
+        return obter_sistema_ia()
+
+    def fechar(self):
+        """Encerra a thread de retreino em segundo plano"""
+        self.treinador.fechar()
+
+    def dados_treinamento(self) -> List[Dict]:
+        """Cópia dos dados de todos os jogadores para o treinador"""
+        return [j.to_dict() for j in list(self.jogadores.values())]
+
+    def cadastrar_jogador(self, nickname: str, plataforma: Plataforma, regiao: Regiao) -> Jogador:
+        if nickname in self.jogadores:
+            raise ValueError("Nickname já está em uso")
+        
+        jogador = Jogador(nickname, plataforma, regiao)
+        self.jogadores[nickname] = jogador
+        
+        # Verifica se é possível smurf
+        dados_jogador = jogador.to_dict()
+        self.indice.adicionar(dados_jogador)
+        eh_smurf, prob_smurf = self.sistema_ia.detectar_smurf(dados_jogador)
+        if eh_smurf:
+            print(f"Alerta: Jogador {nickname} pode ser smurf (probabilidade: {prob_smurf:.2f})")
+            
+        return jogador
+
+    def encontrar_jogadores_compatíveis(self, jogador: Jogador, 
+                                     diferenca_mmr_max: int = 200,
+                                     regiao_preferida: bool = True) -> List[Tuple[Jogador, float]]:
+        try:
+            # Usa o índice de vizinhos para recomendar teammates (já com os scores)
+            recomendacoes = self.indice.recomendar_com_scores(jogador.to_dict(), n_recomendacoes=10)
+            
+            # Converte de volta para objetos Jogador
+            jogadores_compatíveis = [
+                (self.jogadores[rec['nickname']], score)
+                for rec, score in recomendacoes
+            ]
+                
+            return jogadores_compatíveis
+        except Exception as e:
+            print(f"Erro ao encontrar jogadores compatíveis: {e}")
+            return []
+
+    def simular_partida(self, jogador1: Jogador, jogador2: Jogador) -> Dict:
+        resultados = self.simular_rodada([(jogador1, jogador2)])
+        return resultados[0] if resultados else {}
+
+    def simular_rodada(self, pares: List[Tuple[Jogador, Jogador]]) -> List[Dict]:
+        """Simula uma rodada de partidas entre pares de jogadores distintos.
+        
+        As predições de performance da rodada inteira são feitas em lote: uma
+        chamada antes das partidas e outra depois, para o novo MMR.
+        """
+        try:
+            if not pares:
+                return []
+            
+            # Prediz performance de todos os jogadores da rodada
+            dados = [(jogador1.to_dict(), jogador2.to_dict()) for jogador1, jogador2 in pares]
+            predicoes = self.sistema_ia.predizer_performance_lote(
+                [dados_jogador for dados_par in dados for dados_jogador in dados_par]
+            )
+            
+            resultados = []
+            erros_predicao = []
+            for i, (jogador1, jogador2) in enumerate(pares):
+                dados_j1 = dados[i][0]
+                pred_perf_j1 = float(predicoes[2 * i])
+                pred_perf_j2 = float(predicoes[2 * i + 1])
+                erros_predicao.append((abs(pred_perf_j1 - jogador1.estatisticas.mmr) +
+                                       abs(pred_perf_j2 - jogador2.estatisticas.mmr)) / 2)
+                
+                # Ajusta probabilidade de vitória baseado na predição
+                prob_base = 1 / (1 + 10 ** ((jogador2.estatisticas.mmr - jogador1.estatisticas.mmr) / 400))
+                prob_ajustada = prob_base * (pred_perf_j1 / (pred_perf_j1 + pred_perf_j2))
+                
+                vitoria_j1 = random.random() < prob_ajustada
+                
+                # Gera estatísticas aleatórias para a partida
+                kills_j1 = random.randint(0, 20)
+                deaths_j1 = random.randint(0, 10)
+                assists_j1 = random.randint(0, 15)
+                tempo_partida = random.randint(10, 30)
+                ping = random.uniform(20, 100)
+                
+                # Chance de abandono baseada no comportamento e toxicidade
+                eh_toxico_j1, prob_tox_j1 = self.sistema_ia.detectar_toxicidade(dados_j1)
+                abandonou = random.random() < (0.1 * (6 - jogador1.estatisticas.comportamento.value) * 
+                                             (1 + prob_tox_j1))
+                
+                # Atualiza os jogadores (o MMR previsto é aplicado em lote abaixo)
+                jogador1.adicionar_partida(vitoria_j1, kills_j1, deaths_j1, assists_j1, 
+                                         tempo_partida, ping, abandonou, prever_mmr=False)
+                jogador2.adicionar_partida(not vitoria_j1, deaths_j1, kills_j1, assists_j1, 
+                                         tempo_partida, ping, prever_mmr=False)
+                
+                resultados.append({
+                    'jogador1': jogador1.nickname,
+                    'jogador2': jogador2.nickname,
+                    'vencedor': jogador1.nickname if vitoria_j1 else jogador2.nickname,
+                    'kills_j1': kills_j1,
+                    'deaths_j1': deaths_j1,
+                    'assists_j1': assists_j1,
+                    'tempo_partida': tempo_partida,
+                    'ping': ping,
+                    'abandonou': abandonou,
+                    'predicao_performance_j1': pred_perf_j1,
+                    'predicao_performance_j2': pred_perf_j2
+                })
+            
+            # Atualiza o MMR de todos os jogadores com uma única predição
+            jogadores_rodada = [jogador for par in pares for jogador in par]
+            novos_mmr = self.sistema_ia.predizer_performance_lote([j.to_dict() for j in jogadores_rodada])
+            for jogador, novo_mmr in zip(jogadores_rodada, novos_mmr):
+                jogador.aplicar_mmr_previsto(float(novo_mmr))
+            
+            # Atualiza o MMR
+            for (jogador1, jogador2), resultado in zip(pares, resultados):
+                vitoria_j1 = resultado['vencedor'] == jogador1.nickname
+                jogador1.estatisticas.atualizar_mmr(vitoria_j1, jogador2.estatisticas.mmr)
+                jogador2.estatisticas.atualizar_mmr(not vitoria_j1, jogador1.estatisticas.mmr)
+            
+            # Reposiciona no índice de vizinhos quem jogou a rodada
+            for jogador in jogadores_rodada:
+                self.indice.adicionar(jogador.to_dict())
+            
+            # O treinador decide quando retreinar o modelo com os novos dados
+            for erro in erros_predicao:
+                self.treinador.registrar_partida(erro)
+            
+            return resultados
+        except Exception as e:
+            print(f"Erro ao simular partida: {e}")
+            return []
+
+    def salvar_estado(self, arquivo: str):
+        try:
+            estado = {
+                'jogadores': {nick: jogador.to_dict() for nick, jogador in self.jogadores.items()}
+            }
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(estado, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Erro ao salvar estado: {e}")
+
+    def carregar_estado(self, arquivo: str):
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                estado = json.load(f)
+            
+            jogadores = {}
+            for nick, dados in estado['jogadores'].items():
+                jogador = Jogador(
+                    nick,
+                    Plataforma(dados['plataforma']),
+                    Regiao(dados['regiao'])
+                )
+                jogador.estatisticas = Estatisticas(**dados['estatisticas'])
+                jogador.preferences = dados['preferences']
+                jogadores[nick] = jogador
+            self._substituir_jogadores(jogadores)
+        except Exception as e:
+            print(f"Erro ao carregar estado: {e}")
+
+    def _substituir_jogadores(self, jogadores: Dict[str, 'Jogador']):
+        """Troca a população inteira e reconstrói o índice de vizinhos de uma vez"""
+        self.jogadores = jogadores
+        self.indice = IndiceVizinhos()
+        self.indice.adicionar_lote([j.to_dict() for j in jogadores.values()])
+
+    def salvar_snapshot(self, caminho: str, nivel_compressao: Optional[int] = None,
+                        tamanho_lote: int = TAMANHO_LOTE_SNAPSHOT):
+        """Salva o estado em formato binário colunar.
+        
+        Sem compressão, `caminho` é um diretório com um .npy por coluna (que
+        `carregar_snapshot` abre com memory-map) mais um meta.json. Com
+        `nivel_compressao` (0-9), as mesmas colunas são empacotadas num .npz
+        compactado. Colunas de tamanho variável (nicknames, históricos e
+        preferências) são gravadas como valores concatenados mais offsets.
+        Os jogadores são processados em lotes de `tamanho_lote`, então a
+        memória extra não depende do tamanho da população.
+        """
+        try:
+            jogadores = list(self.jogadores.values())
+            destino = caminho if nivel_compressao is None else tempfile.mkdtemp(prefix='snapshot_')
+            os.makedirs(destino, exist_ok=True)
+            
+            # 1ª passada: tamanho total de cada coluna variável e offsets por jogador
+            offsets = {nome: np.zeros(len(jogadores) + 1, dtype=np.int64) for nome in COLUNAS_VARIAVEIS_SNAPSHOT}
+            for i, jogador in enumerate(jogadores):
+                for nome, tamanho in _tamanhos_variaveis(jogador).items():
+                    offsets[nome][i + 1] = tamanho
+            for nome, coluna in offsets.items():
+                np.cumsum(coluna, out=coluna)
+                np.save(os.path.join(destino, f'{nome}_offsets.npy'), coluna)
+            
+            # 2ª passada: cada lote é escrito direto nos arquivos .npy já dimensionados
+            arquivos = {}
+            try:
+                inicio_variaveis = dict.fromkeys(COLUNAS_VARIAVEIS_SNAPSHOT, 0)
+                for inicio in range(0, max(len(jogadores), 1), tamanho_lote):
+                    colunas = _colunas_snapshot(jogadores[inicio:inicio + tamanho_lote])
+                    for nome, valores in colunas.items():
+                        if nome not in arquivos:
+                            total = offsets[nome][-1] if nome in COLUNAS_VARIAVEIS_SNAPSHOT else len(jogadores)
+                            arquivos[nome] = np.lib.format.open_memmap(
+                                os.path.join(destino, f'{nome}.npy'), mode='w+', dtype=valores.dtype, shape=(int(total),)
+                            )
+                        if nome in COLUNAS_VARIAVEIS_SNAPSHOT:
+                            posicao = inicio_variaveis[nome]
+                            inicio_variaveis[nome] += len(valores)
+                        else:
+                            posicao = inicio
+                        arquivos[nome][posicao:posicao + len(valores)] = valores
+            finally:
+                for arquivo in arquivos.values():
+                    arquivo.flush()
+                arquivos.clear()
+            
+            with open(os.path.join(destino, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'versao': VERSAO_SNAPSHOT, 'jogadores': len(jogadores)}, f)
+            
+            if nivel_compressao is not None:
+                with zipfile.ZipFile(caminho, 'w', compression=zipfile.ZIP_DEFLATED,
+                                     compresslevel=nivel_compressao) as zf:
+                    for nome in sorted(os.listdir(destino)):
+                        zf.write(os.path.join(destino, nome), nome)
+                shutil.rmtree(destino)
+        except Exception as e:
+            print(f"Erro ao salvar snapshot: {e}")
+
+    def carregar_snapshot(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE_SNAPSHOT):
+        """Carrega um snapshot de salvar_snapshot, substituindo os jogadores atuais"""
+        try:
+            self._substituir_jogadores({j.nickname: j for j in iterar_snapshot(caminho, tamanho_lote)})
+        except Exception as e:
+            print(f"Erro ao carregar snapshot: {e}")
+
+class _ColunaSequencial:
+    """Coluna .npy de um membro do .npz lida em ordem, um trecho por vez.
+    
+    Membros compactados não podem ser mapeados nem acessados aleatoriamente,
+    então cada fatia `[inicio:fim]` lê só os bytes seguintes do membro. Para
+    os offsets, que se sobrepõem em um elemento entre lotes, o último
+    elemento lido é guardado.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        versao = np.lib.format.read_magic(arquivo)
+        if versao == (1, 0):
+            _, _, self.dtype = np.lib.format.read_array_header_1_0(arquivo)
+        else:
+            _, _, self.dtype = np.lib.format.read_array_header_2_0(arquivo)
+        self.posicao = 0
+        self.ultimo = np.empty(0, dtype=self.dtype)
+
+    def _ler(self, quantidade: int) -> np.ndarray:
+        dados = self.arquivo.read(quantidade * self.dtype.itemsize)
+        valores = np.frombuffer(dados, dtype=self.dtype)
+        if len(valores) != quantidade:
+            raise ValueError("Snapshot truncado")
+        self.posicao += quantidade
+        if quantidade:
+            self.ultimo = valores[-1:]
+        return valores
+
+    def __getitem__(self, fatia: slice) -> np.ndarray:
+        inicio, fim = fatia.start, fatia.stop
+        if inicio < self.posicao - 1:
+            raise ValueError("Colunas do .npz só podem ser lidas em ordem")
+        if inicio > self.posicao:
+            self._ler(inicio - self.posicao)
+        repetido = self.ultimo if inicio == self.posicao - 1 else self.ultimo[:0]
+        novos = self._ler(max(fim - self.posicao, 0))
+        return np.concatenate((repetido, novos)) if len(repetido) else novos
+
+def iterar_snapshot(caminho: str, tamanho_lote: int = TAMANHO_LOTE_SNAPSHOT) -> Iterator[Jogador]:
+    """Lê os jogadores de um snapshot em lotes, sem materializar todas as colunas.
+    
+    Diretórios são abertos com memory-map; arquivos .npz são descompactados
+    em sequência, um lote por vez (ver _ColunaSequencial).
+    """
+    if os.path.isdir(caminho):
+        with open(os.path.join(caminho, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        yield from _iterar_colunas(
+            meta, lambda nome: np.load(os.path.join(caminho, f'{nome}.npy'), mmap_mode='r'), tamanho_lote)
+        return
+    
+    with zipfile.ZipFile(caminho) as zf, contextlib.ExitStack() as membros:
+        meta = json.loads(zf.read('meta.json'))
+        yield from _iterar_colunas(
+            meta, lambda nome: _ColunaSequencial(membros.enter_context(zf.open(f'{nome}.npy'))), tamanho_lote)
+
+def _iterar_colunas(meta: Dict, coluna, tamanho_lote: int) -> Iterator[Jogador]:
+    """Recria os jogadores lote a lote; `coluna(nome)` abre uma coluna fatiável em ordem crescente"""
+    if meta['versao'] != VERSAO_SNAPSHOT:
+        raise ValueError(f"Versão de snapshot não suportada: {meta['versao']}")
+    
+    nomes_fixos = ['plataforma', 'regiao', 'estilo_jogo', 'comportamento', 'ping_medio', 'mmr',
+                   'mmr_inicial', 'mmr_minimo', 'mmr_maximo', 'mmr_ewma', 'mmr_historico_total',
+                   *CAMPOS_INTEIROS_SNAPSHOT]
+    fixas = {nome: coluna(nome) for nome in nomes_fixos}
+    variaveis = {nome: (coluna(nome), coluna(f'{nome}_offsets')) for nome in COLUNAS_VARIAVEIS_SNAPSHOT}
+    
+    for inicio in range(0, meta['jogadores'], tamanho_lote):
+        fim = min(inicio + tamanho_lote, meta['jogadores'])
+        lote = {nome: valores[inicio:fim].tolist() for nome, valores in fixas.items()}
+        fatias = {}
+        for nome, (valores, offsets) in variaveis.items():
+            limites = np.asarray(offsets[inicio:fim + 1])
+            fatias[nome] = (valores[limites[0]:limites[-1]], (limites - limites[0]).tolist())
+        
+        nicknames_bytes = fatias['nicknames'][0].tobytes()
+        preferences_bytes = fatias['preferences'][0].tobytes()
+        historico_valores, historico_offsets = fatias['mmr_historico']
+        partidas_valores, partidas_offsets = fatias['partidas']
+        for i in range(fim - inicio):
+            a, b = fatias['nicknames'][1][i:i + 2]
+            jogador = Jogador(nicknames_bytes[a:b].decode('utf-8'),
+                              PLATAFORMAS[lote['plataforma'][i]], REGIOES[lote['regiao'][i]])
+            
+            estatisticas = jogador.estatisticas
+            for campo in CAMPOS_INTEIROS_SNAPSHOT:
+                setattr(estatisticas, campo, lote[campo][i])
+            estatisticas.ping_medio = lote['ping_medio'][i]
+            estatisticas.mmr = lote['mmr'][i]
+            estatisticas._estilo_jogo = lote['estilo_jogo'][i]
+            estatisticas._comportamento = lote['comportamento'][i]
+            
+            a, b = historico_offsets[i:i + 2]
+            if lote['mmr_historico_total'][i]:
+                estatisticas.mmr_historico = HistoricoMMR.restaurar(
+                    historico_valores[a:b].tolist(),
+                    mmr_inicial=lote['mmr_inicial'][i],
+                    mmr_minimo=lote['mmr_minimo'][i],
+                    mmr_maximo=lote['mmr_maximo'][i],
+                    mmr_ewma=lote['mmr_ewma'][i],
+                    mmr_historico_total=lote['mmr_historico_total'][i]
+                )
+            
+            a, b = partidas_offsets[i:i + 2]
+            if b > a:
+                jogador._partidas = array('d', partidas_valores[a:b].tobytes())
+            
+            a, b = fatias['preferences'][1][i:i + 2]
+            if b > a:
+                jogador._preferences = json.loads(preferences_bytes[a:b].decode('utf-8'))
+            yield jogador
+
+class Partida:
+    def __init__(self, jogador1: str, jogador2: str):
+        self.jogador1 = jogador1
+        self.jogador2 = jogador2
+        self.kills_j1 = 0
+        self.kills_j2 = 0
+        self.deaths_j1 = 0
+        self.deaths_j2 = 0
+        self.assists_j1 = 0
+        self.assists_j2 = 0
+        self.tempo_partida = 0
+        self.ping = 0
+    
+    def simular_partida(self):
+        """Simula uma partida com resultados aleatórios"""
+        # Gera estatísticas aleatórias para o jogador 1
+        self.kills_j1 = random.randint(0, 20)
+        self.deaths_j1 = random.randint(0, 10)
+        self.assists_j1 = random.randint(0, 15)
+        
+        # Gera estatísticas aleatórias para o jogador 2
+        self.kills_j2 = random.randint(0, 20)
+        self.deaths_j2 = random.randint(0, 10)
+        self.assists_j2 = random.randint(0, 15)
+        
+        # Gera outros dados da partida
+        self.tempo_partida = random.randint(10, 30)
+        self.ping = random.uniform(20, 100)
+        
+        return {
+            'kills_j1': self.kills_j1,
+            'kills_j2': self.kills_j2,
+            'deaths_j1': self.deaths_j1,
+            'deaths_j2': self.deaths_j2,
+            'assists_j1': self.assists_j1,
+            'assists_j2': self.assists_j2,
+            'tempo_partida': self.tempo_partida,
+            'ping': self.ping
+        }
+
+def main():
+    sistema = None
+    try:
+        # Exemplo de uso
+        sistema = SistemaMatchmaking()
+        
+        # Cadastra alguns jogadores com diferentes estilos
+        jogadores = [
+            sistema.cadastrar_jogador("Player1", Plataforma.PC, Regiao.BR),
+            sistema.cadastrar_jogador("Player2", Plataforma.PS4, Regiao.BR),
+            sistema.cadastrar_jogador("Player3", Plataforma.XBOX, Regiao.NA),
+            sistema.cadastrar_jogador("Player4", Plataforma.MOBILE, Regiao.EU)
+        ]
+        
+        # Define estilos de jogo
+        jogadores[0].estatisticas.estilo_jogo = EstiloJogo.AGRESSIVO
+        jogadores[1].estatisticas.estilo_jogo = EstiloJogo.SUPORTE
+        jogadores[2].estatisticas.estilo_jogo = EstiloJogo.DEFENSIVO
+        jogadores[3].estatisticas.estilo_jogo = EstiloJogo.HÍBRIDO
+        
+        # Simula algumas partidas
+        for _ in range(10):
+            for jogador in jogadores:
+                compatíveis = sistema.encontrar_jogadores_compatíveis(jogador)
+                if compatíveis:
+                    oponente, score = compatíveis[0]
+                    resultado = sistema.simular_partida(jogador, oponente)
+                    print(f"\nPartida entre {jogador.nickname} e {oponente.nickname}:")
+                    print(f"Score de compatibilidade: {score:.2f}")
+                    print(f"Predição de performance: {resultado['predicao_performance_j1']:.2f} vs {resultado['predicao_performance_j2']:.2f}")
+                    print(f"Vencedor: {resultado['vencedor']}")
+                    print(f"K/D/A: {resultado['kills_j1']}/{resultado['deaths_j1']}/{resultado['assists_j1']}")
+                    print(f"Ping: {resultado['ping']:.1f}ms")
+                    if resultado['abandonou']:
+                        print("Jogador abandonou a partida!")
+        
+        # Mostra estatísticas finais
+        print("\n=== ESTATÍSTICAS FINAIS ===")
+        for jogador in sorted(jogadores, key=lambda x: x.estatisticas.mmr, reverse=True):
+            print(f"\n{jogador.nickname}:")
+            print(f"MMR: {jogador.estatisticas.mmr:.2f}")
+            print(f"K/D Ratio: {jogador.estatisticas.kd_ratio:.2f}")
+            print(f"Win Rate: {jogador.estatisticas.win_rate:.1f}%")
+            print(f"Ping médio: {jogador.estatisticas.ping_medio:.1f}ms")
+            print(f"Estilo de jogo: {jogador.estatisticas.estilo_jogo.value}")
+            print(f"Comportamento: {jogador.estatisticas.comportamento.value}")
+            print(f"Taxa de abandono: {jogador.estatisticas.taxa_abandono:.1f}%")
+            
+            # Verifica se é smurf ou tóxico
+            dados_jogador = jogador.to_dict()
+            eh_smurf, prob_smurf = sistema.sistema_ia.detectar_smurf(dados_jogador)
+            eh_toxico, prob_tox = sistema.sistema_ia.detectar_toxicidade(dados_jogador)
+            
+            if eh_smurf:
+                print(f"⚠️ Possível smurf (probabilidade: {prob_smurf:.2f})")
+            if eh_toxico:
+                print(f"⚠️ Comportamento tóxico detectado (probabilidade: {prob_tox:.2f})")
+    except Exception as e:
+        print(f"Erro na execução do programa: {e}")
+    finally:
+        if sistema is not None:
+            sistema.fechar()
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
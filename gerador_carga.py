@@ -0,0 +1,283 @@
+"""Gerador de carga para o servidor de matchmaking.
+
+Simula milhares de clientes concorrentes em um único processo com o cliente
+assíncrono do Socket.IO, usando o mesmo protocolo de client.ClienteMatchmaking
+(login, entrar_fila, sair_fila, match_encontrado).
+
+Uso: python gerador_carga.py [--url URL] [--taxa-chegada R] [--duracao S] ...
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import socketio
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PERCENTIS = (50, 95, 99)
+TIMEOUT_LOGIN = 10  # Segundos esperando o login_sucesso
+INTERVALO_RELATORIO = 5  # Segundos entre os relatórios parciais
+
+
+class MetricasCarga:
+    """Contadores e tempos até o match coletados durante a execução"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.clientes = 0
+        self.ativos = 0
+        self.logins = 0
+        self.entradas_fila = 0
+        self.matches = 0  # Eventos match_encontrado (um por jogador, dois por partida)
+        self.abandonos = 0
+        self.erros = 0
+        self.tempos_match: List[float] = []
+
+    def resumo(self) -> Dict:
+        duracao = time.perf_counter() - self.inicio
+        partidas = self.matches / 2
+        resumo = {
+            'duracao': duracao,
+            'clientes': self.clientes,
+            'ativos': self.ativos,
+            'logins': self.logins,
+            'entradas_fila': self.entradas_fila,
+            'partidas': partidas,
+            'partidas_por_segundo': partidas / duracao if duracao > 0 else 0.0,
+            'abandonos': self.abandonos,
+            'erros': self.erros
+        }
+        if self.tempos_match:
+            valores = np.percentile(self.tempos_match, PERCENTIS)
+            for percentil, valor in zip(PERCENTIS, valores):
+                resumo[f'p{percentil}_tempo_match'] = float(valor)
+        return resumo
+
+
+class ClienteSimulado:
+    """Versão assíncrona e sem interação de ClienteMatchmaking"""
+
+    def __init__(self, server_url: str, nickname: str, elo: int, metricas: MetricasCarga):
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.server_url = server_url
+        self.nickname = nickname
+        self.elo = elo
+        self.metricas = metricas
+        self.em_fila = False
+        self.entrada_fila: Optional[float] = None
+        self.logado = asyncio.Event()
+        self.match = asyncio.Event()
+        
+        # Configura os eventos
+        self.sio.on('login_sucesso', self.on_login_sucesso)
+        self.sio.on('error', self.on_error)
+        self.sio.on('match_encontrado', self.on_match_encontrado)
+
+    async def conectar(self):
+        await self.sio.connect(self.server_url, transports=['websocket'])
+
+    async def login(self) -> bool:
+        await self.sio.emit('login', {
+            'nickname': self.nickname,
+            'elo': self.elo
+        })
+        try:
+            await asyncio.wait_for(self.logado.wait(), TIMEOUT_LOGIN)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def entrar_fila(self):
+        self.match.clear()
+        self.em_fila = True
+        self.entrada_fila = time.perf_counter()
+        await self.sio.emit('entrar_fila')
+
+    async def sair_fila(self):
+        self.em_fila = False
+        await self.sio.emit('sair_fila')
+
+    async def desconectar(self):
+        await self.sio.disconnect()
+
+    async def on_login_sucesso(self, data):
+        self.elo = data['estatisticas']['elo']
+        self.logado.set()
+
+    async def on_error(self, data):
+        self.metricas.erros += 1
+        logger.debug(f"{self.nickname}: {data.get('message')}")
+
+    async def on_match_encontrado(self, data):
+        if self.em_fila and self.entrada_fila is not None:
+            self.metricas.tempos_match.append(time.perf_counter() - self.entrada_fila)
+        self.metricas.matches += 1
+        self.elo = data.get('novo_elo', self.elo)
+        self.em_fila = False
+        self.match.set()
+
+
+class GeradorCarga:
+    """Chegadas de Poisson de clientes que entram na fila e esperam o match ou desistem.
+    
+    Cada cliente desiste após um tempo exponencial com taxa `taxa_abandono`
+    (por segundo na fila; 0 desativa) e joga `partidas_por_cliente` partidas
+    antes de desconectar.
+    """
+
+    def __init__(self, server_url: str, taxa_chegada: float, duracao: float, taxa_abandono: float = 0.0,
+                 elo_media: float = 1500, elo_desvio: float = 300, distribuicao_elo: str = 'normal',
+                 partidas_por_cliente: int = 1, max_clientes: int = 5000, espera_final: float = 60,
+                 prefixo: Optional[str] = None, seed: Optional[int] = None):
+        self.server_url = server_url
+        self.taxa_chegada = taxa_chegada
+        self.duracao = duracao
+        self.taxa_abandono = taxa_abandono
+        self.elo_media = elo_media
+        self.elo_desvio = elo_desvio
+        self.distribuicao_elo = distribuicao_elo
+        self.partidas_por_cliente = partidas_por_cliente
+        self.max_clientes = max_clientes
+        self.espera_final = espera_final
+        # Nicknames novos a cada execução, para não herdar o elo salvo no banco
+        self.prefixo = prefixo or f"Carga{int(time.time())}"
+        self.rng = random.Random(seed)
+        self.metricas = MetricasCarga()
+
+    def sortear_elo(self) -> int:
+        if self.distribuicao_elo == 'uniforme':
+            return int(self.rng.uniform(self.elo_media - self.elo_desvio, self.elo_media + self.elo_desvio))
+        return int(self.rng.gauss(self.elo_media, self.elo_desvio))
+
+    def sortear_paciencia(self) -> Optional[float]:
+        """Segundos até o cliente desistir da fila (None: espera até o fim)"""
+        if self.taxa_abandono <= 0:
+            return None
+        return self.rng.expovariate(self.taxa_abandono)
+
+    async def executar_cliente(self, indice: int, limite: asyncio.Semaphore):
+        metricas = self.metricas
+        cliente = ClienteSimulado(self.server_url, f"{self.prefixo}_{indice}", self.sortear_elo(), metricas)
+        async with limite:
+            metricas.ativos += 1
+            try:
+                await cliente.conectar()
+                if not await cliente.login():
+                    metricas.erros += 1
+                    return
+                metricas.logins += 1
+                
+                for _ in range(self.partidas_por_cliente):
+                    await cliente.entrar_fila()
+                    metricas.entradas_fila += 1
+                    try:
+                        await asyncio.wait_for(cliente.match.wait(), self.sortear_paciencia())
+                    except asyncio.TimeoutError:
+                        metricas.abandonos += 1
+                        await cliente.sair_fila()
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metricas.erros += 1
+                logger.debug(f"Erro no cliente {cliente.nickname}: {e}")
+            finally:
+                metricas.ativos -= 1
+                try:
+                    await cliente.desconectar()
+                except Exception:
+                    pass
+
+    async def relatar(self):
+        while True:
+            await asyncio.sleep(INTERVALO_RELATORIO)
+            resumo = self.metricas.resumo()
+            logger.info(f"[{resumo['duracao']:.0f}s] clientes={resumo['clientes']} ativos={resumo['ativos']} "
+                        f"partidas={resumo['partidas']:.0f} ({resumo['partidas_por_segundo']:.1f}/s) "
+                        f"abandonos={resumo['abandonos']} erros={resumo['erros']}")
+
+    async def executar(self) -> Dict:
+        limite = asyncio.Semaphore(self.max_clientes)
+        tarefas = []
+        relatorio = asyncio.ensure_future(self.relatar())
+        self.metricas = MetricasCarga()
+        fim_chegadas = time.perf_counter() + self.duracao
+        
+        # Chegadas de Poisson: intervalos exponenciais entre clientes
+        while time.perf_counter() < fim_chegadas:
+            tarefas.append(asyncio.ensure_future(self.executar_cliente(len(tarefas), limite)))
+            self.metricas.clientes += 1
+            await asyncio.sleep(self.rng.expovariate(self.taxa_chegada))
+        
+        # Espera os clientes ainda na fila e cancela quem passar do limite
+        if tarefas:
+            _, pendentes = await asyncio.wait(tarefas, timeout=self.espera_final)
+            for tarefa in pendentes:
+                tarefa.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+        relatorio.cancel()
+        return self.metricas.resumo()
+
+
+def imprimir_resumo(resumo: Dict):
+    print("\n=== RESULTADO DA CARGA ===")
+    print(f"Duração: {resumo['duracao']:.1f} s")
+    print(f"Clientes: {resumo['clientes']} (logins: {resumo['logins']}, entradas na fila: {resumo['entradas_fila']})")
+    print(f"Partidas: {resumo['partidas']:.0f} ({resumo['partidas_por_segundo']:.2f} partidas/s)")
+    print(f"Abandonos: {resumo['abandonos']}  Erros: {resumo['erros']}")
+    for percentil in PERCENTIS:
+        chave = f'p{percentil}_tempo_match'
+        if chave in resumo:
+            print(f"Tempo até o match p{percentil}: {resumo[chave]:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor de matchmaking")
+    parser.add_argument('--url', default="http://localhost:5000")
+    parser.add_argument('--taxa-chegada', type=float, default=50, help='clientes novos por segundo')
+    parser.add_argument('--duracao', type=float, default=60, help='segundos gerando chegadas')
+    parser.add_argument('--taxa-abandono', type=float, default=0.0,
+                        help='taxa de desistência por segundo na fila (0 desativa)')
+    parser.add_argument('--elo-media', type=float, default=1500)
+    parser.add_argument('--elo-desvio', type=float, default=300,
+                        help='desvio padrão (normal) ou meia largura do intervalo (uniforme)')
+    parser.add_argument('--distribuicao-elo', choices=('normal', 'uniforme'), default='normal')
+    parser.add_argument('--partidas-por-cliente', type=int, default=1)
+    parser.add_argument('--max-clientes', type=int, default=5000, help='conexões simultâneas')
+    parser.add_argument('--espera-final', type=float, default=60,
+                        help='segundos esperando os clientes ainda na fila ao fim das chegadas')
+    parser.add_argument('--prefixo', help='prefixo dos nicknames (padrão: Carga<timestamp>)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    
+    # Os logs de conexão do socketio poluiriam a saída com milhares de clientes
+    logging.getLogger('socketio').setLevel(logging.WARNING)
+    logging.getLogger('engineio').setLevel(logging.WARNING)
+    
+    gerador = GeradorCarga(
+        args.url, args.taxa_chegada, args.duracao,
+        taxa_abandono=args.taxa_abandono,
+        elo_media=args.elo_media,
+        elo_desvio=args.elo_desvio,
+        distribuicao_elo=args.distribuicao_elo,
+        partidas_por_cliente=args.partidas_por_cliente,
+        max_clientes=args.max_clientes,
+        espera_final=args.espera_final,
+        prefixo=args.prefixo,
+        seed=args.seed
+    )
+    try:
+        resumo = asyncio.run(gerador.executar())
+    except KeyboardInterrupt:
+        logger.info("Gerador de carga interrompido pelo usuário")
+        resumo = gerador.metricas.resumo()
+    imprimir_resumo(resumo)
+
+if __name__ == "__main__":
+    main()
@@ -1,411 +1,1305 @@
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-from typing import List, Dict, Tuple
-import joblib
-import os
-from datetime import datetime, timedelta
-import warnings
-import logging
-
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-warnings.filterwarnings('ignore')
-
-class SistemaIA:
-    def __init__(self):
-        self.modelo_performance = None
-        self.modelo_clustering = None
-        self.scaler = StandardScaler()
-        self.modelo_treinado = False
-        self.carregar_modelos()
-        self.treinar_com_dados_iniciais()
-
-    def carregar_modelos(self):
-        try:
-            if os.path.exists('modelo_performance.pkl'):
-                self.modelo_performance = joblib.load('modelo_performance.pkl')
-                self.modelo_treinado = True
-            else:
-                self.modelo_performance = RandomForestRegressor(n_estimators=100, random_state=42)
-                self.modelo_treinado = False
-
-            if os.path.exists('modelo_clustering.pkl'):
-                self.modelo_clustering = joblib.load('modelo_clustering.pkl')
-            else:
-                self.modelo_clustering = KMeans(n_clusters=3, random_state=42)
-                
-            if os.path.exists('scaler.pkl'):
-                self.scaler = joblib.load('scaler.pkl')
-            else:
-                self.scaler = StandardScaler()
-        except Exception as e:
-            print(f"Erro ao carregar modelos: {e}")
-            self.modelo_performance = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.modelo_clustering = KMeans(n_clusters=3, random_state=42)
-            self.scaler = StandardScaler()
-            self.modelo_treinado = False
-
-    def treinar_com_dados_iniciais(self):
-        """Treina o modelo com dados iniciais para evitar erros de predição"""
-        if self.modelo_treinado:
-            return
-
-        dados_iniciais = [
-            {
-                'estatisticas': {
-                    'mmr': 1000,
-                    'kills': 10,
-                    'deaths': 5,
-                    'vitorias': 5,
-                    'partidas_jogadas': 10,
-                    'ping_medio': 50,
-                    'comportamento': 3,
-                    'abandonos': 0,
-                    'reports': 0
-                }
-            },
-            {
-                'estatisticas': {
-                    'mmr': 1500,
-                    'kills': 15,
-                    'deaths': 3,
-                    'vitorias': 8,
-                    'partidas_jogadas': 10,
-                    'ping_medio': 40,
-                    'comportamento': 4,
-                    'abandonos': 0,
-                    'reports': 0
-                }
-            },
-            {
-                'estatisticas': {
-                    'mmr': 2000,
-                    'kills': 20,
-                    'deaths': 2,
-                    'vitorias': 9,
-                    'partidas_jogadas': 10,
-                    'ping_medio': 30,
-                    'comportamento': 5,
-                    'abandonos': 0,
-                    'reports': 0
-                }
-            }
-        ]
-        
-        try:
-            self.treinar_modelo_performance(dados_iniciais)
-            self.modelo_treinado = True
-        except Exception as e:
-            print(f"Erro ao treinar com dados iniciais: {e}")
-
-    def salvar_modelos(self):
-        try:
-            joblib.dump(self.modelo_performance, 'modelo_performance.pkl')
-            joblib.dump(self.modelo_clustering, 'modelo_clustering.pkl')
-            joblib.dump(self.scaler, 'scaler.pkl')
-        except Exception as e:
-            print(f"Erro ao salvar modelos: {e}")
-
-    def calcular_metricas(self, jogador: dict) -> dict:
-        """Calcula métricas importantes para o matchmaking"""
-        try:
-            stats = jogador['estatisticas']
-            
-            # Garante que todas as métricas necessárias existam
-            if 'kills' not in stats:
-                stats['kills'] = 0
-            if 'deaths' not in stats:
-                stats['deaths'] = 0
-            if 'assists' not in stats:
-                stats['assists'] = 0
-            if 'vitorias' not in stats:
-                stats['vitorias'] = 0
-            if 'derrotas' not in stats:
-                stats['derrotas'] = 0
-            if 'elo' not in stats:
-                stats['elo'] = 1000  # Valor padrão
-            
-            # Calcula métricas
-            partidas_jogadas = stats.get('vitorias', 0) + stats.get('derrotas', 0)
-            kd_ratio = stats['kills'] / max(1, stats['deaths'])
-            win_rate = (stats['vitorias'] / max(1, partidas_jogadas)) * 100
-            
-            return {
-                'mmr': stats['elo'],
-                'kd_ratio': kd_ratio,
-                'win_rate': win_rate,
-                'ping_medio': stats.get('ping_medio', 50),
-                'toxicidade': stats.get('toxicidade', 0)
-            }
-        except Exception as e:
-            logger.error(f"Erro ao calcular métricas: {e}")
-            # Retorna valores padrão em caso de erro
-            return {
-                'mmr': 1000,
-                'kd_ratio': 1.0,
-                'win_rate': 50.0,
-                'ping_medio': 50,
-                'toxicidade': 0
-            }
-
-    def preparar_dados_treinamento(self, jogadores: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
-        if not jogadores:
-            return np.array([]), np.array([])
-            
-        X = []
-        y = []
-        
-        for jogador in jogadores:
-            try:
-                metricas = self.calcular_metricas(jogador)
-                
-                features = [
-                    metricas['mmr'],
-                    metricas['kd_ratio'],
-                    metricas['win_rate'],
-                    metricas['ping_medio'],
-                    metricas['toxicidade']
-                ]
-                X.append(features)
-                y.append(metricas['mmr'])
-            except Exception as e:
-                print(f"Erro ao preparar dados de treinamento: {e}")
-                continue
-            
-        return np.array(X), np.array(y)
-
-    def treinar_modelo_performance(self, dados_treinamento: List[Dict]):
-        if not dados_treinamento:
-            return
-            
-        try:
-            X, y = self.preparar_dados_treinamento(dados_treinamento)
-            if len(X) == 0:
-                return
-                
-            X_scaled = self.scaler.fit_transform(X)
-            self.modelo_performance.fit(X_scaled, y)
-            self.modelo_treinado = True
-            self.salvar_modelos()
-        except Exception as e:
-            print(f"Erro ao treinar modelo: {e}")
-
-    def predizer_performance(self, jogador: Dict) -> float:
-        if not jogador or 'estatisticas' not in jogador:
-            return 1000.0  # Valor padrão seguro
-            
-        try:
-            if not self.modelo_treinado:
-                return jogador['estatisticas']['mmr']  # Retorna MMR atual se modelo não treinado
-                
-            metricas = self.calcular_metricas(jogador)
-            
-            features = np.array([
-                metricas['mmr'],
-                metricas['kd_ratio'],
-                metricas['win_rate'],
-                metricas['ping_medio'],
-                metricas['toxicidade']
-            ]).reshape(1, -1)
-            
-            # Garante que o scaler está treinado
-            if not hasattr(self.scaler, 'mean_'):
-                X, _ = self.preparar_dados_treinamento([jogador])
-                if len(X) > 0:
-                    self.scaler.fit(X)
-            
-            features_scaled = self.scaler.transform(features)
-            return self.modelo_performance.predict(features_scaled)[0]
-        except Exception as e:
-            print(f"Erro ao prever performance: {e}")
-            return jogador['estatisticas']['mmr']  # Retorna MMR atual em caso de erro
-
-    def detectar_smurf(self, jogador: Dict) -> Tuple[bool, float]:
-        if not jogador or 'estatisticas' not in jogador:
-            return False, 0.0
-            
-        try:
-            padroes_suspeitos = 0
-            metricas = self.calcular_metricas(jogador)
-            
-            # 1. Win rate muito alta
-            if metricas['win_rate'] > 80:
-                padroes_suspeitos += 1
-                
-            # 2. K/D ratio muito alto
-            if metricas['kd_ratio'] > 5:
-                padroes_suspeitos += 1
-                
-            # 3. MMR subindo muito rápido
-            if 'mmr_historico' in jogador['estatisticas'] and len(jogador['estatisticas']['mmr_historico']) > 10:
-                mmr_inicial = jogador['estatisticas']['mmr_historico'][0]
-                mmr_atual = jogador['estatisticas']['mmr']
-                if (mmr_atual - mmr_inicial) > 500:
-                    padroes_suspeitos += 1
-                    
-            # 4. Poucas partidas jogadas
-            if jogador['estatisticas']['partidas_jogadas'] < 20:
-                padroes_suspeitos += 1
-                
-            probabilidade_smurf = padroes_suspeitos / 4
-            return probabilidade_smurf > 0.5, probabilidade_smurf
-        except Exception as e:
-            print(f"Erro ao detectar smurf: {e}")
-            return False, 0.0
-
-    def detectar_toxicidade(self, jogador: Dict) -> Tuple[bool, float]:
-        if not jogador or 'estatisticas' not in jogador:
-            return False, 0.0
-            
-        try:
-            padroes_toxicos = 0
-            
-            # 1. Alta taxa de abandono
-            if jogador['estatisticas']['abandonos'] / max(1, jogador['estatisticas']['partidas_jogadas']) * 100 > 20:
-                padroes_toxicos += 1
-                
-            # 2. Muitos reports
-            if jogador['estatisticas']['reports'] > 5:
-                padroes_toxicos += 1
-                
-            # 3. Comportamento ruim
-            if jogador['estatisticas']['comportamento'] < 3:
-                padroes_toxicos += 1
-                
-            probabilidade_toxicidade = padroes_toxicos / 3
-            return probabilidade_toxicidade > 0.5, probabilidade_toxicidade
-        except Exception as e:
-            print(f"Erro ao detectar toxicidade: {e}")
-            return False, 0.0
-
-    def agrupar_jogadores(self, jogadores: List[dict]) -> Dict[int, List[dict]]:
-        """Agrupa jogadores usando clustering baseado em múltiplas características"""
-        try:
-            if not jogadores or len(jogadores) < 2:
-                return {}
-            
-            # Prepara dados para clustering
-            dados = []
-            for jogador in jogadores:
-                metricas = self.calcular_metricas(jogador)
-                dados.append([
-                    metricas['mmr'],
-                    metricas['kd_ratio'],
-                    metricas['win_rate'],
-                    metricas['ping_medio'],
-                    metricas['toxicidade']
-                ])
-            
-            if not dados:
-                return {}
-            
-            # Normaliza os dados
-            dados = np.array(dados)
-            if not hasattr(self, 'scaler'):
-                self.scaler = StandardScaler()
-                self.scaler.fit(dados)
-            
-            dados_normalizados = self.scaler.transform(dados)
-            
-            # Aplica clustering
-            if not hasattr(self, 'kmeans'):
-                n_clusters = min(3, len(jogadores))
-                self.kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-                self.kmeans.fit(dados_normalizados)
-            
-            grupos = self.kmeans.predict(dados_normalizados)
-            
-            # Organiza jogadores por grupo
-            resultado = {}
-            for i, grupo in enumerate(grupos):
-                if grupo not in resultado:
-                    resultado[grupo] = []
-                resultado[grupo].append(jogadores[i])
-            
-            logger.info(f"Jogadores agrupados em {len(resultado)} grupos")
-            for grupo, membros in resultado.items():
-                logger.info(f"Grupo {grupo}: {len(membros)} jogadores")
-                for m in membros:
-                    logger.info(f"  - {m['nickname']} (MMR: {m['estatisticas']['elo']})")
-            
-            return resultado
-        except Exception as e:
-            logger.error(f"Erro ao agrupar jogadores: {e}")
-            # Em caso de erro, agrupa por MMR
-            resultado = {0: []}
-            for jogador in jogadores:
-                resultado[0].append(jogador)
-            return resultado
-
-    def recomendar_teammates(self, jogador: Dict, todos_jogadores: List[Dict], 
-                           n_recomendacoes: int = 5) -> List[Dict]:
-        if not jogador or not todos_jogadores:
-            return []
-            
-        try:
-            # Agrupa jogadores
-            grupos = self.agrupar_jogadores(todos_jogadores)
-            
-            # Encontra o cluster do jogador
-            cluster_jogador = None
-            for cluster, membros in grupos.items():
-                if any(m['nickname'] == jogador['nickname'] for m in membros):
-                    cluster_jogador = cluster
-                    break
-                    
-            if cluster_jogador is None:
-                return []
-                
-            # Filtra recomendações
-            recomendacoes = []
-            for membro in grupos[cluster_jogador]:
-                if membro['nickname'] != jogador['nickname']:
-                    score = self.calcular_score_compatibilidade(jogador, membro)
-                    recomendacoes.append((membro, score))
-                    
-            # Ordena por score e retorna os melhores
-            recomendacoes.sort(key=lambda x: x[1], reverse=True)
-            return [r[0] for r in recomendacoes[:n_recomendacoes]]
-        except Exception as e:
-            print(f"Erro ao recomendar teammates: {e}")
-            return []
-
-    def calcular_score_compatibilidade(self, jogador1: Dict, jogador2: Dict) -> float:
-        if not jogador1 or not jogador2:
-            return 0.0
-            
-        try:
-            scores = []
-            
-            # 1. Diferença de MMR
-            diff_mmr = abs(jogador1['estatisticas']['mmr'] - jogador2['estatisticas']['mmr'])
-            score_mmr = max(0, 1 - (diff_mmr / 500))
-            
-            # 2. Compatibilidade de região
-            if jogador1['regiao'] == jogador2['regiao']:
-                score_regiao = 1.0
-            else:
-                score_regiao = 0.5
-                
-            # 3. Compatibilidade de estilo
-            if jogador1['estatisticas']['estilo_jogo'] == jogador2['estatisticas']['estilo_jogo']:
-                score_estilo = 1.0
-            else:
-                score_estilo = 0.7
-                
-            # 4. Comportamento
-            score_comportamento = (jogador1['estatisticas']['comportamento'] + 
-                                 jogador2['estatisticas']['comportamento']) / 10
-            
-            # Combina scores
-            scores = [score_mmr, score_regiao, score_estilo, score_comportamento]
-            pesos = [0.4, 0.3, 0.2, 0.1]
-            
-            return sum(s * p for s, p in zip(scores, pesos))
-        except Exception as e:
-            print(f"Erro ao calcular score de compatibilidade: {e}")
-            return 0.5  # Score médio em caso de erro 
\ No newline at end of file
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.base import clone
+from sklearn.neighbors import KDTree
+from typing import Callable, List, Dict, Tuple, Optional
+import joblib
+import os
+from datetime import datetime, timedelta
+import warnings
+import threading
+import queue
+import time
+import tracemalloc
+import logging
+from metricas import LATENCIA_INFERENCIA, cronometrado
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+warnings.filterwarnings('ignore')
+
+# Política padrão do retreino em segundo plano
+PARTIDAS_POR_TREINO = 100
+INTERVALO_TREINO = 300  # segundos
+LIMIAR_DRIFT = 150.0  # erro médio de predição (em MMR) que dispara um retreino
+MINIMO_JOGADORES_TREINO = 10
+N_CLUSTERS = 3  # grupos do KMeans, treinado junto com o modelo quando há ao menos MINIMO_JOGADORES_TREINO
+
+# Regras de moderação (compartilhadas pela detecção individual e pela pontuação em lote)
+LIMITE_WIN_RATE_SMURF = 80
+LIMITE_KD_SMURF = 5
+LIMITE_GANHO_MMR_SMURF = 500
+MINIMO_HISTORICO_MMR = 10
+MINIMO_PARTIDAS_SMURF = 20
+LIMITE_TAXA_ABANDONO = 20
+LIMITE_REPORTS = 5
+LIMITE_COMPORTAMENTO = 3
+
+# Índice de vizinhos para recomendação de teammates
+TAMANHO_BUFFER_INDICE = 256  # inserções pendentes antes de reconstruir a árvore
+FRACAO_RECONSTRUCAO = 0.25  # fração de linhas removidas que força a reconstrução
+LIMITE_DISTORCAO_INDICE = 2.0  # razão máxima entre as escalas da árvore e do scaler atual antes de reconstruir
+CANDIDATOS_POR_RECOMENDACAO = 4  # vizinhos buscados por recomendação pedida
+
+# Pesos do score de compatibilidade: MMR, região, estilo e comportamento
+PESOS_COMPATIBILIDADE = (0.4, 0.3, 0.2, 0.1)
+
+# Colunas usadas pela pontuação de moderação em lote
+COLUNAS_MODERACAO = ('win_rate', 'kd_ratio', 'ganho_mmr', 'partidas_jogadas',
+                     'taxa_abandono', 'reports', 'comportamento')
+
+
+class ModelosPerformance:
+    """Scaler, modelo de performance e KMeans treinados juntos e publicados como uma unidade.
+    
+    A inferência lê `SistemaIA.modelos` uma única vez e usa o conjunto
+    inteiro, então uma troca feita por outra thread nunca mistura o scaler de
+    um treino com o modelo ou os clusters de outro. `clustering` é None
+    enquanto não houver um KMeans treinado no espaço desse scaler.
+    """
+    __slots__ = ('scaler', 'modelo', 'treinado', 'versao', 'treinado_em', 'clustering')
+
+    def __init__(self, scaler: StandardScaler, modelo: RandomForestRegressor, treinado: bool, versao: int,
+                 clustering: Optional[KMeans] = None):
+        self.scaler = scaler
+        self.modelo = modelo
+        self.treinado = treinado
+        self.versao = versao
+        self.treinado_em = datetime.now()
+        self.clustering = clustering
+
+
+class CodificadorCategorias:
+    """Atribui a cada valor categórico (região, estilo) um código inteiro pequeno e estável"""
+
+    def __init__(self):
+        self.codigos: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def codificar(self, valores: List[str]) -> np.ndarray:
+        codigos = self.codigos
+        novos = [valor for valor in set(valores) if valor not in codigos]
+        if novos:
+            with self._lock:
+                for valor in novos:
+                    codigos.setdefault(valor, len(codigos))
+        return np.fromiter((codigos[valor] for valor in valores), dtype=np.int16, count=len(valores))
+
+
+class SistemaIA:
+    def __init__(self):
+        self.modelos: Optional[ModelosPerformance] = None
+        self._lock_modelos = threading.Lock()
+        self.codigos_regiao = CodificadorCategorias()
+        self.codigos_estilo = CodificadorCategorias()
+        self.carregar_modelos()
+        self.treinar_com_dados_iniciais()
+
+    @property
+    def scaler(self) -> StandardScaler:
+        return self.modelos.scaler
+
+    @property
+    def modelo_performance(self) -> RandomForestRegressor:
+        return self.modelos.modelo
+
+    @property
+    def modelo_clustering(self) -> Optional[KMeans]:
+        return self.modelos.clustering if self.modelos else None
+
+    @property
+    def modelo_treinado(self) -> bool:
+        return self.modelos.treinado
+
+    @property
+    def versao_modelos(self) -> int:
+        """Incrementada sempre que o scaler ou o modelo mudam"""
+        return self.modelos.versao if self.modelos else 0
+
+    def publicar_modelos(self, scaler: StandardScaler, modelo: RandomForestRegressor, treinado: bool,
+                         clustering: Optional[KMeans] = None) -> ModelosPerformance:
+        """Troca atomicamente o scaler, o modelo e o KMeans usados pela inferência"""
+        with self._lock_modelos:
+            self.modelos = ModelosPerformance(scaler, modelo, treinado, self.versao_modelos + 1, clustering)
+            return self.modelos
+
+    def carregar_modelos(self):
+        try:
+            if os.path.exists('modelo_performance.pkl'):
+                modelo_performance = joblib.load('modelo_performance.pkl')
+                modelo_treinado = True
+            else:
+                modelo_performance = RandomForestRegressor(n_estimators=100, random_state=42)
+                modelo_treinado = False
+
+            if os.path.exists('scaler.pkl'):
+                scaler = joblib.load('scaler.pkl')
+            else:
+                scaler = StandardScaler()
+            
+            # O KMeans só vale no espaço do scaler com que foi treinado
+            clustering = None
+            if os.path.exists('modelo_clustering.pkl') and hasattr(scaler, 'mean_'):
+                clustering = joblib.load('modelo_clustering.pkl')
+                if not hasattr(clustering, 'cluster_centers_'):
+                    clustering = None
+            self.publicar_modelos(scaler, modelo_performance, modelo_treinado, clustering)
+        except Exception as e:
+            print(f"Erro ao carregar modelos: {e}")
+            self.publicar_modelos(StandardScaler(), RandomForestRegressor(n_estimators=100, random_state=42), False)
+
+    def treinar_com_dados_iniciais(self):
+        """Treina o modelo com dados iniciais para evitar erros de predição"""
+        if self.modelo_treinado:
+            return
+
+        dados_iniciais = [
+            {
+                'estatisticas': {
+                    'mmr': 1000,
+                    'kills': 10,
+                    'deaths': 5,
+                    'vitorias': 5,
+                    'partidas_jogadas': 10,
+                    'ping_medio': 50,
+                    'comportamento': 3,
+                    'abandonos': 0,
+                    'reports': 0
+                }
+            },
+            {
+                'estatisticas': {
+                    'mmr': 1500,
+                    'kills': 15,
+                    'deaths': 3,
+                    'vitorias': 8,
+                    'partidas_jogadas': 10,
+                    'ping_medio': 40,
+                    'comportamento': 4,
+                    'abandonos': 0,
+                    'reports': 0
+                }
+            },
+            {
+                'estatisticas': {
+                    'mmr': 2000,
+                    'kills': 20,
+                    'deaths': 2,
+                    'vitorias': 9,
+                    'partidas_jogadas': 10,
+                    'ping_medio': 30,
+                    'comportamento': 5,
+                    'abandonos': 0,
+                    'reports': 0
+                }
+            }
+        ]
+        
+        try:
+            self.treinar_modelo_performance(dados_iniciais)
+        except Exception as e:
+            print(f"Erro ao treinar com dados iniciais: {e}")
+
+    def salvar_modelos(self, modelos: Optional[ModelosPerformance] = None):
+        """Grava os modelos em arquivos temporários e os troca de uma vez com os atuais"""
+        modelos = modelos or self.modelos
+        try:
+            for objeto, arquivo in ((modelos.modelo, 'modelo_performance.pkl'),
+                                    (modelos.clustering, 'modelo_clustering.pkl'),
+                                    (modelos.scaler, 'scaler.pkl')):
+                if objeto is None:
+                    # Um KMeans antigo não serve para o scaler novo
+                    if os.path.exists(arquivo):
+                        os.remove(arquivo)
+                    continue
+                joblib.dump(objeto, arquivo + '.tmp')
+                os.replace(arquivo + '.tmp', arquivo)
+        except Exception as e:
+            print(f"Erro ao salvar modelos: {e}")
+
+    def calcular_metricas(self, jogador: dict) -> dict:
+        """Calcula métricas importantes para o matchmaking"""
+        try:
+            stats = jogador['estatisticas']
+            
+            # Garante que todas as métricas necessárias existam
+            if 'kills' not in stats:
+                stats['kills'] = 0
+            if 'deaths' not in stats:
+                stats['deaths'] = 0
+            if 'assists' not in stats:
+                stats['assists'] = 0
+            if 'vitorias' not in stats:
+                stats['vitorias'] = 0
+            if 'derrotas' not in stats:
+                stats['derrotas'] = 0
+            if 'elo' not in stats:
+                stats['elo'] = 1000  # Valor padrão
+            
+            # Calcula métricas
+            partidas_jogadas = stats.get('vitorias', 0) + stats.get('derrotas', 0)
+            kd_ratio = stats['kills'] / max(1, stats['deaths'])
+            win_rate = (stats['vitorias'] / max(1, partidas_jogadas)) * 100
+            
+            return {
+                'mmr': stats['elo'],
+                'kd_ratio': kd_ratio,
+                'win_rate': win_rate,
+                'ping_medio': stats.get('ping_medio', 50),
+                'toxicidade': stats.get('toxicidade', 0)
+            }
+        except Exception as e:
+            logger.error(f"Erro ao calcular métricas: {e}")
+            # Retorna valores padrão em caso de erro
+            return {
+                'mmr': 1000,
+                'kd_ratio': 1.0,
+                'win_rate': 50.0,
+                'ping_medio': 50,
+                'toxicidade': 0
+            }
+
+    def preparar_dados_treinamento(self, jogadores: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        if not jogadores:
+            return np.array([]), np.array([])
+            
+        X = []
+        y = []
+        
+        for jogador in jogadores:
+            try:
+                metricas = self.calcular_metricas(jogador)
+                
+                features = [
+                    metricas['mmr'],
+                    metricas['kd_ratio'],
+                    metricas['win_rate'],
+                    metricas['ping_medio'],
+                    metricas['toxicidade']
+                ]
+                X.append(features)
+                y.append(metricas['mmr'])
+            except Exception as e:
+                print(f"Erro ao preparar dados de treinamento: {e}")
+                continue
+            
+        return np.array(X), np.array(y)
+
+    def treinar_modelo_performance(self, dados_treinamento: List[Dict]) -> bool:
+        """Treina um novo scaler/modelo ao lado dos atuais e só então os publica.
+        
+        Enquanto o treino roda a inferência continua usando os modelos antigos.
+        """
+        if not dados_treinamento:
+            return False
+            
+        try:
+            X, y = self.preparar_dados_treinamento(dados_treinamento)
+            if len(X) == 0:
+                return False
+                
+            scaler = StandardScaler()
+            modelo_performance = clone(self.modelo_performance)
+            X_scaled = scaler.fit_transform(X)
+            modelo_performance.fit(X_scaled, y)
+            modelos = self.publicar_modelos(scaler, modelo_performance, True, self.treinar_clustering(X_scaled))
+            self.salvar_modelos(modelos)
+            return True
+        except Exception as e:
+            print(f"Erro ao treinar modelo: {e}")
+            return False
+
+    def treinar_clustering(self, X_scaled: np.ndarray) -> Optional[KMeans]:
+        """KMeans treinado nos dados já normalizados, ou None se houver poucos jogadores"""
+        if len(X_scaled) < max(N_CLUSTERS, MINIMO_JOGADORES_TREINO):
+            return None
+        return KMeans(n_clusters=N_CLUSTERS, n_init=10, random_state=42).fit(X_scaled)
+
+    def predizer_performance(self, jogador: Dict) -> float:
+        return float(self.predizer_performance_lote([jogador])[0])
+
+    @cronometrado(LATENCIA_INFERENCIA, 'performance')
+    def predizer_performance_lote(self, jogadores: List[Dict]) -> np.ndarray:
+        """Prediz a performance de vários jogadores com um único transform/predict.
+        
+        Jogadores inválidos recebem 1000.0; sem modelo treinado (ou em caso de
+        erro) cada jogador mantém o MMR atual.
+        """
+        mmr_atual = np.array([
+            jogador['estatisticas'].get('mmr', 1000.0) if jogador and 'estatisticas' in jogador else 1000.0
+            for jogador in jogadores
+        ], dtype=float)
+        validos = [i for i, jogador in enumerate(jogadores) if jogador and 'estatisticas' in jogador]
+        modelos = self.modelos
+        if not validos or not modelos.treinado:
+            return mmr_atual
+            
+        try:
+            features = np.array([self.vetor_caracteristicas(jogadores[i]) for i in validos])
+            
+            # Garante que o scaler está treinado
+            if not hasattr(modelos.scaler, 'mean_'):
+                modelos = self.publicar_modelos(StandardScaler().fit(features), modelos.modelo, modelos.treinado)
+            
+            features_scaled = modelos.scaler.transform(features)
+            predicoes = mmr_atual.copy()
+            predicoes[validos] = modelos.modelo.predict(features_scaled)
+            return predicoes
+        except Exception as e:
+            print(f"Erro ao prever performance: {e}")
+            return mmr_atual  # Retorna MMR atual em caso de erro
+
+    def ganho_mmr(self, stats: Dict) -> Optional[float]:
+        """Quanto o MMR subiu desde o primeiro registro, ou None se o histórico for curto.
+        
+        Usa o resumo do histórico (`mmr_inicial`/`mmr_historico_total`) quando
+        presente, para não depender da lista completa de valores.
+        """
+        if stats.get('mmr_inicial') is not None and 'mmr_historico_total' in stats:
+            total = stats['mmr_historico_total']
+            mmr_inicial = stats['mmr_inicial']
+        else:
+            historico = stats.get('mmr_historico') or []
+            total = len(historico)
+            mmr_inicial = historico[0] if total else None
+        
+        if total <= MINIMO_HISTORICO_MMR:
+            return None
+        return stats['mmr'] - mmr_inicial
+
+    def valores_moderacao(self, stats: Dict) -> Tuple[float, ...]:
+        """Valores de COLUNAS_MODERACAO de um jogador, com os padrões usados na detecção individual e em lote.
+        
+        Sem `partidas_jogadas`, vale vitórias + derrotas; abandonos e reports
+        ausentes contam como 0 e o comportamento como REGULAR. `ganho_mmr` é
+        NaN para quem ainda não tem histórico de MMR suficiente.
+        """
+        vitorias = stats.get('vitorias', 0)
+        derrotas = stats.get('derrotas', 0)
+        partidas = stats.get('partidas_jogadas', vitorias + derrotas)
+        ganho_mmr = self.ganho_mmr({'mmr': 1000, **stats})
+        return (
+            vitorias / max(1, vitorias + derrotas) * 100,
+            stats.get('kills', 0) / max(1, stats.get('deaths', 0)),
+            np.nan if ganho_mmr is None else ganho_mmr,
+            partidas,
+            stats.get('abandonos', 0) / max(1, partidas) * 100,
+            stats.get('reports', 0),
+            stats.get('comportamento', LIMITE_COMPORTAMENTO)
+        )
+
+    def detectar_smurf(self, jogador: Dict) -> Tuple[bool, float]:
+        if not jogador or 'estatisticas' not in jogador:
+            return False, 0.0
+            
+        try:
+            padroes_suspeitos = 0
+            win_rate, kd_ratio, ganho_mmr, partidas_jogadas, *_ = self.valores_moderacao(jogador['estatisticas'])
+            
+            # 1. Win rate muito alta
+            if win_rate > LIMITE_WIN_RATE_SMURF:
+                padroes_suspeitos += 1
+                
+            # 2. K/D ratio muito alto
+            if kd_ratio > LIMITE_KD_SMURF:
+                padroes_suspeitos += 1
+                
+            # 3. MMR subindo muito rápido (NaN sem histórico suficiente nunca passa do limite)
+            if ganho_mmr > LIMITE_GANHO_MMR_SMURF:
+                padroes_suspeitos += 1
+                    
+            # 4. Poucas partidas jogadas
+            if partidas_jogadas < MINIMO_PARTIDAS_SMURF:
+                padroes_suspeitos += 1
+                
+            probabilidade_smurf = padroes_suspeitos / 4
+            return probabilidade_smurf > 0.5, probabilidade_smurf
+        except Exception as e:
+            print(f"Erro ao detectar smurf: {e}")
+            return False, 0.0
+
+    def detectar_toxicidade(self, jogador: Dict) -> Tuple[bool, float]:
+        if not jogador or 'estatisticas' not in jogador:
+            return False, 0.0
+            
+        try:
+            padroes_toxicos = 0
+            *_, taxa_abandono, reports, comportamento = self.valores_moderacao(jogador['estatisticas'])
+            
+            # 1. Alta taxa de abandono
+            if taxa_abandono > LIMITE_TAXA_ABANDONO:
+                padroes_toxicos += 1
+                
+            # 2. Muitos reports
+            if reports > LIMITE_REPORTS:
+                padroes_toxicos += 1
+                
+            # 3. Comportamento ruim
+            if comportamento < LIMITE_COMPORTAMENTO:
+                padroes_toxicos += 1
+                
+            probabilidade_toxicidade = padroes_toxicos / 3
+            return probabilidade_toxicidade > 0.5, probabilidade_toxicidade
+        except Exception as e:
+            print(f"Erro ao detectar toxicidade: {e}")
+            return False, 0.0
+
+    def colunas_moderacao(self, jogadores: List[Dict]) -> Dict[str, np.ndarray]:
+        """Monta as colunas de COLUNAS_MODERACAO para uma população de jogadores (ver valores_moderacao)"""
+        linhas = [self.valores_moderacao(jogador.get('estatisticas') or {}) for jogador in jogadores]
+        matriz = np.array(linhas, dtype=np.float64).reshape(-1, len(COLUNAS_MODERACAO))
+        return {coluna: matriz[:, i] for i, coluna in enumerate(COLUNAS_MODERACAO)}
+
+    def colunas_moderacao_brutas(self, brutas: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Versão vetorizada de valores_moderacao sobre estatísticas já em colunas.
+        
+        `brutas` tem uma coluna por campo de database.CAMPOS_MODERACAO, com NaN
+        onde o campo não existe; os padrões são os mesmos de valores_moderacao.
+        """
+        def coluna(campo: str, padrao) -> np.ndarray:
+            valores = brutas[campo]
+            return np.where(np.isnan(valores), padrao, valores)
+        
+        vitorias = coluna('vitorias', 0)
+        derrotas = coluna('derrotas', 0)
+        partidas = coluna('partidas_jogadas', vitorias + derrotas)
+        mmr_inicial = brutas['mmr_inicial']
+        historico_suficiente = (coluna('mmr_historico_total', 0) > MINIMO_HISTORICO_MMR) & ~np.isnan(mmr_inicial)
+        return {
+            'win_rate': vitorias / np.maximum(1, vitorias + derrotas) * 100,
+            'kd_ratio': coluna('kills', 0) / np.maximum(1, coluna('deaths', 0)),
+            'ganho_mmr': np.where(historico_suficiente, coluna('mmr', 1000) - mmr_inicial, np.nan),
+            'partidas_jogadas': partidas,
+            'taxa_abandono': coluna('abandonos', 0) / np.maximum(1, partidas) * 100,
+            'reports': coluna('reports', 0),
+            'comportamento': coluna('comportamento', LIMITE_COMPORTAMENTO)
+        }
+
+    def pontuar_populacao(self, colunas: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Aplica as regras de smurf e toxicidade a toda a população de uma vez.
+        
+        Recebe uma coluna numpy por nome de COLUNAS_MODERACAO e retorna as
+        probabilidades e os flags de cada jogador, com os mesmos limites de
+        `detectar_smurf` e `detectar_toxicidade`.
+        """
+        with np.errstate(invalid='ignore'):
+            padroes_suspeitos = (
+                (colunas['win_rate'] > LIMITE_WIN_RATE_SMURF).astype(np.int8)
+                + (colunas['kd_ratio'] > LIMITE_KD_SMURF)
+                + (colunas['ganho_mmr'] > LIMITE_GANHO_MMR_SMURF)  # NaN nunca passa do limite
+                + (colunas['partidas_jogadas'] < MINIMO_PARTIDAS_SMURF)
+            )
+        padroes_toxicos = (
+            (colunas['taxa_abandono'] > LIMITE_TAXA_ABANDONO).astype(np.int8)
+            + (colunas['reports'] > LIMITE_REPORTS)
+            + (colunas['comportamento'] < LIMITE_COMPORTAMENTO)
+        )
+        
+        probabilidade_smurf = padroes_suspeitos / 4
+        probabilidade_toxicidade = padroes_toxicos / 3
+        return {
+            'prob_smurf': probabilidade_smurf,
+            'eh_smurf': probabilidade_smurf > 0.5,
+            'prob_toxicidade': probabilidade_toxicidade,
+            'eh_toxico': probabilidade_toxicidade > 0.5
+        }
+
+    def vetor_caracteristicas(self, jogador: dict) -> List[float]:
+        """Características usadas no clustering: MMR, K/D, win rate, ping e toxicidade"""
+        metricas = self.calcular_metricas(jogador)
+        return [
+            metricas['mmr'],
+            metricas['kd_ratio'],
+            metricas['win_rate'],
+            metricas['ping_medio'],
+            metricas['toxicidade']
+        ]
+
+    @cronometrado(LATENCIA_INFERENCIA, 'clustering')
+    def prever_clusters(self, dados_normalizados: np.ndarray,
+                        modelos: Optional[ModelosPerformance] = None) -> Optional[np.ndarray]:
+        """Atribui um cluster a cada linha já normalizada, ou None se não houver KMeans treinado.
+        
+        `modelos` deve ser o conjunto cujo scaler normalizou as linhas (por
+        padrão, o publicado agora). O KMeans nunca é treinado aqui: ele vem
+        de `treinar_modelo_performance`, junto com o scaler.
+        """
+        clustering = (modelos or self.modelos).clustering
+        if clustering is None:
+            return None
+        return clustering.predict(np.asarray(dados_normalizados, dtype=np.float64))
+
+    def agrupar_jogadores(self, jogadores: List[dict]) -> Dict[int, List[dict]]:
+        """Agrupa jogadores usando clustering baseado em múltiplas características"""
+        try:
+            if not jogadores or len(jogadores) < 2:
+                return {}
+            
+            # Prepara dados para clustering
+            dados = [self.vetor_caracteristicas(jogador) for jogador in jogadores]
+            
+            if not dados:
+                return {}
+            
+            # Normaliza os dados
+            dados = np.array(dados)
+            modelos = self.modelos
+            if not hasattr(self, 'scaler'):
+                modelos = self.publicar_modelos(StandardScaler().fit(dados), modelos.modelo, modelos.treinado)
+            
+            dados_normalizados = modelos.scaler.transform(dados)
+            
+            # Aplica clustering (sem KMeans treinado, todos ficam no mesmo grupo)
+            grupos = self.prever_clusters(dados_normalizados, modelos)
+            if grupos is None:
+                grupos = np.zeros(len(jogadores), dtype=int)
+            
+            # Organiza jogadores por grupo
+            resultado = {}
+            for i, grupo in enumerate(grupos):
+                if grupo not in resultado:
+                    resultado[grupo] = []
+                resultado[grupo].append(jogadores[i])
+            
+            logger.info(f"Jogadores agrupados em {len(resultado)} grupos")
+            for grupo, membros in resultado.items():
+                logger.info(f"Grupo {grupo}: {len(membros)} jogadores")
+                for m in membros:
+                    logger.info(f"  - {m['nickname']} (MMR: {m['estatisticas']['elo']})")
+            
+            return resultado
+        except Exception as e:
+            logger.error(f"Erro ao agrupar jogadores: {e}")
+            # Em caso de erro, agrupa por MMR
+            resultado = {0: []}
+            for jogador in jogadores:
+                resultado[0].append(jogador)
+            return resultado
+
+    def recomendar_teammates(self, jogador: Dict, todos_jogadores: List[Dict], 
+                           n_recomendacoes: int = 5,
+                           indice: Optional['IndiceVizinhos'] = None) -> List[Dict]:
+        """Recomenda teammates entre os vizinhos mais próximos da mesma região (ver IndiceVizinhos.recomendar).
+        
+        Quem mantém um IndiceVizinhos com `todos_jogadores` deve passá-lo em
+        `indice`; sem ele, um índice temporário é montado a cada chamada.
+        """
+        if not jogador or not todos_jogadores:
+            return []
+            
+        try:
+            if indice is None:
+                indice = IndiceVizinhos(self)
+                indice.adicionar_lote(todos_jogadores)
+            return indice.recomendar(jogador, n_recomendacoes)
+        except Exception as e:
+            print(f"Erro ao recomendar teammates: {e}")
+            return []
+
+    def calcular_score_compatibilidade(self, jogador1: Dict, jogador2: Dict,
+                                       pesos: Tuple[float, ...] = PESOS_COMPATIBILIDADE) -> float:
+        if not jogador1 or not jogador2:
+            return 0.0
+            
+        try:
+            scores = []
+            
+            # 1. Diferença de MMR
+            diff_mmr = abs(jogador1['estatisticas']['mmr'] - jogador2['estatisticas']['mmr'])
+            score_mmr = max(0, 1 - (diff_mmr / 500))
+            
+            # 2. Compatibilidade de região
+            if jogador1['regiao'] == jogador2['regiao']:
+                score_regiao = 1.0
+            else:
+                score_regiao = 0.5
+                
+            # 3. Compatibilidade de estilo
+            if jogador1['estatisticas']['estilo_jogo'] == jogador2['estatisticas']['estilo_jogo']:
+                score_estilo = 1.0
+            else:
+                score_estilo = 0.7
+                
+            # 4. Comportamento
+            score_comportamento = (jogador1['estatisticas']['comportamento'] + 
+                                 jogador2['estatisticas']['comportamento']) / 10
+            
+            # Combina scores
+            scores = [score_mmr, score_regiao, score_estilo, score_comportamento]
+            
+            return sum(s * p for s, p in zip(scores, pesos))
+        except Exception as e:
+            print(f"Erro ao calcular score de compatibilidade: {e}")
+            return 0.5  # Score médio em caso de erro
+
+    def colunas_compatibilidade(self, jogadores: List[Dict]) -> Dict[str, np.ndarray]:
+        """Colunas usadas pelo kernel de compatibilidade, com região e estilo como códigos inteiros"""
+        return {
+            'mmr': np.fromiter((j['estatisticas']['mmr'] for j in jogadores), dtype=np.float64, count=len(jogadores)),
+            'regiao': self.codigos_regiao.codificar([j['regiao'] for j in jogadores]),
+            'estilo': self.codigos_estilo.codificar([j['estatisticas']['estilo_jogo'] for j in jogadores]),
+            'comportamento': np.fromiter((j['estatisticas']['comportamento'] for j in jogadores),
+                                         dtype=np.float64, count=len(jogadores))
+        }
+
+    def matriz_compatibilidade(self, colunas_a: Dict[str, np.ndarray], colunas_b: Dict[str, np.ndarray],
+                               pesos: Tuple[float, ...] = PESOS_COMPATIBILIDADE) -> np.ndarray:
+        """Bloco (len(a), len(b)) da matriz de scores, com as mesmas regras de calcular_score_compatibilidade"""
+        mmr_a = colunas_a['mmr'][:, None]
+        diff_mmr = np.abs(mmr_a - colunas_b['mmr'][None, :])
+        score_mmr = np.maximum(0, 1 - (diff_mmr / 500))
+        score_regiao = np.where(colunas_a['regiao'][:, None] == colunas_b['regiao'][None, :], 1.0, 0.5)
+        score_estilo = np.where(colunas_a['estilo'][:, None] == colunas_b['estilo'][None, :], 1.0, 0.7)
+        score_comportamento = (colunas_a['comportamento'][:, None] + colunas_b['comportamento'][None, :]) / 10
+        
+        # Mesma ordem de soma da versão escalar, para resultados idênticos
+        return (score_mmr * pesos[0] + score_regiao * pesos[1]
+                + score_estilo * pesos[2] + score_comportamento * pesos[3])
+
+    def scores_compatibilidade(self, jogador: Dict, candidatos: List[Dict],
+                               pesos: Tuple[float, ...] = PESOS_COMPATIBILIDADE) -> np.ndarray:
+        """Score de compatibilidade do jogador contra cada candidato, numa única operação vetorizada.
+        
+        Como em calcular_score_compatibilidade, um candidato malformado recebe
+        0.5 (e um vazio, 0.0) sem afetar o score dos demais.
+        """
+        if not jogador or not candidatos:
+            return np.zeros(len(candidatos))
+        
+        try:
+            colunas_jogador = self.colunas_compatibilidade([jogador])
+        except Exception as e:
+            print(f"Erro ao calcular scores de compatibilidade: {e}")
+            return np.full(len(candidatos), 0.5)  # Score médio em caso de erro
+        
+        try:
+            colunas_candidatos = self.colunas_compatibilidade(candidatos)
+            return self.matriz_compatibilidade(colunas_jogador, colunas_candidatos, pesos)[0]
+        except Exception as e:
+            # Algum candidato malformado: pontua só as linhas válidas
+            validos = [i for i, candidato in enumerate(candidatos) if self._compatibilidade_valida(candidato)]
+            print(f"Erro ao calcular scores de compatibilidade de {len(candidatos) - len(validos)} candidatos: {e}")
+            scores = np.array([0.5 if candidato else 0.0 for candidato in candidatos])
+            if validos:
+                colunas_validos = self.colunas_compatibilidade([candidatos[i] for i in validos])
+                scores[validos] = self.matriz_compatibilidade(colunas_jogador, colunas_validos, pesos)[0]
+            return scores
+
+    @staticmethod
+    def _compatibilidade_valida(jogador: Dict) -> bool:
+        """Se o jogador tem os campos numéricos e categóricos usados por colunas_compatibilidade"""
+        try:
+            estatisticas = jogador['estatisticas']
+            float(estatisticas['mmr'])
+            float(estatisticas['comportamento'])
+            hash(jogador['regiao'])
+            hash(estatisticas['estilo_jogo'])
+            return True
+        except Exception:
+            return False
+
+class TreinadorSegundoPlano:
+    """Retreina o modelo de performance numa thread própria, fora do caminho das partidas.
+    
+    `registrar_partida` apenas aplica a política: retreina a cada
+    `partidas_por_treino` partidas, quando passou `intervalo` segundos desde o
+    último treino (e houve partidas novas) ou quando o erro médio das
+    predições passa de `limiar_drift`. A cópia dos dados por `fonte_dados`,
+    o treino e a troca dos modelos acontecem na thread do treinador, enquanto
+    a inferência segue usando os modelos antigos; `fonte_dados` precisa
+    tolerar ser chamada enquanto a população muda. `fechar` espera o treino
+    em andamento e encerra a thread.
+    """
+
+    def __init__(self, fonte_dados: Callable[[], List[Dict]], sistema_ia: Optional[SistemaIA] = None,
+                 partidas_por_treino: int = PARTIDAS_POR_TREINO, intervalo: float = INTERVALO_TREINO,
+                 limiar_drift: float = LIMIAR_DRIFT, minimo_jogadores: int = MINIMO_JOGADORES_TREINO):
+        self.fonte_dados = fonte_dados
+        self._sistema_ia = sistema_ia
+        self.partidas_por_treino = partidas_por_treino
+        self.intervalo = intervalo
+        self.limiar_drift = limiar_drift
+        self.minimo_jogadores = minimo_jogadores
+        
+        self.partidas_desde_treino = 0
+        self.erro_medio: Optional[float] = None
+        self.ultimo_pedido = time.monotonic()
+        self.treinos = 0
+        self.falhas = 0
+        self.duracao_ultimo_treino = 0.0
+        self.duracao_total_treino = 0.0
+        self._treinando = False
+        self._fechado = False
+        self._lock = threading.Lock()
+        # Sinalizada quando o treino em andamento termina
+        self._ocioso = threading.Condition(self._lock)
+        self._pedidos = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._executar, name='treinador-ia', daemon=True)
+        self._thread.start()
+
+    @property
+    def sistema_ia(self) -> SistemaIA:
+        return self._sistema_ia or obter_sistema_ia()
+
+    def registrar_partida(self, erro_predicao: Optional[float] = None) -> bool:
+        """Contabiliza uma partida e agenda um retreino se a política pedir. Retorna True se agendou"""
+        with self._lock:
+            self.partidas_desde_treino += 1
+            if erro_predicao is not None:
+                # Média móvel exponencial do erro absoluto das predições
+                erro = abs(erro_predicao)
+                self.erro_medio = erro if self.erro_medio is None else 0.9 * self.erro_medio + 0.1 * erro
+            
+            if self._fechado or self._treinando or not self._deve_treinar():
+                return False
+            self._treinando = True
+            self.partidas_desde_treino = 0
+            self.erro_medio = None
+            self.ultimo_pedido = time.monotonic()
+        
+        self._pedidos.put(True)
+        return True
+
+    def _deve_treinar(self) -> bool:
+        if self.partidas_desde_treino >= self.partidas_por_treino:
+            return True
+        if time.monotonic() - self.ultimo_pedido >= self.intervalo:
+            return True
+        return self.erro_medio is not None and self.erro_medio > self.limiar_drift
+
+    def _executar(self):
+        while True:
+            if self._pedidos.get() is None:
+                break
+            
+            try:
+                dados = self.fonte_dados()
+            except Exception as e:
+                logger.error(f"Erro ao copiar dados de treinamento: {e}")
+                dados = []
+            if len(dados) < self.minimo_jogadores:
+                with self._lock:
+                    self._treinando = False
+                    self._ocioso.notify_all()
+                continue
+            
+            inicio = time.perf_counter()
+            sucesso = self.sistema_ia.treinar_modelo_performance(dados)
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self._treinando = False
+                self._ocioso.notify_all()
+                if sucesso:
+                    self.treinos += 1
+                    self.duracao_ultimo_treino = duracao
+                    self.duracao_total_treino += duracao
+                else:
+                    self.falhas += 1
+            if sucesso:
+                logger.info(f"Modelo retreinado com {len(dados)} jogadores em {duracao:.2f}s "
+                            f"(versão {self.sistema_ia.versao_modelos})")
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """Espera o treino em andamento terminar. Retorna False se o tempo acabou antes"""
+        with self._ocioso:
+            return self._ocioso.wait_for(lambda: not self._treinando, timeout)
+
+    def fechar(self):
+        """Termina o treino em andamento (se houver) e encerra a thread do treinador"""
+        with self._lock:
+            if self._fechado:
+                return
+            self._fechado = True
+        self._pedidos.put(None)
+        self._thread.join()
+
+    def estatisticas(self) -> Dict:
+        modelos = self.sistema_ia.modelos
+        with self._lock:
+            return {
+                'treinos': self.treinos,
+                'falhas': self.falhas,
+                'treinando': self._treinando,
+                'partidas_desde_treino': self.partidas_desde_treino,
+                'erro_medio': self.erro_medio,
+                'duracao_ultimo_treino': self.duracao_ultimo_treino,
+                'duracao_total_treino': self.duracao_total_treino,
+                'versao_modelos': modelos.versao,
+                'idade_modelo': (datetime.now() - modelos.treinado_em).total_seconds()
+            }
+
+
+ARQUIVOS_MODELOS = ('modelo_performance.pkl', 'modelo_clustering.pkl', 'scaler.pkl')
+
+
+class RegistroModelos:
+    """Registro compartilhado do SistemaIA usado por todo o processo.
+    
+    Os modelos são carregados uma única vez, na primeira chamada de `obter`,
+    em vez de um `joblib.load` por Jogador. `recarregar` carrega uma nova
+    instância fora do lock e a troca de uma vez, incrementando a versão;
+    quem chamar `obter` depois disso passa a usar os modelos novos.
+    """
+
+    def __init__(self):
+        self._sistema: Optional[SistemaIA] = None
+        self._lock = threading.Lock()
+        self._lock_carga = threading.Lock()
+        self.versao = 0
+        self.carregamentos = 0
+        self.tempo_ultimo_carregamento = 0.0
+        self.tempo_total_carregamento = 0.0
+        self.memoria_alocada = 0
+        self.carregado_em: Optional[datetime] = None
+
+    def obter(self) -> SistemaIA:
+        sistema = self._sistema
+        if sistema is not None:
+            return sistema
+        
+        with self._lock_carga:
+            if self._sistema is None:
+                self._trocar(self._carregar())
+            return self._sistema
+
+    def recarregar(self) -> SistemaIA:
+        """Carrega os modelos do disco novamente e troca a instância compartilhada"""
+        with self._lock_carga:
+            sistema = self._carregar()
+            self._trocar(sistema)
+            logger.info(f"Modelos recarregados (versão {self.versao})")
+            return sistema
+
+    def _carregar(self) -> SistemaIA:
+        """Cria um SistemaIA medindo o tempo de carga e a memória alocada"""
+        rastreando = tracemalloc.is_tracing()
+        if not rastreando:
+            tracemalloc.start()
+        try:
+            memoria_antes = tracemalloc.get_traced_memory()[0]
+            inicio = time.perf_counter()
+            sistema = SistemaIA()
+            duracao = time.perf_counter() - inicio
+            memoria = tracemalloc.get_traced_memory()[0] - memoria_antes
+        finally:
+            if not rastreando:
+                tracemalloc.stop()
+        
+        with self._lock:
+            self.carregamentos += 1
+            self.tempo_ultimo_carregamento = duracao
+            self.tempo_total_carregamento += duracao
+            self.memoria_alocada = max(0, memoria)
+        logger.info(f"Modelos carregados em {duracao:.3f}s ({self.memoria_alocada / 1024:.0f} KiB)")
+        return sistema
+
+    def _trocar(self, sistema: SistemaIA):
+        with self._lock:
+            self._sistema = sistema
+            self.versao += 1
+            self.carregado_em = datetime.now()
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                'versao': self.versao,
+                'carregado': self._sistema is not None,
+                'carregado_em': self.carregado_em.isoformat() if self.carregado_em else None,
+                'carregamentos': self.carregamentos,
+                'tempo_ultimo_carregamento': self.tempo_ultimo_carregamento,
+                'tempo_total_carregamento': self.tempo_total_carregamento,
+                'memoria_alocada_bytes': self.memoria_alocada,
+                'tamanho_arquivos_bytes': sum(
+                    os.path.getsize(arquivo) for arquivo in ARQUIVOS_MODELOS if os.path.exists(arquivo)
+                )
+            }
+
+
+registro_modelos = RegistroModelos()
+
+
+def obter_sistema_ia() -> SistemaIA:
+    """SistemaIA compartilhado do processo, carregado na primeira chamada"""
+    return registro_modelos.obter()
+
+
+class MatrizCaracteristicas:
+    """Matriz de características dos jogadores na fila, mantida incrementalmente.
+    
+    Cada jogador ocupa uma linha float32 com as mesmas características de
+    `SistemaIA.vetor_caracteristicas`. Entrar, sair ou mudar de elo altera
+    apenas uma linha; a remoção move a última linha para a posição liberada.
+    Só as linhas pedidas são normalizadas, no momento do clustering, então
+    uma troca de modelos não renormaliza a fila inteira. Assim o clustering
+    de qualquer subconjunto da fila é um único predict vetorizado, sem
+    recalcular métricas nem chamar o scaler por jogador.
+    """
+    
+    N_CARACTERISTICAS = 5
+
+    def __init__(self, sistema_ia: Optional[SistemaIA] = None, capacidade: int = 1024):
+        self._sistema_ia = sistema_ia
+        self.dados = np.zeros((capacidade, self.N_CARACTERISTICAS), dtype=np.float32)
+        self.indices: Dict[str, int] = {}
+        self.nicknames: List[str] = []
+        self._versao_scaler = None
+        self._sistema_sincronizado: Optional[SistemaIA] = None
+        self._modelos: Optional[ModelosPerformance] = None
+        self._media: Optional[np.ndarray] = None
+        self._escala: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.nicknames)
+
+    def __contains__(self, nickname: str) -> bool:
+        return nickname in self.indices
+
+    @property
+    def sistema_ia(self) -> SistemaIA:
+        """SistemaIA informado na criação ou, na falta dele, o do registro compartilhado"""
+        return self._sistema_ia or obter_sistema_ia()
+
+    def _sincronizar_scaler(self):
+        """Passa a usar o scaler atual se ele (ou a instância de SistemaIA) mudou desde a última chamada"""
+        sistema_ia = self.sistema_ia
+        if sistema_ia is self._sistema_sincronizado and self._versao_scaler == sistema_ia.versao_modelos:
+            return
+        
+        modelos = sistema_ia.modelos
+        self._sistema_sincronizado = sistema_ia
+        self._modelos = modelos
+        self._versao_scaler = modelos.versao
+        scaler = modelos.scaler
+        if hasattr(scaler, 'mean_') and hasattr(scaler, 'scale_'):
+            self._media = scaler.mean_.astype(np.float32)
+            self._escala = scaler.scale_.astype(np.float32)
+        else:
+            self._media = None
+            self._escala = None
+
+    def _garantir_capacidade(self):
+        if len(self.nicknames) < len(self.dados):
+            return
+        nova_capacidade = len(self.dados) * 2
+        novo = np.zeros((nova_capacidade, self.N_CARACTERISTICAS), dtype=np.float32)
+        novo[:len(self.dados)] = self.dados
+        self.dados = novo
+
+    def adicionar(self, jogador: Dict):
+        """Adiciona o jogador, ou substitui sua linha se ele já estiver na matriz"""
+        with self._lock:
+            nickname = jogador['nickname']
+            indice = self.indices.get(nickname)
+            if indice is None:
+                self._garantir_capacidade()
+                indice = len(self.nicknames)
+                self.indices[nickname] = indice
+                self.nicknames.append(nickname)
+            
+            self.dados[indice] = self.sistema_ia.vetor_caracteristicas(jogador)
+
+    def remover(self, nickname: str):
+        with self._lock:
+            indice = self.indices.pop(nickname, None)
+            if indice is None:
+                return
+            
+            # Move a última linha para o lugar da removida
+            ultimo = len(self.nicknames) - 1
+            if indice != ultimo:
+                nickname_ultimo = self.nicknames[ultimo]
+                self.dados[indice] = self.dados[ultimo]
+                self.nicknames[indice] = nickname_ultimo
+                self.indices[nickname_ultimo] = indice
+            self.nicknames.pop()
+
+    def atualizar_elo(self, nickname: str, novo_elo: float):
+        with self._lock:
+            indice = self.indices.get(nickname)
+            if indice is None:
+                return
+            self.dados[indice, 0] = novo_elo
+
+    def clusters(self, nicknames: Optional[List[str]] = None) -> Dict[str, int]:
+        """Cluster de cada jogador pedido (ou de toda a matriz) com um único predict"""
+        with self._lock:
+            self._sincronizar_scaler()
+            if nicknames is None:
+                nicknames = list(self.nicknames)
+            else:
+                nicknames = [nickname for nickname in nicknames if nickname in self.indices]
+            if not nicknames:
+                return {}
+            
+            # Sem scaler ou KMeans treinado, todos ficam no mesmo grupo (mesmo comportamento de agrupar_jogadores)
+            if self._media is None or self._modelos.clustering is None:
+                return {nickname: 0 for nickname in nicknames}
+            
+            try:
+                linhas = np.fromiter((self.indices[n] for n in nicknames), dtype=np.intp, count=len(nicknames))
+                normalizados = (self.dados[linhas] - self._media) / self._escala
+                grupos = self.sistema_ia.prever_clusters(normalizados, self._modelos)
+                return {nickname: int(grupo) for nickname, grupo in zip(nicknames, grupos)}
+            except Exception as e:
+                logger.error(f"Erro ao prever clusters da matriz de características: {e}")
+                return {nickname: 0 for nickname in nicknames}
+
+
+class ParticaoIndice:
+    """KD-tree de uma região, com buffer de inserções e remoções marcadas.
+    
+    A árvore é imutável: inserções vão para um buffer pesquisado por força
+    bruta e remoções só marcam a linha como inativa. Quando o buffer ou as
+    linhas inativas crescem demais, a árvore é reconstruída com os pontos
+    ativos.
+    
+    Os pontos ficam sem normalizar e a árvore usa a escala do scaler vigente
+    na última reconstrução (a média não muda distâncias). Depois de uma troca
+    de modelos as consultas continuam exatas: os candidatos são ordenados
+    pela distância na escala atual e o raio de busca na árvore é ampliado
+    pela razão entre as escalas. A árvore só é reconstruída quando essa razão
+    passa de `LIMITE_DISTORCAO_INDICE`.
+    """
+
+    def __init__(self, tamanho_buffer: int = TAMANHO_BUFFER_INDICE,
+                 fracao_reconstrucao: float = FRACAO_RECONSTRUCAO,
+                 escala: Optional[np.ndarray] = None):
+        self.tamanho_buffer = tamanho_buffer
+        self.fracao_reconstrucao = fracao_reconstrucao
+        self.escala = np.ones(MatrizCaracteristicas.N_CARACTERISTICAS) if escala is None else escala
+        self.arvore: Optional[KDTree] = None
+        self.pontos_arvore = np.zeros((0, MatrizCaracteristicas.N_CARACTERISTICAS))
+        self.nicknames_arvore: List[str] = []
+        self.ativos = np.zeros(0, dtype=bool)
+        self.na_arvore: Dict[str, int] = {}
+        self.buffer: Dict[str, np.ndarray] = {}
+        self.reconstrucoes = 0
+
+    def __len__(self) -> int:
+        return len(self.na_arvore) + len(self.buffer)
+
+    def adicionar(self, nickname: str, ponto: np.ndarray):
+        self.remover(nickname)
+        self.buffer[nickname] = ponto
+        if len(self.buffer) > self.tamanho_buffer:
+            self.reconstruir()
+
+    def remover(self, nickname: str):
+        if self.buffer.pop(nickname, None) is not None:
+            return
+        indice = self.na_arvore.pop(nickname, None)
+        if indice is None:
+            return
+        self.ativos[indice] = False
+        if len(self.nicknames_arvore) - len(self.na_arvore) > self.fracao_reconstrucao * len(self.nicknames_arvore):
+            self.reconstruir()
+
+    def reconstruir(self, escala: Optional[np.ndarray] = None):
+        """Reconstrói a árvore com os pontos ativos e esvazia o buffer, passando a usar `escala` se informada"""
+        if escala is not None:
+            self.escala = escala
+        nicknames = list(self.na_arvore) + list(self.buffer)
+        pontos = [self.pontos_arvore[i] for i in self.na_arvore.values()] + list(self.buffer.values())
+        self.pontos_arvore = np.array(pontos).reshape(-1, MatrizCaracteristicas.N_CARACTERISTICAS)
+        self.nicknames_arvore = nicknames
+        self.ativos = np.ones(len(nicknames), dtype=bool)
+        self.na_arvore = {nickname: i for i, nickname in enumerate(nicknames)}
+        self.buffer = {}
+        self.arvore = KDTree(self.pontos_arvore / self.escala) if nicknames else None
+        self.reconstrucoes += 1
+
+    def distorcao(self, escala: np.ndarray) -> float:
+        """Razão entre a maior e a menor mudança de escala desde a construção da árvore"""
+        razao = self.escala / escala
+        return float(razao.max() / razao.min())
+
+    def vizinhos(self, ponto: np.ndarray, k: int, escala: Optional[np.ndarray] = None) -> List[Tuple[float, str]]:
+        """Os k pontos ativos mais próximos na métrica de `escala`, como (distância, nickname)"""
+        if escala is None:
+            escala = self.escala
+        if self.distorcao(escala) > LIMITE_DISTORCAO_INDICE:
+            self.reconstruir(escala)
+        
+        encontrados = []
+        if self.arvore is not None and self.na_arvore:
+            # Busca mais vizinhos que k se houver linhas removidas, dobrando até achar k ativos
+            consulta = (ponto / self.escala).reshape(1, -1)
+            total = len(self.nicknames_arvore)
+            k_busca = min(total, k)
+            while True:
+                distancias, indices = self.arvore.query(consulta, k=k_busca)
+                ativos = self.ativos[indices[0]]
+                if ativos.sum() >= min(k, len(self.na_arvore)) or k_busca == total:
+                    break
+                k_busca = min(total, k_busca * 2)
+            indices = indices[0][ativos]
+            exatas = np.linalg.norm((self.pontos_arvore[indices] - ponto) / escala, axis=1)
+            
+            # Na escala atual, distância >= fator * distância na árvore: um ponto mais próximo
+            # que o k-ésimo candidato está no máximo a k-ésimo / fator na árvore
+            fator = float((self.escala / escala).min())
+            if len(indices) >= k and k_busca < total:
+                raio = float(np.partition(exatas, k - 1)[k - 1]) / fator
+                if raio > distancias[0][-1]:
+                    indices = self.arvore.query_radius(consulta, r=raio)[0]
+                    indices = indices[self.ativos[indices]]
+                    exatas = np.linalg.norm((self.pontos_arvore[indices] - ponto) / escala, axis=1)
+            encontrados = [(float(d), self.nicknames_arvore[i]) for d, i in zip(exatas, indices)]
+        
+        if self.buffer:
+            nicknames = list(self.buffer)
+            distancias = np.linalg.norm((np.array(list(self.buffer.values())) - ponto) / escala, axis=1)
+            encontrados.extend(zip(distancias.tolist(), nicknames))
+        
+        encontrados.sort()
+        return encontrados[:k]
+
+
+class IndiceVizinhos:
+    """Índice persistente de vizinhos mais próximos sobre as características normalizadas.
+    
+    Os jogadores são separados por região, cada uma com sua ParticaoIndice,
+    e as consultas de k vizinhos são sublineares em vez de reagrupar e
+    pontuar a população inteira. Uma troca de scaler não reconstrói nada:
+    cada partição continua exata com a árvore que tem e só é reconstruída,
+    na próxima consulta, se a escala mudou demais (ver ParticaoIndice).
+    """
+
+    def __init__(self, sistema_ia: Optional[SistemaIA] = None,
+                 tamanho_buffer: int = TAMANHO_BUFFER_INDICE,
+                 fracao_reconstrucao: float = FRACAO_RECONSTRUCAO):
+        self._sistema_ia = sistema_ia
+        self.tamanho_buffer = tamanho_buffer
+        self.fracao_reconstrucao = fracao_reconstrucao
+        self.particoes: Dict[str, ParticaoIndice] = {}
+        self.jogadores: Dict[str, Dict] = {}
+        self.caracteristicas: Dict[str, np.ndarray] = {}
+        self._versao_scaler = None
+        self._sistema_sincronizado: Optional[SistemaIA] = None
+        self._escala: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+
+    @property
+    def sistema_ia(self) -> SistemaIA:
+        return self._sistema_ia or obter_sistema_ia()
+
+    def __len__(self) -> int:
+        return len(self.jogadores)
+
+    def __contains__(self, nickname: str) -> bool:
+        return nickname in self.jogadores
+
+    def _particao(self, regiao: str) -> ParticaoIndice:
+        particao = self.particoes.get(regiao)
+        if particao is None:
+            particao = ParticaoIndice(self.tamanho_buffer, self.fracao_reconstrucao, self._escala)
+            self.particoes[regiao] = particao
+        return particao
+
+    def _sincronizar_scaler(self):
+        """Passa a usar a escala do scaler atual; as partições se ajustam nas próximas consultas"""
+        sistema_ia = self.sistema_ia
+        if sistema_ia is self._sistema_sincronizado and self._versao_scaler == sistema_ia.versao_modelos:
+            return
+        
+        modelos = sistema_ia.modelos
+        self._sistema_sincronizado = sistema_ia
+        self._versao_scaler = modelos.versao
+        scaler = modelos.scaler
+        self._escala = scaler.scale_ if hasattr(scaler, 'scale_') else None
+
+    def adicionar(self, jogador: Dict):
+        """Adiciona o jogador, ou atualiza seu ponto se ele já estiver no índice"""
+        with self._lock:
+            self._sincronizar_scaler()
+            nickname = jogador['nickname']
+            anterior = self.jogadores.get(nickname)
+            if anterior is not None and anterior['regiao'] != jogador['regiao']:
+                self._particao(anterior['regiao']).remover(nickname)
+            
+            caracteristicas = np.array(self.sistema_ia.vetor_caracteristicas(jogador), dtype=float)
+            self.jogadores[nickname] = jogador
+            self.caracteristicas[nickname] = caracteristicas
+            self._particao(jogador['regiao']).adicionar(nickname, caracteristicas)
+
+    def adicionar_lote(self, jogadores: List[Dict]):
+        """Adiciona vários jogadores de uma vez, reconstruindo cada árvore afetada uma única vez"""
+        with self._lock:
+            self._sincronizar_scaler()
+            regioes = set()
+            for jogador in jogadores:
+                nickname = jogador['nickname']
+                anterior = self.jogadores.get(nickname)
+                if anterior is not None:
+                    self._particao(anterior['regiao']).remover(nickname)
+                
+                caracteristicas = np.array(self.sistema_ia.vetor_caracteristicas(jogador), dtype=float)
+                self.jogadores[nickname] = jogador
+                self.caracteristicas[nickname] = caracteristicas
+                self._particao(jogador['regiao']).buffer[nickname] = caracteristicas
+                regioes.add(jogador['regiao'])
+            for regiao in regioes:
+                self.particoes[regiao].reconstruir(self._escala)
+
+    def remover(self, nickname: str):
+        with self._lock:
+            jogador = self.jogadores.pop(nickname, None)
+            if jogador is None:
+                return
+            del self.caracteristicas[nickname]
+            self._particao(jogador['regiao']).remover(nickname)
+
+    def vizinhos(self, jogador: Dict, k: int) -> List[Dict]:
+        """Os k jogadores da mesma região mais próximos do jogador, excluindo ele mesmo"""
+        with self._lock:
+            self._sincronizar_scaler()
+            particao = self.particoes.get(jogador.get('regiao'))
+            if particao is None:
+                return []
+            
+            ponto = np.array(self.sistema_ia.vetor_caracteristicas(jogador), dtype=float)
+            encontrados = particao.vizinhos(ponto, k + 1, self._escala)
+            return [
+                self.jogadores[nickname] for _, nickname in encontrados
+                if nickname != jogador['nickname']
+            ][:k]
+
+    def recomendar_com_scores(self, jogador: Dict, n_recomendacoes: int = 5) -> List[Tuple[Dict, float]]:
+        """Teammates entre os vizinhos mais próximos com seus scores de compatibilidade, do maior ao menor"""
+        if not jogador:
+            return []
+        
+        try:
+            candidatos = self.vizinhos(jogador, n_recomendacoes * CANDIDATOS_POR_RECOMENDACAO)
+            if not candidatos:
+                return []
+            scores = self.sistema_ia.scores_compatibilidade(jogador, candidatos)
+            ordem = np.argsort(-scores, kind='stable')[:n_recomendacoes]
+            return [(candidatos[i], float(scores[i])) for i in ordem]
+        except Exception as e:
+            logger.error(f"Erro ao recomendar teammates pelo índice: {e}")
+            return []
+
+    def recomendar(self, jogador: Dict, n_recomendacoes: int = 5) -> List[Dict]:
+        """Recomenda teammates entre os vizinhos mais próximos, ordenados pelo score de compatibilidade"""
+        return [candidato for candidato, _ in self.recomendar_com_scores(jogador, n_recomendacoes)]
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                'jogadores': len(self.jogadores),
+                'regioes': {
+                    regiao: {
+                        'jogadores': len(particao),
+                        'na_arvore': len(particao.na_arvore),
+                        'no_buffer': len(particao.buffer),
+                        'reconstrucoes': particao.reconstrucoes
+                    }
+                    for regiao, particao in self.particoes.items()
+                }
+            }
@@ -0,0 +1,270 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+BUCKETS_LATENCIA = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUCKETS_TEMPO_FILA = (1, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300)
+
+TIPO_CONTEUDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _formatar_valor(valor: float) -> str:
+    if math.isinf(valor):
+        return '+Inf' if valor > 0 else '-Inf'
+    if valor == int(valor) and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str]) -> str:
+    if not nomes:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)) + '}'
+
+
+class SerieContador:
+    __slots__ = ('valor', '_lock')
+
+    def __init__(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1):
+        with self._lock:
+            self.valor += valor
+
+
+class SerieMedidor:
+    __slots__ = ('valor', '_lock')
+
+    def __init__(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, valor: float):
+        self.valor = valor
+
+    def inc(self, valor: float = 1):
+        with self._lock:
+            self.valor += valor
+
+    def dec(self, valor: float = 1):
+        self.inc(-valor)
+
+
+class SerieHistograma:
+    __slots__ = ('limites', 'contagens', 'soma', '_lock')
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # O último bucket é o +Inf
+        self.soma = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, valor: float):
+        indice = bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[indice] += 1
+            self.soma += valor
+
+    def instantaneo(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.contagens), self.soma
+
+
+class Metrica(ABC):
+    """Métrica com séries por combinação de rótulos.
+    
+    `rotulado(*valores)` devolve a série dos rótulos informados; no caminho
+    crítico guarde a série e chame `inc`/`observe` nela diretamente. Sem
+    rótulos, os métodos da própria métrica usam a série padrão.
+    """
+    tipo = ''
+    classe_serie = None
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._padrao = None if self.rotulos else self.rotulado()
+
+    def _nova_serie(self):
+        return self.classe_serie()
+
+    def rotulado(self, *valores: str):
+        valores = tuple(str(valor) for valor in valores)
+        serie = self._series.get(valores)
+        if serie is None:
+            if len(valores) != len(self.rotulos):
+                raise ValueError(f"{self.nome} espera os rótulos {self.rotulos}")
+            with self._lock:
+                serie = self._series.setdefault(valores, self._nova_serie())
+        return serie
+
+    def series(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._series.items())
+
+    @abstractmethod
+    def amostras(self) -> List[str]:
+        """Linhas de amostra no formato de exposição, uma por série (ou bucket)"""
+
+    def renderizar(self) -> str:
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} {self.tipo}']
+        linhas.extend(self.amostras())
+        return '\n'.join(linhas)
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+    classe_serie = SerieContador
+
+    def inc(self, valor: float = 1):
+        self._padrao.inc(valor)
+
+    def amostras(self) -> List[str]:
+        return [f'{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_formatar_valor(serie.valor)}'
+                for valores, serie in self.series()]
+
+
+class Medidor(Metrica):
+    """Gauge. Com `funcao`, o valor é calculado só na coleta: ela devolve um número
+    (sem rótulos) ou um dicionário {tupla de valores dos rótulos: número}."""
+    tipo = 'gauge'
+    classe_serie = SerieMedidor
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                 funcao: Optional[Callable[[], object]] = None):
+        super().__init__(nome, ajuda, rotulos)
+        self.funcao = funcao
+
+    def set(self, valor: float):
+        self._padrao.set(valor)
+
+    def inc(self, valor: float = 1):
+        self._padrao.inc(valor)
+
+    def dec(self, valor: float = 1):
+        self._padrao.dec(valor)
+
+    def amostras(self) -> List[str]:
+        if self.funcao is None:
+            valores = [(rotulos, serie.valor) for rotulos, serie in self.series()]
+        else:
+            resultado = self.funcao()
+            if isinstance(resultado, dict):
+                valores = [(tuple(str(v) for v in rotulos), valor) for rotulos, valor in resultado.items()]
+            else:
+                valores = [((), resultado)]
+        return [f'{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_valor(valor)}'
+                for rotulos, valor in valores]
+
+
+class Histograma(Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                 limites: Sequence[float] = BUCKETS_LATENCIA):
+        self.limites = tuple(sorted(limites))
+        super().__init__(nome, ajuda, rotulos)
+
+    def _nova_serie(self):
+        return SerieHistograma(self.limites)
+
+    def observe(self, valor: float):
+        self._padrao.observe(valor)
+
+    def amostras(self) -> List[str]:
+        linhas = []
+        rotulos_bucket = self.rotulos + ('le',)
+        for valores, serie in self.series():
+            contagens, soma = serie.instantaneo()
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (math.inf,), contagens):
+                acumulado += contagem
+                linhas.append(f'{self.nome}_bucket{_formatar_rotulos(rotulos_bucket, valores + (_formatar_valor(limite),))} '
+                              f'{acumulado}')
+            rotulos = _formatar_rotulos(self.rotulos, valores)
+            linhas.append(f'{self.nome}_sum{rotulos} {_formatar_valor(soma)}')
+            linhas.append(f'{self.nome}_count{rotulos} {acumulado}')
+        return linhas
+
+
+class RegistroMetricas:
+    """Conjunto das métricas expostas em /metrics"""
+
+    def __init__(self):
+        self.metricas: Dict[str, Metrica] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        with self._lock:
+            if metrica.nome in self.metricas:
+                raise ValueError(f"Métrica {metrica.nome} já registrada")
+            self.metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self.registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                funcao: Optional[Callable[[], object]] = None) -> Medidor:
+        return self.registrar(Medidor(nome, ajuda, rotulos, funcao))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                   limites: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+        return self.registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def renderizar(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)"""
+        with self._lock:
+            metricas = list(self.metricas.values())
+        blocos = []
+        for metrica in metricas:
+            try:
+                blocos.append(metrica.renderizar())
+            except Exception as e:
+                logger.error(f"Erro ao coletar a métrica {metrica.nome}: {e}")
+        return '\n'.join(blocos) + '\n'
+
+
+# Registro compartilhado pelo servidor, banco e IA
+registro = RegistroMetricas()
+
+LATENCIA_BANCO = registro.histograma(
+    'matchmaking_db_latencia_segundos', 'Latência das operações do Database', ('operacao',))
+LATENCIA_INFERENCIA = registro.histograma(
+    'matchmaking_inferencia_latencia_segundos', 'Latência da inferência dos modelos', ('modelo',))
+
+
+def cronometrado(histograma: Histograma, *rotulos: str):
+    """Decorador que registra no histograma a duração de cada chamada (inclusive as que falham)"""
+    def decorador(funcao):
+        serie = histograma.rotulado(*rotulos)
+
+        @wraps(funcao)
+        def medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                serie.observe(time.perf_counter() - inicio)
+        return medido
+    return decorador
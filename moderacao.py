@@ -0,0 +1,67 @@
+"""Varredura de moderação: pontua todos os jogadores do banco (smurf e toxicidade)
+e grava o resultado na tabela flags_jogadores.
+
+Uso: python moderacao.py [--db matchmaking.db] [--lote 50000]
+"""
+import argparse
+import logging
+import time
+from typing import Dict
+
+import numpy as np
+
+from database import CAMPOS_MODERACAO, TAMANHO_LOTE_VARREDURA, Database
+from ia_matchmaking import SistemaIA, obter_sistema_ia
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def varrer_moderacao(db: Database, sistema_ia: SistemaIA, tamanho_lote: int = TAMANHO_LOTE_VARREDURA) -> Dict[str, int]:
+    """Pontua a população lote a lote com SistemaIA.pontuar_populacao e grava os flags de cada lote.
+    
+    Cada lote chega do banco só com os campos da moderação e vira uma matriz
+    numpy de uma vez, sem montar o dicionário de cada jogador.
+    """
+    totais = {'jogadores': 0, 'gravados': 0, 'smurfs': 0, 'toxicos': 0}
+    for linhas in db.iterar_dados_moderacao(tamanho_lote):
+        nicknames, *valores = zip(*linhas)
+        # None (campo ausente no JSON) vira NaN
+        matriz = np.array(valores, dtype=np.float64)
+        brutas = {campo: matriz[i] for i, (campo, _) in enumerate(CAMPOS_MODERACAO)}
+        resultado = sistema_ia.pontuar_populacao(sistema_ia.colunas_moderacao_brutas(brutas))
+        totais['gravados'] += db.gravar_flags_jogadores(
+            list(nicknames),
+            resultado['prob_smurf'],
+            resultado['eh_smurf'],
+            resultado['prob_toxicidade'],
+            resultado['eh_toxico']
+        )
+        totais['jogadores'] += len(nicknames)
+        totais['smurfs'] += int(resultado['eh_smurf'].sum())
+        totais['toxicos'] += int(resultado['eh_toxico'].sum())
+        logger.info(f"{totais['jogadores']} jogadores pontuados")
+    return totais
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de moderação (smurf e toxicidade) de todos os jogadores")
+    parser.add_argument('--db', default='matchmaking.db')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_VARREDURA, help='jogadores por lote')
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    try:
+        inicio = time.perf_counter()
+        totais = varrer_moderacao(db, obter_sistema_ia(), args.lote)
+        duracao = time.perf_counter() - inicio
+        print(f"{totais['jogadores']} jogadores em {duracao:.2f} s: "
+              f"{totais['smurfs']} possíveis smurfs, {totais['toxicos']} com comportamento tóxico")
+        if totais['gravados'] != totais['jogadores']:
+            logger.error(f"Flags gravados para apenas {totais['gravados']} de {totais['jogadores']} jogadores")
+    finally:
+        db.fechar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+import os
+import sys
+import threading
+import time
+import logging
+
+from metricas import Histograma
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LIMITE_OPERACAO_LENTA = 0.05  # Segundos a partir dos quais um tick/handler vai para o buffer de lentos
+CAPACIDADE_OPERACOES_LENTAS = 100
+INTERVALO_AMOSTRAGEM = 0.005  # Segundos entre amostras do perfilador
+DURACAO_MAXIMA_PERFIL = 60  # Segundos
+
+# O perfilador precisa de uma thread de verdade do sistema operacional: com o
+# monkey patch do eventlet, threading.Thread vira uma green thread que só
+# rodaria quando o código amostrado cedesse o controle
+try:
+    from eventlet.corolocal import local as _local_verde
+    from eventlet.patcher import original
+    _threading_real = original('threading')
+    _sleep_real = original('time').sleep
+except ImportError:
+    _local_verde = threading.local
+    _threading_real = threading
+    _sleep_real = time.sleep
+
+# Rastro ativo da green thread (ou thread) atual. O local do eventlet é por
+# greenlet independentemente da ordem do import e do monkey patch; um
+# threading.local criado antes do patch seria compartilhado por todas as green threads
+_local = _local_verde()
+
+
+class Rastro:
+    """Tempo gasto em cada etapa de uma operação (um tick da fila ou um handler)"""
+    __slots__ = ('operacao', 'data', 'inicio', 'duracao', 'etapas', 'chamadas')
+
+    def __init__(self, operacao: str):
+        self.operacao = operacao
+        self.data = datetime.now()
+        self.inicio = time.perf_counter()
+        self.duracao = 0.0
+        self.etapas: Dict[str, float] = {}
+        self.chamadas: Dict[str, int] = {}
+
+    def adicionar(self, etapa: str, duracao: float):
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + duracao
+        self.chamadas[etapa] = self.chamadas.get(etapa, 0) + 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'operacao': self.operacao,
+            'data': self.data.isoformat(),
+            'duracao': self.duracao,
+            'etapas': {
+                etapa: {'duracao': duracao, 'chamadas': self.chamadas[etapa]}
+                for etapa, duracao in sorted(self.etapas.items(), key=lambda item: -item[1])
+            },
+            # Tempo fora das etapas instrumentadas
+            'sem_etapa': max(self.duracao - sum(self.etapas.values()), 0.0)
+        }
+
+
+class _Etapa:
+    __slots__ = ('rastro', 'nome', 'inicio')
+
+    def __init__(self, rastro: Rastro, nome: str):
+        self.rastro = rastro
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rastro.adicionar(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+
+class _EtapaNula:
+    """Usada quando não há rastro ativo: não mede nada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+def etapa(nome: str):
+    """Mede o bloco `with` como uma etapa do rastro ativo (se houver)"""
+    rastro = getattr(_local, 'rastro', None)
+    if rastro is None:
+        return _ETAPA_NULA
+    return _Etapa(rastro, nome)
+
+
+class _Operacao:
+    __slots__ = ('rastreador', 'rastro', 'anterior')
+
+    def __init__(self, rastreador: 'Rastreador', operacao: str):
+        self.rastreador = rastreador
+        self.rastro = Rastro(operacao)
+
+    def __enter__(self) -> Rastro:
+        self.anterior = getattr(_local, 'rastro', None)
+        _local.rastro = self.rastro
+        self.rastro.inicio = time.perf_counter()
+        return self.rastro
+
+    def __exit__(self, *exc):
+        _local.rastro = self.anterior
+        self.rastro.duracao = time.perf_counter() - self.rastro.inicio
+        self.rastreador.registrar(self.rastro)
+        return False
+
+
+class Rastreador:
+    """Rastreia operações por etapa e guarda as mais lentas num buffer circular.
+    
+    `histograma`, se informado, recebe a duração de cada etapa rotulada por
+    (operacao, etapa), para acompanhar as etapas também em /metrics.
+    """
+
+    def __init__(self, limite_lento: float = LIMITE_OPERACAO_LENTA,
+                 capacidade: int = CAPACIDADE_OPERACOES_LENTAS, histograma: Optional[Histograma] = None):
+        self.limite_lento = limite_lento
+        self.histograma = histograma
+        self.lentas: deque = deque(maxlen=capacidade)
+        self._lock = threading.Lock()
+
+    def rastrear(self, operacao: str) -> _Operacao:
+        """Contexto que ativa um rastro para as etapas executadas dentro dele"""
+        return _Operacao(self, operacao)
+
+    def registrar(self, rastro: Rastro):
+        if self.histograma is not None:
+            for nome, duracao in rastro.etapas.items():
+                self.histograma.rotulado(rastro.operacao, nome).observe(duracao)
+        if rastro.duracao >= self.limite_lento:
+            with self._lock:
+                self.lentas.append(rastro)
+
+    def operacoes_lentas(self, limite: Optional[int] = None) -> List[Dict]:
+        """Operações lentas mais recentes primeiro"""
+        with self._lock:
+            rastros = list(self.lentas)
+        rastros.reverse()
+        return [rastro.to_dict() for rastro in rastros[:limite]]
+
+
+def _descrever_frame(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class PerfiladorAmostragem:
+    """Perfilador por amostragem das pilhas de todas as threads, sem reiniciar o servidor.
+    
+    Uma thread do sistema operacional lê `sys._current_frames()` a cada
+    `intervalo` segundos e conta as pilhas no formato "collapsed" (raiz;...;folha
+    contagem), o mesmo aceito pelo flamegraph.pl e pelo speedscope. Só uma
+    sessão roda por vez.
+    """
+
+    def __init__(self):
+        self._ocupado = threading.Lock()
+
+    def amostrar(self, duracao: float, intervalo: float = INTERVALO_AMOSTRAGEM) -> Optional[Dict[str, int]]:
+        """Amostra por `duracao` segundos. Retorna None se já houver uma sessão em andamento"""
+        if not self._ocupado.acquire(blocking=False):
+            return None
+        try:
+            duracao = min(max(duracao, intervalo), DURACAO_MAXIMA_PERFIL)
+            pilhas: Dict[str, int] = {}
+            concluido = _threading_real.Event()
+            thread = _threading_real.Thread(
+                target=self._executar, args=(duracao, intervalo, pilhas, concluido),
+                name='perfilador', daemon=True
+            )
+            thread.start()
+            
+            # Espera com o sleep atual (green com o monkey patch), sem bloquear o hub do eventlet
+            while not concluido.is_set():
+                time.sleep(min(intervalo * 10, 0.05))
+            return pilhas
+        finally:
+            self._ocupado.release()
+
+    def _executar(self, duracao: float, intervalo: float, pilhas: Dict[str, int], concluido):
+        try:
+            propria = _threading_real.get_ident()
+            fim = time.perf_counter() + duracao
+            while time.perf_counter() < fim:
+                for ident, frame in sys._current_frames().items():
+                    if ident == propria:
+                        continue
+                    quadros = []
+                    while frame is not None:
+                        quadros.append(_descrever_frame(frame))
+                        frame = frame.f_back
+                    chave = ';'.join(reversed(quadros))
+                    pilhas[chave] = pilhas.get(chave, 0) + 1
+                _sleep_real(intervalo)
+        except Exception as e:
+            logger.error(f"Erro no perfilador: {e}")
+        finally:
+            concluido.set()
+
+
+def formatar_collapsed(pilhas: Dict[str, int]) -> str:
+    """Uma linha "pilha contagem" por pilha, da mais frequente para a menos frequente"""
+    return ''.join(f'{pilha} {contagem}\n' for pilha, contagem in sorted(pilhas.items(), key=lambda item: -item[1]))
@@ -1,497 +1,591 @@
-from flask import Flask, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
-from database import Database
-from ia_matchmaking import SistemaIA
-import json
-from typing import Dict, List, Optional
-import time
-import threading
-import sys
-import logging
-import random
-from datetime import datetime, timedelta
-from game import Partida
-import signal
-import eventlet
-eventlet.monkey_patch()
-
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-app = Flask(__name__)
-# Configuração do SocketIO com eventlet
-socketio = SocketIO(
-    app,
-    cors_allowed_origins="*",
-    async_mode='eventlet',
-    logger=False,
-    engineio_logger=False,
-    ping_timeout=60,
-    ping_interval=25
-)
-db = Database()
-sistema_ia = SistemaIA()
-
-# Dicionário para armazenar os sockets ativos
-sockets_ativos: Dict[str, str] = {}  # {socket_id: nickname}
-# Dicionário para armazenar os jogadores
-jogadores: Dict[str, Dict] = {}
-# Lista de jogadores na fila com seus tempos de entrada
-fila: Dict[str, datetime] = {}
-
-def calcular_novo_elo(elo_vencedor: int, elo_perdedor: int) -> tuple[int, int]:
-    """Calcula o novo elo após uma partida usando o sistema Elo"""
-    K = 32  # Fator K (quanto mais alto, mais o elo muda)
-    
-    # Calcula a probabilidade esperada de vitória
-    esperado_vencedor = 1 / (1 + 10 ** ((elo_perdedor - elo_vencedor) / 400))
-    esperado_perdedor = 1 - esperado_vencedor
-    
-    # Calcula o novo elo
-    novo_elo_vencedor = elo_vencedor + K * (1 - esperado_vencedor)
-    novo_elo_perdedor = elo_perdedor + K * (0 - esperado_perdedor)
-    
-    return int(novo_elo_vencedor), int(novo_elo_perdedor)
-
-def encontrar_match(jogador1: str) -> Optional[str]:
-    """Encontra um match adequado para o jogador usando clustering"""
-    if len(fila) < 2:
-        return None
-    
-    # Busca o jogador1 no banco
-    jogador1_data = db.buscar_jogador(jogador1)
-    if not jogador1_data:
-        logger.error(f"Jogador {jogador1} não encontrado no banco")
-        return None
-    
-    # Busca todos os jogadores na fila
-    jogadores_na_fila = []
-    for nickname in fila:
-        if nickname != jogador1:
-            jogador = db.buscar_jogador(nickname)
-            if jogador:
-                jogadores_na_fila.append(jogador)
-    
-    if not jogadores_na_fila:
-        return None
-    
-    # Usa o sistema de IA para agrupar os jogadores
-    grupos = sistema_ia.agrupar_jogadores([jogador1_data] + jogadores_na_fila)
-    
-    # Encontra o grupo do jogador1
-    grupo_jogador1 = None
-    for grupo, membros in grupos.items():
-        if any(m['nickname'] == jogador1 for m in membros):
-            grupo_jogador1 = grupo
-            break
-    
-    if grupo_jogador1 is None:
-        return None
-    
-    # Procura o melhor match no mesmo grupo
-    melhor_match = None
-    menor_diferenca_elo = float('inf')
-    
-    for jogador in grupos[grupo_jogador1]:
-        if jogador['nickname'] != jogador1 and jogador['nickname'] in fila:
-            diferenca_elo = abs(jogador1_data['estatisticas']['elo'] - jogador['estatisticas']['elo'])
-            if diferenca_elo < menor_diferenca_elo:
-                melhor_match = jogador['nickname']
-                menor_diferenca_elo = diferenca_elo
-    
-    if melhor_match:
-        logger.info(f"Match encontrado usando clustering: {jogador1} vs {melhor_match}")
-        logger.info(f"Grupo: {grupo_jogador1}")
-        logger.info(f"Diferença de elo: {menor_diferenca_elo}")
-    
-    return melhor_match
-
-def processar_fila():
-    """Processa a fila periodicamente para encontrar matches"""
-    while True:
-        try:
-            agora = datetime.now()
-            
-            # Remove jogadores que esperaram mais de 5 minutos
-            for jogador in list(fila.keys()):
-                if agora - fila[jogador] > timedelta(minutes=5):
-                    del fila[jogador]
-                    logger.info(f"Jogador {jogador} removido da fila por timeout")
-            
-            # Se tiver pelo menos 2 jogadores na fila
-            if len(fila) >= 2:
-                # Verifica se algum jogador já esperou 30 segundos
-                jogador_esperando = None
-                for jogador, tempo_entrada in fila.items():
-                    if agora - tempo_entrada >= timedelta(seconds=30):
-                        jogador_esperando = jogador
-                        break
-                
-                if jogador_esperando:
-                    # Tenta encontrar um match para o jogador que esperou 30 segundos
-                    jogador2 = encontrar_match(jogador_esperando)
-                    
-                    if jogador2:
-                        # Calcula a diferença de elo
-                        elo_j1 = jogadores[jogador_esperando]['elo']
-                        elo_j2 = jogadores[jogador2]['elo']
-                        diferenca_elo = abs(elo_j1 - elo_j2)
-                        
-                        # Remove jogadores da fila
-                        del fila[jogador_esperando]
-                        del fila[jogador2]
-                        
-                        # Encontra os SIDs dos jogadores
-                        sid_j1 = None
-                        sid_j2 = None
-                        for sid, nickname in sockets_ativos.items():
-                            if nickname == jogador_esperando:
-                                sid_j1 = sid
-                            elif nickname == jogador2:
-                                sid_j2 = sid
-                        
-                        if not sid_j1 or not sid_j2:
-                            logger.error(f"Não foi possível encontrar SIDs para os jogadores {jogador_esperando} e {jogador2}")
-                            continue
-                        
-                        # Cria uma nova partida
-                        partida = Partida(jogador_esperando, jogador2)
-                        
-                        # Simula a partida
-                        resultado = partida.simular_partida()
-                        
-                        # Determina o vencedor baseado nas kills
-                        vencedor = jogador_esperando if resultado['kills_j1'] > resultado['kills_j2'] else jogador2
-                        
-                        # Atualiza o elo dos jogadores
-                        if vencedor == jogador_esperando:
-                            novo_elo_j1, novo_elo_j2 = calcular_novo_elo(elo_j1, elo_j2)
-                        else:
-                            novo_elo_j2, novo_elo_j1 = calcular_novo_elo(elo_j2, elo_j1)
-                        
-                        # Atualiza o elo no banco de dados
-                        db.atualizar_elo(jogador_esperando, novo_elo_j1)
-                        db.atualizar_elo(jogador2, novo_elo_j2)
-                        
-                        # Atualiza o elo na memória
-                        jogadores[jogador_esperando]['elo'] = novo_elo_j1
-                        jogadores[jogador2]['elo'] = novo_elo_j2
-                        
-                        # Salva a partida no banco de dados
-                        db.registrar_partida(
-                            jogador_esperando,
-                            jogador2,
-                            vencedor,
-                            {
-                                'kills_j1': resultado['kills_j1'],
-                                'kills_j2': resultado['kills_j2'],
-                                'deaths_j1': resultado['deaths_j1'],
-                                'deaths_j2': resultado['deaths_j2'],
-                                'assists_j1': resultado['assists_j1'],
-                                'assists_j2': resultado['assists_j2'],
-                                'tempo_partida': resultado['tempo_partida'],
-                                'ping': resultado['ping']
-                            }
-                        )
-                        
-                        # Notifica os jogadores
-                        socketio.emit('match_encontrado', {
-                            'jogador2': jogador2,
-                            'vencedor': vencedor,
-                            'kills_j1': resultado['kills_j1'],
-                            'kills_j2': resultado['kills_j2'],
-                            'deaths_j1': resultado['deaths_j1'],
-                            'deaths_j2': resultado['deaths_j2'],
-                            'assists_j1': resultado['assists_j1'],
-                            'assists_j2': resultado['assists_j2'],
-                            'tempo_partida': resultado['tempo_partida'],
-                            'ping': resultado['ping'],
-                            'novo_elo': novo_elo_j1
-                        }, room=sid_j1)
-                        
-                        socketio.emit('match_encontrado', {
-                            'jogador2': jogador_esperando,
-                            'vencedor': vencedor,
-                            'kills_j1': resultado['kills_j2'],
-                            'kills_j2': resultado['kills_j1'],
-                            'deaths_j1': resultado['deaths_j2'],
-                            'deaths_j2': resultado['deaths_j1'],
-                            'assists_j1': resultado['assists_j2'],
-                            'assists_j2': resultado['assists_j1'],
-                            'tempo_partida': resultado['tempo_partida'],
-                            'ping': resultado['ping'],
-                            'novo_elo': novo_elo_j2
-                        }, room=sid_j2)
-                        
-                        logger.info(f"Match encontrado: {jogador_esperando} vs {jogador2}")
-                        logger.info(f"Diferença de elo: {diferenca_elo}")
-                        logger.info(f"Resultado: {vencedor} venceu com {resultado['kills_j1'] if vencedor == jogador_esperando else resultado['kills_j2']} kills")
-            
-            time.sleep(0.1)  # Reduzido de 1 segundo para 0.1 segundos
-        except Exception as e:
-            logger.error(f"Erro ao processar fila: {e}")
-            time.sleep(1)  # Mantém 1 segundo em caso de erro
-
-@socketio.on('connect')
-def handle_connect():
-    logger.info(f"Cliente conectado: {request.sid}")
-
-@socketio.on('disconnect')
-def handle_disconnect():
-    if request.sid in sockets_ativos:
-        nickname = sockets_ativos[request.sid]
-        db.sair_da_fila(nickname)
-        del sockets_ativos[request.sid]
-        leave_room(nickname)
-        logger.info(f"Cliente desconectado: {nickname}")
-
-@socketio.on('login')
-def handle_login(data):
-    try:
-        nickname = data['nickname']
-        elo = data['elo']
-        
-        # Verifica se o jogador já existe no banco
-        jogador_existente = db.buscar_jogador(nickname)
-        if jogador_existente:
-            elo = jogador_existente['estatisticas']['elo']
-        else:
-            # Cria um novo jogador no banco
-            db.adicionar_jogador({
-                'nickname': nickname,
-                'plataforma': 'PC',
-                'regiao': 'BR',
-                'estatisticas': {
-                    'elo': elo,
-                    'kills': 0,
-                    'deaths': 0,
-                    'assists': 0,
-                    'vitorias': 0,
-                    'derrotas': 0
-                },
-                'preferences': {}
-            })
-        
-        # Adiciona à lista de jogadores
-        jogadores[nickname] = {
-            'nickname': nickname,
-            'elo': elo
-        }
-        sockets_ativos[request.sid] = nickname
-        
-        logger.info(f"Jogador {nickname} fez login com elo {elo}")
-        emit('login_sucesso', {
-            'nickname': nickname,
-            'estatisticas': {
-                'elo': elo
-            }
-        })
-    except Exception as e:
-        logger.error(f"Erro no login: {e}")
-        emit('error', {'message': str(e)})
-
-@socketio.on('entrar_fila')
-def handle_entrar_fila():
-    try:
-        # Verifica se o jogador está logado
-        if request.sid not in sockets_ativos:
-            return emit('error', {'message': 'Faça login primeiro'})
-            
-        nickname = sockets_ativos[request.sid]
-        
-        # Verifica se o jogador existe no banco
-        jogador = db.buscar_jogador(nickname)
-        if not jogador:
-            return emit('error', {'message': 'Jogador não encontrado'})
-            
-        elo = jogador['estatisticas']['elo']
-        
-        # Adiciona à fila
-        if nickname not in fila:
-            fila[nickname] = datetime.now()
-            logger.info(f"Jogador {nickname} entrou na fila com elo {elo}")
-            emit('fila_entrada', {'message': 'Você entrou na fila'})
-            
-            # Aguarda 15 segundos antes de procurar match
-            time.sleep(15)
-            
-            # Tenta encontrar um match
-            match = encontrar_match(nickname)
-            if match:
-                # Verifica se o match existe no banco
-                jogador_match = db.buscar_jogador(match)
-                if not jogador_match:
-                    logger.error(f"Jogador {match} não encontrado no banco")
-                    return
-                    
-                elo_match = jogador_match['estatisticas']['elo']
-                
-                logger.info(f"Match encontrado: {nickname} vs {match}")
-                logger.info(f"Elo {nickname}: {elo}")
-                logger.info(f"Elo {match}: {elo_match}")
-                
-                # Remove jogadores da fila
-                del fila[nickname]
-                del fila[match]
-                
-                # Cria uma nova partida
-                partida = Partida(nickname, match)
-                
-                # Simula a partida
-                resultado = partida.simular_partida()
-                
-                # Determina o vencedor baseado nas kills
-                vencedor = nickname if resultado['kills_j1'] > resultado['kills_j2'] else match
-                
-                # Atualiza o elo dos jogadores
-                if vencedor == nickname:
-                    novo_elo_j1, novo_elo_j2 = calcular_novo_elo(elo, elo_match)
-                else:
-                    novo_elo_j2, novo_elo_j1 = calcular_novo_elo(elo_match, elo)
-                
-                # Atualiza o elo no banco de dados
-                db.atualizar_elo(nickname, novo_elo_j1)
-                db.atualizar_elo(match, novo_elo_j2)
-                
-                # Atualiza o elo na memória
-                jogadores[nickname]['elo'] = novo_elo_j1
-                jogadores[match]['elo'] = novo_elo_j2
-                
-                # Salva a partida no banco de dados
-                db.registrar_partida(
-                    nickname,
-                    match,
-                    vencedor,
-                    {
-                        'kills_j1': resultado['kills_j1'],
-                        'kills_j2': resultado['kills_j2'],
-                        'deaths_j1': resultado['deaths_j1'],
-                        'deaths_j2': resultado['deaths_j2'],
-                        'assists_j1': resultado['assists_j1'],
-                        'assists_j2': resultado['assists_j2'],
-                        'tempo_partida': resultado['tempo_partida'],
-                        'ping': resultado['ping']
-                    }
-                )
-                
-                # Notifica os jogadores
-                socketio.emit('match_encontrado', {
-                    'jogador2': match,
-                    'vencedor': vencedor,
-                    'kills_j1': resultado['kills_j1'],
-                    'kills_j2': resultado['kills_j2'],
-                    'deaths_j1': resultado['deaths_j1'],
-                    'deaths_j2': resultado['deaths_j2'],
-                    'assists_j1': resultado['assists_j1'],
-                    'assists_j2': resultado['assists_j2'],
-                    'tempo_partida': resultado['tempo_partida'],
-                    'ping': resultado['ping'],
-                    'novo_elo': novo_elo_j1
-                })
-                
-                socketio.emit('match_encontrado', {
-                    'jogador2': nickname,
-                    'vencedor': vencedor,
-                    'kills_j1': resultado['kills_j2'],
-                    'kills_j2': resultado['kills_j1'],
-                    'deaths_j1': resultado['deaths_j2'],
-                    'deaths_j2': resultado['deaths_j1'],
-                    'assists_j1': resultado['assists_j2'],
-                    'assists_j2': resultado['assists_j1'],
-                    'tempo_partida': resultado['tempo_partida'],
-                    'ping': resultado['ping'],
-                    'novo_elo': novo_elo_j2
-                })
-    except Exception as e:
-        logger.error(f"Erro ao entrar na fila: {e}")
-        emit('error', {'message': str(e)})
-
-@socketio.on('sair_fila')
-def handle_sair_fila():
-    try:
-        if request.sid not in sockets_ativos:
-            return emit('error', {'message': 'Faça login primeiro'})
-            
-        nickname = sockets_ativos[request.sid]
-        if nickname in fila:
-            del fila[nickname]
-            logger.info(f"Jogador {nickname} saiu da fila")
-            emit('fila_saida', {'message': 'Você saiu da fila'})
-    except Exception as e:
-        logger.error(f"Erro ao sair da fila: {e}")
-        emit('error', {'message': str(e)})
-
-@socketio.on('registrar_partida')
-def handle_registrar_partida(data):
-    try:
-        jogador1 = data['jogador1']
-        jogador2 = data['jogador2']
-        vencedor = data['vencedor']
-        
-        # Encontra os SIDs dos jogadores
-        sid_j1 = list(jogadores.keys())[list(jogadores.values()).index({'nickname': jogador1})]
-        sid_j2 = list(jogadores.keys())[list(jogadores.values()).index({'nickname': jogador2})]
-        
-        # Calcula o novo elo
-        elo_j1 = jogadores[sid_j1]['elo']
-        elo_j2 = jogadores[sid_j2]['elo']
-        
-        if vencedor == jogador1:
-            novo_elo_j1, novo_elo_j2 = calcular_novo_elo(elo_j1, elo_j2)
-        else:
-            novo_elo_j2, novo_elo_j1 = calcular_novo_elo(elo_j2, elo_j1)
-        
-        # Atualiza o elo dos jogadores
-        jogadores[sid_j1]['elo'] = novo_elo_j1
-        jogadores[sid_j2]['elo'] = novo_elo_j2
-        
-        # Notifica os jogadores
-        emit('partida_registrada', {
-            'vencedor': vencedor,
-            'novo_mmr_j1': novo_elo_j1
-        }, room=sid_j1)
-        
-        emit('partida_registrada', {
-            'vencedor': vencedor,
-            'novo_mmr_j1': novo_elo_j2
-        }, room=sid_j2)
-        
-        logger.info(f"Partida registrada: {jogador1} vs {jogador2}, vencedor: {vencedor}")
-        logger.info(f"Novo elo {jogador1}: {novo_elo_j1}")
-        logger.info(f"Novo elo {jogador2}: {novo_elo_j2}")
-    except Exception as e:
-        logger.error(f"Erro ao registrar partida: {e}")
-        emit('error', {'message': str(e)})
-
-def encerrar_servidor(signum, frame):
-    """Função para encerrar o servidor de forma limpa"""
-    logger.info("Encerrando servidor...")
-    sys.exit(0)
-
-if __name__ == '__main__':
-    try:
-        logger.info("Iniciando servidor de matchmaking...")
-        
-        # Configura o handler para SIGINT (Ctrl+C)
-        signal.signal(signal.SIGINT, encerrar_servidor)
-        
-        # Inicia o processamento da fila em uma thread separada
-        thread_fila = threading.Thread(target=processar_fila)
-        thread_fila.daemon = True
-        thread_fila.start()
-        
-        # Inicia o servidor com threading
-        socketio.run(
-            app,
-            host='0.0.0.0',
-            port=5000,
-            debug=False,
-            use_reloader=False
-        )
-    except KeyboardInterrupt:
-        logger.info("Servidor encerrado pelo usuário")
-    except Exception as e:
-        logger.error(f"Erro ao iniciar servidor: {e}")
-    finally:
+from flask import Flask, Response, jsonify, request
+from flask_socketio import SocketIO, emit, join_room, leave_room
+from database import Database
+from ia_matchmaking import MatrizCaracteristicas, obter_sistema_ia
+import hmac
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import time
+import threading
+import sys
+import logging
+import random
+from datetime import datetime, timedelta
+from game import Partida
+from fila_matchmaking import FilaMatchmaking, parear_por_elo
+from sessoes import RegistroSessoes
+from metricas import BUCKETS_TEMPO_FILA, TIPO_CONTEUDO, registro
+from rastreamento import PerfiladorAmostragem, Rastreador, etapa, formatar_collapsed
+import signal
+import eventlet
+eventlet.monkey_patch()
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = Flask(__name__)
+# Configuração do SocketIO com eventlet
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    async_mode='eventlet',
+    logger=False,
+    engineio_logger=False,
+    ping_timeout=60,
+    ping_interval=25
+)
+# Caminho do banco configurável (o gerador de carga e os benchmarks usam um arquivo descartável)
+db = Database(os.environ.get('MATCHMAKING_DB', 'matchmaking.db'))
+# Carrega os modelos compartilhados já na inicialização
+obter_sistema_ia()
+
+# Registro bidirecional dos sockets ativos (nickname <-> sid)
+sessoes = RegistroSessoes()
+# Dicionário para armazenar os jogadores
+jogadores: Dict[str, Dict] = {}
+# Características dos jogadores na fila, mantidas incrementalmente para o clustering
+matriz_fila = MatrizCaracteristicas()
+# Fila de jogadores indexada por elo, região e plataforma
+fila = FilaMatchmaking(ao_remover=matriz_fila.remover)
+
+# Quantidade de candidatos de elo mais próximo avaliados pelo clustering
+CANDIDATOS_POR_MATCH = 16
+
+# Configuração do processamento da fila
+MATCHMAKING_EM_LOTE = True  # Pareia todos os elegíveis a cada tick em vez de um jogador por vez
+INTERVALO_TICK_FILA = 0.1  # Segundos entre cada tick
+MAX_PARES_POR_TICK = 256  # Limite de partidas formadas por tick no modo em lote
+TEMPO_MINIMO_ESPERA = timedelta(seconds=30)
+ATRASO_TENTATIVA_MATCH = 15  # Segundos entre a entrada na fila e a primeira tentativa de match
+TEMPO_MAXIMO_FILA = timedelta(minutes=5)
+
+# Métricas expostas em /metrics
+LARGURA_FAIXA_ELO = 200  # Largura das faixas de elo do gauge da fila
+TEMPO_ATE_MATCH = registro.histograma(
+    'matchmaking_tempo_ate_match_segundos', 'Tempo entre a entrada na fila e o match', limites=BUCKETS_TEMPO_FILA)
+DURACAO_TICK = registro.histograma('matchmaking_tick_duracao_segundos', 'Duração de cada tick de processar_fila')
+PARTIDAS = registro.contador('matchmaking_partidas_total', 'Partidas formadas')
+TIMEOUTS_FILA = registro.contador('matchmaking_timeouts_fila_total', 'Jogadores removidos da fila por timeout')
+ERROS = registro.contador('matchmaking_erros_total', 'Erros tratados pelo servidor', ('origem',))
+SOCKETS = registro.medidor('matchmaking_sockets_conectados', 'Sockets conectados')
+registro.medidor('matchmaking_sessoes_ativas', 'Jogadores com login ativo', funcao=lambda: len(sessoes))
+registro.medidor('matchmaking_fila_jogadores', 'Jogadores na fila por região e faixa de elo',
+                 ('regiao', 'faixa_elo'), funcao=lambda: fila.contagem_por_faixa(LARGURA_FAIXA_ELO))
+ETAPAS = registro.histograma(
+    'matchmaking_etapa_duracao_segundos', 'Duração de cada etapa dos ticks e handlers', ('operacao', 'etapa'))
+
+# Rastreamento por etapa (ticks lentos) e perfilador sob demanda
+rastreador = Rastreador(histograma=ETAPAS)
+perfilador = PerfiladorAmostragem()
+# Token exigido no header X-Admin-Token pelas rotas /admin (sem ele, as rotas ficam desativadas)
+TOKEN_ADMIN = os.environ.get('MATCHMAKING_ADMIN_TOKEN')
+MAX_TICKS_LENTOS = 100
+
+def calcular_novo_elo(elo_vencedor: int, elo_perdedor: int) -> tuple[int, int]:
+    """Calcula o novo elo após uma partida usando o sistema Elo"""
+    K = 32  # Fator K (quanto mais alto, mais o elo muda)
+    
+    # Calcula a probabilidade esperada de vitória
+    esperado_vencedor = 1 / (1 + 10 ** ((elo_perdedor - elo_vencedor) / 400))
+    esperado_perdedor = 1 - esperado_vencedor
+    
+    # Calcula o novo elo
+    novo_elo_vencedor = elo_vencedor + K * (1 - esperado_vencedor)
+    novo_elo_perdedor = elo_perdedor + K * (0 - esperado_perdedor)
+    
+    return int(novo_elo_vencedor), int(novo_elo_perdedor)
+
+def parear_jogadores(jogadores_particao: List[Tuple[int, str]]) -> List[Tuple[str, str]]:
+    """Agrupa os jogadores pelos clusters da matriz de características e pareia por elo dentro de cada grupo.
+    
+    É o único caminho de pareamento: usado pelo tick em lote e pela tentativa agendada na entrada da fila.
+    Enquanto não houver KMeans treinado, todos caem no mesmo grupo e o pareamento é por elo na partição inteira.
+    """
+    with etapa('clustering'):
+        clusters = matriz_fila.clusters([nickname for _, nickname in jogadores_particao])
+    grupos: Dict[int, List[Tuple[int, str]]] = {}
+    for elo, nickname in jogadores_particao:
+        if nickname in clusters:
+            grupos.setdefault(clusters[nickname], []).append((elo, nickname))
+    
+    pares = []
+    with etapa('pareamento'):
+        for membros in grupos.values():
+            pares.extend(parear_por_elo(membros))
+    return pares
+
+def encontrar_match(jogador1: str) -> Optional[str]:
+    """Encontra um match adequado para o jogador usando clustering"""
+    if len(fila) < 2 or jogador1 not in fila:
+        return None
+    
+    # Candidatos de elo mais próximo na mesma região e plataforma, do mais próximo ao mais distante
+    with etapa('leitura_fila'):
+        candidatos = fila.candidatos_proximos(jogador1, CANDIDATOS_POR_MATCH)
+        entradas = [fila.buscar(nickname) for nickname in [jogador1] + candidatos]
+    if not candidatos:
+        return None
+    
+    # Pareia o jogador e os candidatos com a mesma regra do tick em lote e fica com o par do jogador1
+    pares = parear_jogadores([(entrada.elo, entrada.nickname) for entrada in entradas if entrada])
+    melhor_match = next((j2 if j1 == jogador1 else j1 for j1, j2 in pares if jogador1 in (j1, j2)), None)
+    
+    if melhor_match:
+        menor_diferenca_elo = abs(fila.buscar(jogador1).elo - fila.buscar(melhor_match).elo)
+        logger.info(f"Match encontrado usando clustering: {jogador1} vs {melhor_match}")
+        logger.info(f"Diferença de elo: {menor_diferenca_elo}")
+    
+    return melhor_match
+
+def remover_par_da_fila(jogador1: str, jogador2: str) -> bool:
+    """Remove o par da fila (se ambos ainda estiverem nela) e registra quanto cada um esperou"""
+    entradas = (fila.tempo_entrada(jogador1), fila.tempo_entrada(jogador2))
+    if not fila.remover_par(jogador1, jogador2):
+        return False
+    agora = datetime.now()
+    for entrada in entradas:
+        if entrada:
+            TEMPO_ATE_MATCH.observe((agora - entrada).total_seconds())
+    return True
+
+def finalizar_partida(jogador1: str, jogador2: str) -> bool:
+    """Simula a partida entre dois jogadores já removidos da fila, grava o resultado e notifica ambos"""
+    # Calcula a diferença de elo
+    elo_j1 = jogadores[jogador1]['elo']
+    elo_j2 = jogadores[jogador2]['elo']
+    diferenca_elo = abs(elo_j1 - elo_j2)
+    
+    # Encontra os SIDs dos jogadores
+    sid_j1 = sessoes.sid_de(jogador1)
+    sid_j2 = sessoes.sid_de(jogador2)
+    
+    if not sid_j1 or not sid_j2:
+        logger.error(f"Não foi possível encontrar SIDs para os jogadores {jogador1} e {jogador2}")
+        return False
+    
+    with etapa('simulacao'):
+        # Cria uma nova partida
+        partida = Partida(jogador1, jogador2)
+        
+        # Simula a partida
+        resultado = partida.simular_partida()
+        
+        # Determina o vencedor baseado nas kills
+        vencedor = jogador1 if resultado['kills_j1'] > resultado['kills_j2'] else jogador2
+        
+        # Atualiza o elo dos jogadores
+        if vencedor == jogador1:
+            novo_elo_j1, novo_elo_j2 = calcular_novo_elo(elo_j1, elo_j2)
+        else:
+            novo_elo_j2, novo_elo_j1 = calcular_novo_elo(elo_j2, elo_j1)
+    
+    # Atualiza o elo na memória
+    jogadores[jogador1]['elo'] = novo_elo_j1
+    jogadores[jogador2]['elo'] = novo_elo_j2
+    
+    with etapa('escrita_banco'):
+        # Salva o elo dos dois jogadores e a partida em uma única transação (gravada em lote)
+        db.registrar_resultado_partida(
+            jogador1,
+            jogador2,
+            vencedor,
+            novo_elo_j1,
+            novo_elo_j2,
+            {
+                'kills_j1': resultado['kills_j1'],
+                'kills_j2': resultado['kills_j2'],
+                'deaths_j1': resultado['deaths_j1'],
+                'deaths_j2': resultado['deaths_j2'],
+                'assists_j1': resultado['assists_j1'],
+                'assists_j2': resultado['assists_j2'],
+                'tempo_partida': resultado['tempo_partida'],
+                'ping': resultado['ping']
+            }
+        )
+    
+    with etapa('emit'):
+        # Notifica os jogadores
+        socketio.emit('match_encontrado', {
+            'jogador2': jogador2,
+            'vencedor': vencedor,
+            'kills_j1': resultado['kills_j1'],
+            'kills_j2': resultado['kills_j2'],
+            'deaths_j1': resultado['deaths_j1'],
+            'deaths_j2': resultado['deaths_j2'],
+            'assists_j1': resultado['assists_j1'],
+            'assists_j2': resultado['assists_j2'],
+            'tempo_partida': resultado['tempo_partida'],
+            'ping': resultado['ping'],
+            'novo_elo': novo_elo_j1
+        }, room=sid_j1)
+        
+        socketio.emit('match_encontrado', {
+            'jogador2': jogador1,
+            'vencedor': vencedor,
+            'kills_j1': resultado['kills_j2'],
+            'kills_j2': resultado['kills_j1'],
+            'deaths_j1': resultado['deaths_j2'],
+            'deaths_j2': resultado['deaths_j1'],
+            'assists_j1': resultado['assists_j2'],
+            'assists_j2': resultado['assists_j1'],
+            'tempo_partida': resultado['tempo_partida'],
+            'ping': resultado['ping'],
+            'novo_elo': novo_elo_j2
+        }, room=sid_j2)
+    
+    logger.info(f"Match encontrado: {jogador1} vs {jogador2}")
+    logger.info(f"Diferença de elo: {diferenca_elo}")
+    logger.info(f"Resultado: {vencedor} venceu com {resultado['kills_j1'] if vencedor == jogador1 else resultado['kills_j2']} kills")
+    PARTIDAS.inc()
+    return True
+
+def parear_elegiveis(agora: datetime) -> List[Tuple[str, str]]:
+    """Calcula os pares de menor diferença total de elo entre todos os jogadores elegíveis"""
+    pares = []
+    elos = {}
+    with etapa('leitura_fila'):
+        particoes = fila.elegiveis_por_particao(agora - TEMPO_MINIMO_ESPERA)
+    for jogadores_particao in particoes.values():
+        if len(jogadores_particao) < 2:
+            continue
+        
+        for elo, nickname in jogadores_particao:
+            elos[nickname] = elo
+        pares.extend(parear_jogadores(jogadores_particao))
+    
+    # Prioriza os pares mais equilibrados quando o limite por tick é atingido
+    if len(pares) > MAX_PARES_POR_TICK:
+        pares.sort(key=lambda par: abs(elos[par[0]] - elos[par[1]]))
+        pares = pares[:MAX_PARES_POR_TICK]
+    return pares
+
+def processar_lote(agora: datetime):
+    """Pareia todos os jogadores elegíveis de uma vez e finaliza as partidas do tick"""
+    pares = parear_elegiveis(agora)
+    if not pares:
+        return
+    
+    # Remove todos os pares da fila antes de finalizar qualquer partida
+    with etapa('remocao_fila'):
+        pares = [(j1, j2) for j1, j2 in pares if remover_par_da_fila(j1, j2)]
+    
+    for jogador1, jogador2 in pares:
+        try:
+            finalizar_partida(jogador1, jogador2)
+        except Exception as e:
+            logger.error(f"Erro ao finalizar partida {jogador1} vs {jogador2}: {e}")
+            ERROS.rotulado('finalizar_partida').inc()
+    
+    logger.info(f"Tick em lote: {len(pares)} partidas formadas")
+
+def tentar_match(nickname: str) -> bool:
+    """Tenta formar uma partida para o jogador. Caminho único usado pelo handler e pela thread da fila"""
+    # O jogador pode já ter sido pareado ou saído da fila
+    if nickname not in fila:
+        return False
+    
+    jogador2 = encontrar_match(nickname)
+    
+    # Remove jogadores da fila
+    if jogador2 and remover_par_da_fila(nickname, jogador2):
+        return finalizar_partida(nickname, jogador2)
+    return False
+
+def tentativa_agendada(nickname: str):
+    """Executa a tentativa de match agendada na entrada da fila"""
+    try:
+        with rastreador.rastrear('tentativa_agendada'):
+            tentar_match(nickname)
+    except Exception as e:
+        logger.error(f"Erro na tentativa agendada de match para {nickname}: {e}")
+        ERROS.rotulado('tentativa_agendada').inc()
+
+def agendar_tentativa_match(nickname: str):
+    """Agenda uma tentativa de match para o jogador sem bloquear o chamador"""
+    eventlet.spawn_after(ATRASO_TENTATIVA_MATCH, tentativa_agendada, nickname)
+
+def processar_jogador_esperando(agora: datetime):
+    """Tenta encontrar um match apenas para o jogador que espera há mais tempo"""
+    # Verifica se algum jogador já esperou 30 segundos
+    esperando = fila.esperando_desde(agora - TEMPO_MINIMO_ESPERA)
+    if esperando:
+        tentar_match(esperando[0])
+
+def processar_fila():
+    """Processa a fila periodicamente para encontrar matches"""
+    while True:
+        try:
+            inicio_tick = time.perf_counter()
+            with rastreador.rastrear('processar_fila'):
+                agora = datetime.now()
+                
+                # Remove jogadores que esperaram mais de 5 minutos
+                with etapa('expirados'):
+                    expirados = fila.remover_expirados(agora - TEMPO_MAXIMO_FILA)
+                for jogador in expirados:
+                    logger.info(f"Jogador {jogador} removido da fila por timeout")
+                if expirados:
+                    TIMEOUTS_FILA.inc(len(expirados))
+                
+                # Se tiver pelo menos 2 jogadores na fila
+                if len(fila) >= 2:
+                    if MATCHMAKING_EM_LOTE:
+                        processar_lote(agora)
+                    else:
+                        processar_jogador_esperando(agora)
+            
+            DURACAO_TICK.observe(time.perf_counter() - inicio_tick)
+            time.sleep(INTERVALO_TICK_FILA)
+        except Exception as e:
+            logger.error(f"Erro ao processar fila: {e}")
+            ERROS.rotulado('processar_fila').inc()
+            time.sleep(1)  # Mantém 1 segundo em caso de erro
+
+@app.route('/metrics')
+def metrics():
+    """Métricas do servidor no formato de texto do Prometheus"""
+    return Response(registro.renderizar(), content_type=TIPO_CONTEUDO)
+
+def autorizado() -> bool:
+    """Confere o header X-Admin-Token das rotas /admin"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(TOKEN_ADMIN) and hmac.compare_digest(token.encode(), TOKEN_ADMIN.encode())
+
+@app.route('/admin/ticks_lentos')
+def ticks_lentos():
+    """Ticks e handlers mais lentos recentes, com o tempo de cada etapa"""
+    if not autorizado():
+        return jsonify({'message': 'Não autorizado'}), 403
+    limite = request.args.get('limite', MAX_TICKS_LENTOS, type=int)
+    return jsonify(rastreador.operacoes_lentas(limite))
+
+@app.route('/admin/perfil', methods=['POST'])
+def perfil():
+    """Amostra as pilhas do processo por alguns segundos e devolve no formato collapsed (flame graph)"""
+    if not autorizado():
+        return jsonify({'message': 'Não autorizado'}), 403
+    segundos = request.args.get('segundos', 10, type=float)
+    intervalo = request.args.get('intervalo', 0.005, type=float)
+    logger.info(f"Perfil por amostragem iniciado ({segundos} s)")
+    pilhas = perfilador.amostrar(segundos, intervalo)
+    if pilhas is None:
+        return jsonify({'message': 'Já existe um perfil em andamento'}), 409
+    return Response(formatar_collapsed(pilhas), content_type='text/plain; charset=utf-8')
+
+@socketio.on('connect')
+def handle_connect():
+    SOCKETS.inc()
+    logger.info(f"Cliente conectado: {request.sid}")
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    SOCKETS.dec()
+    nickname = sessoes.remover_sid(request.sid)
+    if nickname:
+        db.sair_da_fila(nickname)
+        fila.remover(nickname)
+        leave_room(nickname)
+        logger.info(f"Cliente desconectado: {nickname}")
+
+@socketio.on('login')
+def handle_login(data):
+    try:
+        nickname = data['nickname']
+        elo = data['elo']
+        
+        # Verifica se o jogador já existe no banco
+        jogador_existente = db.buscar_jogador(nickname)
+        if jogador_existente:
+            elo = jogador_existente['estatisticas']['elo']
+        else:
+            # Cria um novo jogador no banco
+            db.adicionar_jogador({
+                'nickname': nickname,
+                'plataforma': 'PC',
+                'regiao': 'BR',
+                'estatisticas': {
+                    'elo': elo,
+                    'kills': 0,
+                    'deaths': 0,
+                    'assists': 0,
+                    'vitorias': 0,
+                    'derrotas': 0
+                },
+                'preferences': {}
+            })
+        
+        # Adiciona à lista de jogadores
+        jogadores[nickname] = {
+            'nickname': nickname,
+            'elo': elo
+        }
+        sid_anterior = sessoes.registrar(request.sid, nickname)
+        if sid_anterior:
+            logger.info(f"Jogador {nickname} reconectou (sessão anterior: {sid_anterior})")
+        
+        logger.info(f"Jogador {nickname} fez login com elo {elo}")
+        emit('login_sucesso', {
+            'nickname': nickname,
+            'estatisticas': {
+                'elo': elo
+            }
+        })
+    except Exception as e:
+        logger.error(f"Erro no login: {e}")
+        ERROS.rotulado('login').inc()
+        emit('error', {'message': str(e)})
+
+@socketio.on('entrar_fila')
+def handle_entrar_fila():
+    try:
+        with rastreador.rastrear('entrar_fila'):
+            # Verifica se o jogador está logado
+            nickname = sessoes.nickname_de(request.sid)
+            if not nickname:
+                return emit('error', {'message': 'Faça login primeiro'})
+            
+            # Verifica se o jogador existe no banco
+            with etapa('leitura_banco'):
+                jogador = db.buscar_jogador(nickname)
+            if not jogador:
+                return emit('error', {'message': 'Jogador não encontrado'})
+            
+            elo = jogador['estatisticas']['elo']
+            
+            # Adiciona à fila
+            with etapa('fila'):
+                adicionado = fila.adicionar(nickname, elo, jogador['regiao'], jogador['plataforma'])
+                if adicionado:
+                    matriz_fila.adicionar(jogador)
+            if adicionado:
+                logger.info(f"Jogador {nickname} entrou na fila com elo {elo}")
+                with etapa('emit'):
+                    emit('fila_entrada', {'message': 'Você entrou na fila'})
+                
+                # Agenda a primeira tentativa de match sem bloquear o handler
+                with etapa('agendamento'):
+                    agendar_tentativa_match(nickname)
+    except Exception as e:
+        logger.error(f"Erro ao entrar na fila: {e}")
+        ERROS.rotulado('entrar_fila').inc()
+        emit('error', {'message': str(e)})
+
+@socketio.on('sair_fila')
+def handle_sair_fila():
+    try:
+        nickname = sessoes.nickname_de(request.sid)
+        if not nickname:
+            return emit('error', {'message': 'Faça login primeiro'})
+        if fila.remover(nickname):
+            logger.info(f"Jogador {nickname} saiu da fila")
+            emit('fila_saida', {'message': 'Você saiu da fila'})
+    except Exception as e:
+        logger.error(f"Erro ao sair da fila: {e}")
+        ERROS.rotulado('sair_fila').inc()
+        emit('error', {'message': str(e)})
+
+@socketio.on('historico_partidas')
+def handle_historico_partidas(data=None):
+    try:
+        nickname = sessoes.nickname_de(request.sid)
+        if not nickname:
+            return emit('error', {'message': 'Faça login primeiro'})
+        
+        # Sempre o histórico do próprio jogador da sessão
+        data = data or {}
+        pagina = db.buscar_historico_paginado(
+            nickname,
+            int(data.get('limite', 10)),
+            data.get('cursor')
+        )
+        emit('historico_partidas', pagina)
+    except Exception as e:
+        logger.error(f"Erro ao buscar histórico de partidas: {e}")
+        ERROS.rotulado('historico_partidas').inc()
+        emit('error', {'message': str(e)})
+
+@socketio.on('registrar_partida')
+def handle_registrar_partida(data):
+    try:
+        jogador1 = data['jogador1']
+        jogador2 = data['jogador2']
+        vencedor = data['vencedor']
+        
+        # Encontra os SIDs dos jogadores
+        sid_j1 = sessoes.sid_de(jogador1)
+        sid_j2 = sessoes.sid_de(jogador2)
+        if not sid_j1 or not sid_j2:
+            return emit('error', {'message': 'Jogadores não estão conectados'})
+        
+        # Calcula o novo elo
+        elo_j1 = jogadores[jogador1]['elo']
+        elo_j2 = jogadores[jogador2]['elo']
+        
+        if vencedor == jogador1:
+            novo_elo_j1, novo_elo_j2 = calcular_novo_elo(elo_j1, elo_j2)
+        else:
+            novo_elo_j2, novo_elo_j1 = calcular_novo_elo(elo_j2, elo_j1)
+        
+        # Atualiza o elo dos jogadores
+        jogadores[jogador1]['elo'] = novo_elo_j1
+        jogadores[jogador2]['elo'] = novo_elo_j2
+        
+        # Reposiciona os jogadores que estiverem na fila
+        for nickname, novo_elo in ((jogador1, novo_elo_j1), (jogador2, novo_elo_j2)):
+            fila.atualizar_elo(nickname, novo_elo)
+            matriz_fila.atualizar_elo(nickname, novo_elo)
+        
+        # Notifica os jogadores
+        emit('partida_registrada', {
+            'vencedor': vencedor,
+            'novo_mmr_j1': novo_elo_j1
+        }, room=sid_j1)
+        
+        emit('partida_registrada', {
+            'vencedor': vencedor,
+            'novo_mmr_j1': novo_elo_j2
+        }, room=sid_j2)
+        
+        logger.info(f"Partida registrada: {jogador1} vs {jogador2}, vencedor: {vencedor}")
+        logger.info(f"Novo elo {jogador1}: {novo_elo_j1}")
+        logger.info(f"Novo elo {jogador2}: {novo_elo_j2}")
+    except Exception as e:
+        logger.error(f"Erro ao registrar partida: {e}")
+        ERROS.rotulado('registrar_partida').inc()
+        emit('error', {'message': str(e)})
+
+def encerrar_servidor(signum, frame):
+    """Função para encerrar o servidor de forma limpa"""
+    logger.info("Encerrando servidor...")
+    sys.exit(0)
+
+if __name__ == '__main__':
+    try:
+        logger.info("Iniciando servidor de matchmaking...")
+        
+        # Configura o handler para SIGINT (Ctrl+C)
+        signal.signal(signal.SIGINT, encerrar_servidor)
+        
+        # Inicia o processamento da fila em uma thread separada
+        thread_fila = threading.Thread(target=processar_fila)
+        thread_fila.daemon = True
+        thread_fila.start()
+        
+        # Inicia o servidor com threading
+        socketio.run(
+            app,
+            host='0.0.0.0',
+            port=5000,
+            debug=False,
+            use_reloader=False
+        )
+    except KeyboardInterrupt:
+        logger.info("Servidor encerrado pelo usuário")
+    except Exception as e:
+        logger.error(f"Erro ao iniciar servidor: {e}")
+    finally:
+        # Grava os resultados ainda na fila do escritor em lote antes de sair
+        db.fechar()
         logger.info("Servidor encerrado") 
\ No newline at end of file
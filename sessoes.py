@@ -0,0 +1,71 @@
+from typing import Dict, Optional
+import threading
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RegistroSessoes:
+    """Registro bidirecional entre nickname e sid dos jogadores conectados.
+
+    Mantém dois dicionários sincronizados para que a busca nos dois sentidos
+    seja O(1). Um novo login com o mesmo nickname substitui a sessão anterior
+    (reconexão); o disconnect tardio da sessão antiga é ignorado.
+    """
+
+    def __init__(self):
+        self._por_sid: Dict[str, str] = {}  # {sid: nickname}
+        self._por_nickname: Dict[str, str] = {}  # {nickname: sid}
+        self._lock = threading.Lock()
+        self.total_logins = 0
+        self.total_reconexoes = 0
+        self.total_desconexoes = 0
+
+    def __len__(self) -> int:
+        return len(self._por_nickname)
+
+    def registrar(self, sid: str, nickname: str) -> Optional[str]:
+        """Associa o sid ao nickname. Retorna o sid anterior em caso de reconexão"""
+        with self._lock:
+            # Um mesmo socket que troca de nickname deixa de representar o anterior
+            nickname_anterior = self._por_sid.get(sid)
+            if nickname_anterior is not None and nickname_anterior != nickname:
+                del self._por_nickname[nickname_anterior]
+
+            sid_anterior = self._por_nickname.get(nickname)
+            if sid_anterior is not None and sid_anterior != sid:
+                del self._por_sid[sid_anterior]
+                self.total_reconexoes += 1
+
+            self._por_sid[sid] = nickname
+            self._por_nickname[nickname] = sid
+            self.total_logins += 1
+            return sid_anterior if sid_anterior != sid else None
+
+    def remover_sid(self, sid: str) -> Optional[str]:
+        """Remove a sessão do sid. Retorna o nickname se essa era a sessão ativa dele"""
+        with self._lock:
+            nickname = self._por_sid.pop(sid, None)
+            if nickname is None:
+                return None
+            if self._por_nickname.get(nickname) == sid:
+                del self._por_nickname[nickname]
+            self.total_desconexoes += 1
+            return nickname
+
+    def nickname_de(self, sid: str) -> Optional[str]:
+        return self._por_sid.get(sid)
+
+    def sid_de(self, nickname: str) -> Optional[str]:
+        return self._por_nickname.get(nickname)
+
+    def contagens(self) -> Dict[str, int]:
+        """Contadores do registro para monitoramento"""
+        return {
+            'sessoes_ativas': len(self._por_nickname),
+            'total_logins': self.total_logins,
+            'total_reconexoes': self.total_reconexoes,
+            'total_desconexoes': self.total_desconexoes
+        }
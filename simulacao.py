@@ -0,0 +1,185 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+import argparse
+import logging
+import time
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fator K do Elo, o mesmo de server.calcular_novo_elo
+FATOR_K = 32
+
+# Faixas sorteadas por partida, as mesmas de game.Partida.simular_partida
+MAX_KILLS = 20
+MAX_DEATHS = 10
+MAX_ASSISTS = 15
+DURACAO_MINIMA = 10
+DURACAO_MAXIMA = 30
+PING_MINIMO = 20.0
+PING_MAXIMO = 100.0
+
+# Como o vencedor é decidido: 'kills' (como o servidor) ou 'elo' (probabilidade esperada do Elo)
+MODOS_VITORIA = ('kills', 'elo')
+
+# Desvio do ruído somado ao elo no pareamento da temporada (imita a ordem de chegada na fila)
+RUIDO_PAREAMENTO = 50.0
+
+
+def probabilidade_esperada(elo_a: np.ndarray, elo_b: np.ndarray) -> np.ndarray:
+    """Probabilidade esperada de vitória de `elo_a` contra `elo_b` no sistema Elo"""
+    elo_a = np.asarray(elo_a, dtype=np.float64)
+    elo_b = np.asarray(elo_b, dtype=np.float64)
+    return 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
+
+
+def calcular_novo_elo_lote(elo_vencedor: np.ndarray, elo_perdedor: np.ndarray,
+                           k: float = FATOR_K) -> Tuple[np.ndarray, np.ndarray]:
+    """Versão vetorizada de server.calcular_novo_elo para N partidas.
+    
+    Usa a mesma fórmula e o mesmo truncamento para inteiro (em direção a zero)
+    da versão escalar.
+    """
+    esperado_vencedor = probabilidade_esperada(elo_vencedor, elo_perdedor)
+    esperado_perdedor = 1 - esperado_vencedor
+    
+    novo_elo_vencedor = np.asarray(elo_vencedor) + k * (1 - esperado_vencedor)
+    novo_elo_perdedor = np.asarray(elo_perdedor) + k * (0 - esperado_perdedor)
+    
+    return np.trunc(novo_elo_vencedor).astype(np.int64), np.trunc(novo_elo_perdedor).astype(np.int64)
+
+
+class MotorSimulacao:
+    """Simulação de Monte Carlo de partidas 1x1 em lote.
+    
+    Cada chamada sorteia as estatísticas de N partidas de uma vez com um
+    numpy.random.Generator, então a mesma seed reproduz os mesmos resultados.
+    """
+
+    def __init__(self, seed: Optional[int] = None, k: float = FATOR_K, modo_vitoria: str = 'kills'):
+        if modo_vitoria not in MODOS_VITORIA:
+            raise ValueError(f"Modo de vitória inválido: {modo_vitoria}")
+        self.rng = np.random.default_rng(seed)
+        self.k = k
+        self.modo_vitoria = modo_vitoria
+
+    def sortear_partidas(self, quantidade: int) -> Dict[str, np.ndarray]:
+        """Sorteia kills, deaths, assists, duração e ping de `quantidade` partidas"""
+        rng = self.rng
+        return {
+            'kills_j1': rng.integers(0, MAX_KILLS, quantidade, endpoint=True),
+            'kills_j2': rng.integers(0, MAX_KILLS, quantidade, endpoint=True),
+            'deaths_j1': rng.integers(0, MAX_DEATHS, quantidade, endpoint=True),
+            'deaths_j2': rng.integers(0, MAX_DEATHS, quantidade, endpoint=True),
+            'assists_j1': rng.integers(0, MAX_ASSISTS, quantidade, endpoint=True),
+            'assists_j2': rng.integers(0, MAX_ASSISTS, quantidade, endpoint=True),
+            'tempo_partida': rng.integers(DURACAO_MINIMA, DURACAO_MAXIMA, quantidade, endpoint=True),
+            'ping': rng.uniform(PING_MINIMO, PING_MAXIMO, quantidade)
+        }
+
+    def simular(self, elos_j1: np.ndarray, elos_j2: np.ndarray) -> Dict[str, np.ndarray]:
+        """Simula uma partida para cada par (elos_j1[i], elos_j2[i]).
+        
+        Retorna as estatísticas sorteadas, `vitoria_j1` e os novos elos de
+        cada lado, todos como arrays de tamanho N.
+        """
+        elos_j1 = np.asarray(elos_j1, dtype=np.int64)
+        elos_j2 = np.asarray(elos_j2, dtype=np.int64)
+        if elos_j1.shape != elos_j2.shape:
+            raise ValueError("elos_j1 e elos_j2 devem ter o mesmo tamanho")
+        
+        resultado = self.sortear_partidas(len(elos_j1))
+        if self.modo_vitoria == 'kills':
+            # Como em server.finalizar_partida: empate em kills é vitória do jogador 2
+            vitoria_j1 = resultado['kills_j1'] > resultado['kills_j2']
+        else:
+            vitoria_j1 = self.rng.random(len(elos_j1)) < probabilidade_esperada(elos_j1, elos_j2)
+        
+        elo_vencedor = np.where(vitoria_j1, elos_j1, elos_j2)
+        elo_perdedor = np.where(vitoria_j1, elos_j2, elos_j1)
+        novo_vencedor, novo_perdedor = calcular_novo_elo_lote(elo_vencedor, elo_perdedor, self.k)
+        
+        resultado['vitoria_j1'] = vitoria_j1
+        resultado['novo_elo_j1'] = np.where(vitoria_j1, novo_vencedor, novo_perdedor)
+        resultado['novo_elo_j2'] = np.where(vitoria_j1, novo_perdedor, novo_vencedor)
+        return resultado
+
+    def parear(self, elos: np.ndarray, por_elo: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Forma os pares de uma rodada e retorna os índices dos dois lados.
+        
+        Com `por_elo`, os jogadores são ordenados pelo elo mais um ruído e
+        pareados com o vizinho, como na fila; caso contrário, ao acaso. Com
+        uma população ímpar, um jogador fica de fora da rodada.
+        """
+        if por_elo:
+            ordem = np.argsort(elos + self.rng.normal(0, RUIDO_PAREAMENTO, len(elos)))
+        else:
+            ordem = self.rng.permutation(len(elos))
+        metade = len(ordem) // 2
+        return ordem[0:2 * metade:2], ordem[1:2 * metade:2]
+
+    def simular_temporada(self, elos: np.ndarray, rodadas: int, por_elo: bool = True,
+                          registrar_historico: bool = False) -> Dict[str, np.ndarray]:
+        """Repete `rodadas` rodadas em que cada jogador da população joga no máximo uma partida.
+        
+        Retorna os elos finais, partidas e vitórias por jogador e, com
+        `registrar_historico`, a matriz (rodadas + 1) x N dos elos após cada rodada.
+        """
+        elos = np.array(elos, dtype=np.int64)
+        partidas = np.zeros(len(elos), dtype=np.int64)
+        vitorias = np.zeros(len(elos), dtype=np.int64)
+        historico = np.empty((rodadas + 1, len(elos)), dtype=np.int64) if registrar_historico else None
+        if historico is not None:
+            historico[0] = elos
+        
+        for rodada in range(rodadas):
+            lado1, lado2 = self.parear(elos, por_elo)
+            resultado = self.simular(elos[lado1], elos[lado2])
+            
+            # Cada jogador aparece no máximo uma vez por rodada, então a atribuição indexada é segura
+            elos[lado1] = resultado['novo_elo_j1']
+            elos[lado2] = resultado['novo_elo_j2']
+            partidas[lado1] += 1
+            partidas[lado2] += 1
+            vitorias[lado1] += resultado['vitoria_j1']
+            vitorias[lado2] += ~resultado['vitoria_j1']
+            if historico is not None:
+                historico[rodada + 1] = elos
+        
+        temporada = {'elos': elos, 'partidas': partidas, 'vitorias': vitorias}
+        if historico is not None:
+            temporada['historico'] = historico
+        return temporada
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de uma temporada simulada")
+    parser.add_argument('--jogadores', type=int, default=1_000_000)
+    parser.add_argument('--rodadas', type=int, default=50)
+    parser.add_argument('--elo-inicial', type=float, default=1000)
+    parser.add_argument('--desvio', type=float, default=200, help='desvio padrão dos elos iniciais')
+    parser.add_argument('--k', type=float, default=FATOR_K)
+    parser.add_argument('--modo-vitoria', choices=MODOS_VITORIA, default='kills')
+    parser.add_argument('--aleatorio', action='store_true', help='pareamento ao acaso em vez de por elo')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    motor = MotorSimulacao(args.seed, args.k, args.modo_vitoria)
+    elos = np.rint(motor.rng.normal(args.elo_inicial, args.desvio, args.jogadores)).astype(np.int64)
+    
+    inicio = time.perf_counter()
+    temporada = motor.simular_temporada(elos, args.rodadas, por_elo=not args.aleatorio)
+    duracao = time.perf_counter() - inicio
+    
+    total_partidas = int(temporada['partidas'].sum()) // 2
+    finais = temporada['elos']
+    print(f"{args.jogadores} jogadores, {args.rodadas} rodadas, {total_partidas} partidas em {duracao:.2f} s "
+          f"({total_partidas / duracao:,.0f} partidas/s)")
+    print(f"Elo inicial: média {elos.mean():.1f}, desvio {elos.std():.1f}")
+    print(f"Elo final:   média {finais.mean():.1f}, desvio {finais.std():.1f}, "
+          f"min {finais.min()}, max {finais.max()}")
+    print(f"Percentis finais (5/50/95): {np.percentile(finais, [5, 50, 95]).round(1).tolist()}")
+
+if __name__ == "__main__":
+    main()
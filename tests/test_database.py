@@ -0,0 +1,269 @@
+import json
+import sqlite3
+
+import pytest
+
+from database import (LIMITE_PAGINA_HISTORICO, NOMES_ESTATISTICAS, TAMANHO_LOTE_CONSULTA, VERSAO_SCHEMA,
+                      Database, EscritorResultados)
+
+
+def jogador(nickname, elo=1000):
+    return {
+        'nickname': nickname,
+        'plataforma': 'PC',
+        'regiao': 'BR',
+        'estatisticas': {'elo': elo, 'kills': 0, 'deaths': 0, 'assists': 0, 'vitorias': 0, 'derrotas': 0},
+        'preferences': {}
+    }
+
+
+@pytest.fixture
+def caminho_db(tmp_path):
+    return str(tmp_path / 'matchmaking.db')
+
+
+@pytest.fixture
+def db(caminho_db):
+    banco = Database(caminho_db)
+    yield banco
+    banco.fechar()
+
+
+def test_lote_com_resultado_invalido_grava_os_demais(caminho_db):
+    db = Database(caminho_db)
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+    for i in range(10):
+        # Um set não é serializável em JSON: só esse resultado deve falhar
+        dados = {'ping': {1}} if i == 5 else {'ping': i}
+        db.registrar_resultado_partida('a', 'b', 'a', 1000 + i, 1000 - i, dados)
+    db.fechar()
+    
+    assert db.escritor_resultados.estatisticas()['resultados_com_erro'] == 1
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM partidas').fetchone()[0] == 9
+
+
+def test_resultado_que_falhou_nao_deixa_elo_no_cache(caminho_db):
+    db = Database(caminho_db)
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+    db.buscar_jogadores(['a', 'b'])
+    db.escritor_resultados.prazo = 0.5
+    db.registrar_resultado_partida('a', 'b', 'a', 1010, 990, {})
+    db.registrar_resultado_partida('a', 'b', 'a', 1020, 980, {'ping': {1}})
+    db.fechar()
+    
+    # O segundo resultado nunca chegou ao banco: cache e banco concordam no primeiro
+    assert db._elos_pendentes == {}
+    assert 'a' not in db.cache_jogadores
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute("SELECT elo FROM jogadores WHERE nickname = 'a'").fetchone()[0] == 1010
+
+
+def test_escritor_sobrevive_a_erro_no_callback_e_grava_depois_de_fechar(caminho_db):
+    db = Database(caminho_db)
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+
+    def falhar(gravados, com_erro):
+        raise RuntimeError('falha no callback')
+    
+    escritor = EscritorResultados(db.conexoes, prazo=0.01, ao_gravar=falhar)
+    resultado = {'jogador1': 'a', 'jogador2': 'b', 'vencedor': 'a',
+                 'novo_elo_j1': 1016, 'novo_elo_j2': 984, 'dados_partida': {}}
+    escritor.enfileirar(resultado)
+    escritor.descarregar()
+    assert escritor._thread.is_alive()
+    
+    escritor.fechar()
+    escritor.enfileirar(dict(resultado, novo_elo_j1=1030))
+    assert escritor.estatisticas()['resultados_gravados'] == 2
+    db.fechar()
+    
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM partidas').fetchone()[0] == 2
+        assert conn.execute("SELECT elo FROM jogadores WHERE nickname = 'a'").fetchone()[0] == 1030
+
+
+def test_leitura_antes_da_gravacao_do_lote_ve_o_novo_elo(caminho_db):
+    db = Database(caminho_db, tamanho_cache=0)
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+    db.escritor_resultados.prazo = 0.5
+    db.registrar_resultado_partida('a', 'b', 'a', 1016, 984, {})
+    
+    # Fora do cache, a leitura vai ao banco antes de o lote ser gravado
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1016
+    assert db.buscar_jogadores(['b'])['b']['estatisticas']['elo'] == 984
+    db.fechar()
+    
+    assert db._elos_pendentes == {}
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute("SELECT elo FROM jogadores WHERE nickname = 'a'").fetchone()[0] == 1016
+
+
+def test_atualizar_elo_depois_de_resultado_enfileirado_prevalece(caminho_db):
+    db = Database(caminho_db, tamanho_cache=0)
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+    db.escritor_resultados.prazo = 0.5
+    db.registrar_resultado_partida('a', 'b', 'a', 1016, 984, {})
+    db.atualizar_elo('a', 1500)
+    
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1500
+    assert db.buscar_jogador('b')['estatisticas']['elo'] == 984
+    db.fechar()
+    
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute("SELECT elo FROM jogadores WHERE nickname = 'a'").fetchone()[0] == 1500
+
+
+def test_banco_em_memoria_le_o_que_foi_escrito():
+    db = Database(':memory:')
+    db.adicionar_jogador(jogador('a', 1200))
+    db._cache_invalidar('a')
+    
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1200
+    assert list(db.buscar_jogadores(['a'])) == ['a']
+    db.fechar()
+
+
+def test_iterar_jogadores_percorre_todos_em_lotes(db):
+    db.adicionar_jogadores([jogador(f'j{i:02d}') for i in range(25)])
+    lotes = list(db.iterar_jogadores(tamanho_lote=10))
+    
+    assert [len(lote) for lote in lotes] == [10, 10, 5]
+    assert [j['nickname'] for lote in lotes for j in lote] == [f'j{i:02d}' for i in range(25)]
+
+
+def test_cache_lru_descarta_o_menos_usado(caminho_db):
+    db = Database(caminho_db, tamanho_cache=2)
+    db.adicionar_jogadores([jogador('a'), jogador('b'), jogador('c')])
+    db.buscar_jogador('a')
+    db.buscar_jogador('b')
+    db.buscar_jogador('a')
+    db.buscar_jogador('c')
+    
+    assert list(db.cache_jogadores) == ['a', 'c']
+    estatisticas = db.estatisticas_cache()
+    assert (estatisticas['hits'], estatisticas['misses']) == (1, 3)
+    db.fechar()
+
+
+def test_cache_write_through_e_copias_independentes(db):
+    db.adicionar_jogador(jogador('a'))
+    db.buscar_jogador('a')['estatisticas']['elo'] = 0
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1000
+    
+    db.atualizar_elo('a', 1300)
+    db.sair_da_fila('a')
+    assert db.cache_hits == 1
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1300
+    assert db.cache_hits == 2
+
+
+def test_escrita_durante_a_leitura_nao_deixa_linha_antiga_no_cache(db):
+    db.adicionar_jogador(jogador('a'))
+    original = db._linha_para_jogador
+
+    def ler_e_escrever(row):
+        lido = original(row)
+        # Escrita entre a leitura da linha e o preenchimento do cache
+        db.atualizar_elo('a', 1500)
+        return lido
+    
+    db._linha_para_jogador = ler_e_escrever
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1000
+    db._linha_para_jogador = original
+    
+    assert 'a' not in db.cache_jogadores
+    assert db.buscar_jogador('a')['estatisticas']['elo'] == 1500
+    assert db._reservas == {}
+
+
+def test_buscar_jogadores_em_varios_lotes_mistura_cache_e_banco(db):
+    total = 2 * TAMANHO_LOTE_CONSULTA + 7
+    nicknames = [f'j{i:04d}' for i in range(total)]
+    assert db.adicionar_jogadores([jogador(nickname, elo=1000 + i) for i, nickname in enumerate(nicknames)]) == total
+    # Já existentes são ignorados pela inserção em lote
+    assert db.adicionar_jogadores([jogador('j0000'), jogador('novo')]) == 1
+    for nickname in nicknames[::50]:
+        db.buscar_jogador(nickname)
+    
+    encontrados = db.buscar_jogadores(nicknames + ['inexistente', 'j0001'])
+    
+    assert sorted(encontrados) == nicknames
+    assert all(encontrados[nickname]['estatisticas']['elo'] == 1000 + i for i, nickname in enumerate(nicknames))
+    assert db.buscar_jogadores([]) == {}
+
+
+def test_migrar_schema_move_estatisticas_do_json_para_colunas(caminho_db):
+    # Banco na versão 0: estatísticas apenas no JSON
+    with sqlite3.connect(caminho_db) as conn:
+        conn.execute('''
+        CREATE TABLE jogadores (
+            nickname TEXT PRIMARY KEY,
+            plataforma TEXT NOT NULL,
+            regiao TEXT NOT NULL,
+            estatisticas TEXT NOT NULL,
+            preferences TEXT NOT NULL,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultimo_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            em_fila BOOLEAN DEFAULT FALSE
+        )
+        ''')
+        conn.execute(
+            'INSERT INTO jogadores (nickname, plataforma, regiao, estatisticas, preferences) '
+            'VALUES (?, ?, ?, ?, ?)',
+            ('a', 'PC', 'BR', json.dumps({'elo': 1350, 'kills': 7, 'mmr_historico': [1000.0]}), '{}')
+        )
+    
+    db = Database(caminho_db)
+    estatisticas = db.buscar_jogador('a')['estatisticas']
+    db.fechar()
+    
+    assert estatisticas['elo'] == 1350
+    assert estatisticas['kills'] == 7
+    assert estatisticas['deaths'] == 0
+    assert estatisticas['mmr_historico'] == [1000.0]
+    with sqlite3.connect(caminho_db) as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == VERSAO_SCHEMA
+        colunas = {row[1] for row in conn.execute('PRAGMA table_info(jogadores)')}
+        assert set(NOMES_ESTATISTICAS) <= colunas
+        elo, extras = conn.execute(
+            "SELECT elo, estatisticas FROM jogadores WHERE nickname = 'a'").fetchone()
+        assert elo == 1350
+        assert json.loads(extras) == {'mmr_historico': [1000.0]}
+
+
+def test_historico_paginado_percorre_todas_as_partidas_sem_repetir(db):
+    db.adicionar_jogadores([jogador('a'), jogador('b'), jogador('c')])
+    for i in range(12):
+        # 'a' aparece dos dois lados da partida
+        if i % 3 == 0:
+            db.registrar_partida('b', 'a', 'a', {'rodada': i})
+        elif i % 3 == 1:
+            db.registrar_partida('a', 'c', 'c', {'rodada': i})
+        else:
+            db.registrar_partida('b', 'c', 'b', {'rodada': i})
+    
+    rodadas = []
+    cursor_pagina = None
+    while True:
+        pagina = db.buscar_historico_paginado('a', limite=3, cursor_pagina=cursor_pagina)
+        assert len(pagina['partidas']) <= 3
+        rodadas.extend(p['dados_partida']['rodada'] for p in pagina['partidas'])
+        cursor_pagina = pagina['proximo_cursor']
+        if cursor_pagina is None:
+            break
+    
+    assert rodadas == [i for i in reversed(range(12)) if i % 3 != 2]
+
+
+def test_historico_paginado_limita_o_tamanho_da_pagina(db):
+    db.adicionar_jogadores([jogador('a'), jogador('b')])
+    for i in range(LIMITE_PAGINA_HISTORICO + 5):
+        db.registrar_partida('a', 'b', 'a', {'rodada': i})
+    
+    pagina = db.buscar_historico_paginado('b', limite=10 * LIMITE_PAGINA_HISTORICO)
+    assert len(pagina['partidas']) == LIMITE_PAGINA_HISTORICO
+    assert pagina['partidas'][0]['dados_partida']['rodada'] == LIMITE_PAGINA_HISTORICO + 4
+    
+    resto = db.buscar_historico_paginado('b', limite=0, cursor_pagina=pagina['proximo_cursor'])
+    assert [p['dados_partida']['rodada'] for p in resto['partidas']] == [4]
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from itertools import permutations
+
+from fila_matchmaking import FilaMatchmaking, parear_por_elo
+
+
+def test_fila_separa_particoes_e_busca_o_elo_mais_proximo():
+    fila = FilaMatchmaking()
+    fila.adicionar('a', 1000, 'BR', 'PC')
+    fila.adicionar('b', 1090, 'BR', 'PC')
+    fila.adicionar('c', 1040, 'BR', 'PC')
+    fila.adicionar('d', 1001, 'NA', 'PC')
+    
+    assert not fila.adicionar('a', 1500, 'BR', 'PC')
+    assert fila.mais_proximo('a') == 'c'
+    assert fila.candidatos_proximos('a', 5) == ['c', 'b']
+    assert fila.mais_proximo('d') is None
+    
+    fila.atualizar_elo('b', 1010)
+    assert fila.mais_proximo('a') == 'b'
+
+
+def test_fila_remove_expirados_pela_ordem_de_entrada():
+    fila = FilaMatchmaking()
+    agora = datetime.now()
+    fila.adicionar('a', 1000, 'BR', 'PC', entrada=agora - timedelta(seconds=90))
+    fila.adicionar('b', 1000, 'BR', 'PC', entrada=agora - timedelta(seconds=30))
+    fila.adicionar('c', 1010, 'BR', 'PC', entrada=agora - timedelta(seconds=120))
+    
+    assert fila.remover_expirados(agora - timedelta(seconds=60)) == ['c', 'a']
+    assert 'a' not in fila and 'b' in fila
+    assert fila.mais_proximo('b') is None
+
+
+def custo_minimo(elos):
+    """Menor soma de diferenças de elo por força bruta, com o máximo de pares"""
+    melhor = None
+    for ordem in permutations(range(len(elos))):
+        pares = len(elos) // 2
+        custo = sum(abs(elos[ordem[2 * i]] - elos[ordem[2 * i + 1]]) for i in range(pares))
+        melhor = custo if melhor is None else min(melhor, custo)
+    return melhor
+
+
+def test_parear_por_elo_com_menos_de_dois_jogadores():
+    assert parear_por_elo([]) == []
+    assert parear_por_elo([(1000, 'a')]) == []
+
+
+def test_parear_por_elo_pareia_vizinhos_adjacentes():
+    jogadores = [(1300, 'd'), (1000, 'a'), (1210, 'c'), (1050, 'b')]
+    assert parear_por_elo(jogadores) == [('a', 'b'), ('c', 'd')]
+
+
+def test_parear_por_elo_impar_deixa_de_fora_quem_minimiza_o_custo():
+    elos_por_nick = {'a': 1000, 'b': 1010, 'c': 1500, 'd': 1990, 'e': 2000}
+    pares = parear_por_elo([(elo, nick) for nick, elo in elos_por_nick.items()])
+    
+    assert pares == [('a', 'b'), ('d', 'e')]
+
+
+def test_parear_por_elo_custo_igual_a_forca_bruta():
+    casos = [
+        [1000, 1100, 1150, 1400, 1420],
+        [900, 1000, 1001, 1002, 1500, 1800, 1801],
+        [1200, 1200, 1200],
+        [1000, 2000, 2001, 2002, 3000, 3100],
+    ]
+    for elos in casos:
+        jogadores = [(elo, f'j{i}') for i, elo in enumerate(elos)]
+        elo_de = {nick: elo for elo, nick in jogadores}
+        pares = parear_por_elo(jogadores)
+        
+        assert len(pares) == len(elos) // 2
+        nicks = [nick for par in pares for nick in par]
+        assert len(set(nicks)) == len(nicks)
+        assert sum(abs(elo_de[a] - elo_de[b]) for a, b in pares) == custo_minimo(elos)
+
+
+def test_elegiveis_por_particao_ordena_por_elo():
+    fila = FilaMatchmaking()
+    agora = datetime.now()
+    fila.adicionar('a', 1200, 'BR', 'PC', entrada=agora - timedelta(seconds=20))
+    fila.adicionar('b', 1100, 'BR', 'PC', entrada=agora - timedelta(seconds=10))
+    fila.adicionar('c', 1000, 'BR', 'PC', entrada=agora)
+    fila.adicionar('d', 1000, 'EU', 'PS5', entrada=agora - timedelta(seconds=10))
+    
+    assert fila.elegiveis_por_particao(agora - timedelta(seconds=5)) == {
+        ('BR', 'PC'): [(1100, 'b'), (1200, 'a')],
+        ('EU', 'PS5'): [(1000, 'd')],
+    }
+
+
+def test_remover_par_so_remove_se_os_dois_estiverem_na_fila():
+    fila = FilaMatchmaking()
+    fila.adicionar('a', 1000, 'BR', 'PC')
+    fila.adicionar('b', 1010, 'BR', 'PC')
+    
+    assert not fila.remover_par('a', 'x')
+    assert 'a' in fila
+    assert fila.remover_par('a', 'b')
+    assert len(fila) == 0
+    assert not fila.remover_par('a', 'b')
+
+
+def test_fila_remove_pares_e_expirados_avisando_cada_saida():
+    removidos = []
+    fila = FilaMatchmaking(ao_remover=removidos.append)
+    agora = datetime.now()
+    fila.adicionar('a', 1000, 'BR', 'PC', entrada=agora - timedelta(seconds=90))
+    fila.adicionar('b', 1000, 'BR', 'PC', entrada=agora - timedelta(seconds=30))
+    fila.adicionar('c', 1000, 'BR', 'PC', entrada=agora)
+    
+    assert fila.remover_expirados(agora - timedelta(seconds=60)) == ['a']
+    assert not fila.remover_par('a', 'b')
+    assert fila.remover_par('b', 'c')
+    assert len(fila) == 0
+    assert removidos == ['a', 'b', 'c']
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from game import EstiloJogo, Estatisticas, Jogador, Plataforma, Regiao, SistemaMatchmaking
+from ia_matchmaking import SistemaIA
+
+
+def test_to_dict_serializa_historico_de_mmr_como_lista():
+    jogador = Jogador('a', Plataforma.PC, Regiao.BR)
+    for mmr in (1010.0, 1020.0, 1030.0):
+        jogador.aplicar_mmr_previsto(mmr)
+    
+    dados = json.loads(json.dumps(jogador.to_dict()))
+    assert dados['estatisticas']['mmr_historico'][-3:] == [1010.0, 1020.0, 1030.0]
+    
+    # A lista é uma cópia: alterá-la não muda o histórico do jogador
+    jogador.to_dict()['estatisticas']['mmr_historico'].append(0.0)
+    assert jogador.estatisticas.mmr_historico[-1] == 1030.0
+
+
+def test_estatisticas_comparam_e_exibem_campo_a_campo():
+    a = Estatisticas(kills=10, estilo_jogo=EstiloJogo.SUPORTE, mmr_historico=[1000.0, 1010.0])
+    b = Estatisticas(kills=10, estilo_jogo='Suporte', mmr_historico=[1000.0, 1010.0])
+    
+    assert a == b
+    assert repr(a) == repr(b)
+    assert 'kills=10' in repr(a) and 'mmr_historico=[1000.0, 1010.0]' in repr(a)
+    b.mmr_historico.append(1020.0)
+    assert a != b
+    assert a != Estatisticas(kills=11, estilo_jogo=EstiloJogo.SUPORTE, mmr_historico=[1000.0, 1010.0])
+
+
+def test_historico_de_partidas_e_somente_leitura_com_api_para_registrar():
+    jogador = Jogador('a', Plataforma.PC, Regiao.BR)
+    jogador.registrar_historico_partida(True, 10, 2, 3, 600, 35.5, data=datetime(2024, 1, 1, 12))
+    
+    assert jogador.historico_partidas == ({
+        'data': '2024-01-01T12:00:00', 'resultado': 'Vitória', 'kills': 10, 'deaths': 2, 'assists': 3,
+        'tempo_partida': 600, 'ping': 35.5, 'abandonou': False
+    },)
+    assert jogador.estatisticas.partidas_jogadas == 0
+    with pytest.raises(AttributeError):
+        jogador.historico_partidas.append({})
+
+
+def test_rodada_prediz_a_performance_de_todos_em_duas_chamadas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chamadas = []
+    original = SistemaIA.predizer_performance_lote
+
+    def contar(self, jogadores):
+        chamadas.append(len(jogadores))
+        return original(self, jogadores)
+    monkeypatch.setattr(SistemaIA, 'predizer_performance_lote', contar)
+    
+    sistema = SistemaMatchmaking()
+    try:
+        jogadores = [sistema.cadastrar_jogador(f'p{i}', Plataforma.PC, Regiao.BR) for i in range(8)]
+        resultados = sistema.simular_rodada([(jogadores[i], jogadores[i + 1]) for i in range(0, 8, 2)])
+    finally:
+        sistema.fechar()
+    
+    assert chamadas == [8, 8]
+    assert [r['jogador1'] for r in resultados] == ['p0', 'p2', 'p4', 'p6']
+    assert all(j.estatisticas.partidas_jogadas == 1 for j in jogadores)
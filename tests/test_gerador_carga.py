@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from gerador_carga import GeradorCarga, MetricasCarga
+
+
+def test_resumo_conta_partidas_e_percentis():
+    metricas = MetricasCarga()
+    metricas.matches = 6
+    assert 'p50_tempo_match' not in metricas.resumo()
+    
+    metricas.tempos_match = [float(i) for i in range(1, 101)]
+    resumo = metricas.resumo()
+    
+    assert resumo['partidas'] == 3
+    assert resumo['p50_tempo_match'] == pytest.approx(50.5)
+    assert resumo['p95_tempo_match'] == pytest.approx(95.05)
+    assert resumo['p99_tempo_match'] == pytest.approx(99.01)
+
+
+def test_sorteios_reproduziveis_e_dentro_da_distribuicao():
+    a = GeradorCarga('http://localhost', 10, 1, distribuicao_elo='uniforme', elo_media=1500, elo_desvio=200, seed=5)
+    b = GeradorCarga('http://localhost', 10, 1, distribuicao_elo='uniforme', elo_media=1500, elo_desvio=200, seed=5)
+    elos = [a.sortear_elo() for _ in range(500)]
+    
+    assert elos == [b.sortear_elo() for _ in range(500)]
+    assert 1300 <= min(elos) and max(elos) <= 1700
+    assert a.sortear_paciencia() is None
+    
+    impaciente = GeradorCarga('http://localhost', 10, 1, taxa_abandono=2.0, seed=5)
+    paciencias = [impaciente.sortear_paciencia() for _ in range(2000)]
+    assert min(paciencias) > 0
+    assert sum(paciencias) / len(paciencias) == pytest.approx(0.5, rel=0.1)
+
+
+def test_servidor_fora_do_ar_conta_erros_de_todos_os_clientes():
+    gerador = GeradorCarga('http://127.0.0.1:1', taxa_chegada=50, duracao=0.2, espera_final=5, seed=1)
+    resumo = asyncio.run(gerador.executar())
+    
+    assert resumo['clientes'] > 0
+    assert resumo['erros'] == resumo['clientes']
+    assert resumo['logins'] == 0 and resumo['ativos'] == 0
@@ -0,0 +1,276 @@
+import threading
+
+import numpy as np
+import pytest
+
+from database import Database
+from ia_matchmaking import (CANDIDATOS_POR_RECOMENDACAO, N_CLUSTERS, IndiceVizinhos, MatrizCaracteristicas,
+                            RegistroModelos, SistemaIA, TreinadorSegundoPlano)
+from moderacao import varrer_moderacao
+
+
+@pytest.fixture
+def sistema_ia(tmp_path, monkeypatch):
+    # Os modelos são lidos e gravados no diretório atual
+    monkeypatch.chdir(tmp_path)
+    return SistemaIA()
+
+
+JOGADORES = [
+    # Sem partidas_jogadas: vale vitórias + derrotas
+    {'nickname': 'veterano', 'estatisticas': {'vitorias': 90, 'derrotas': 10, 'kills': 900, 'deaths': 100}},
+    {'nickname': 'novato', 'estatisticas': {'vitorias': 9, 'derrotas': 1, 'kills': 90, 'deaths': 10}},
+    {'nickname': 'toxico', 'estatisticas': {'vitorias': 5, 'derrotas': 20, 'partidas_jogadas': 25,
+                                            'abandonos': 10, 'reports': 8, 'comportamento': 1}},
+    {'nickname': 'vazio', 'estatisticas': {}},
+    {'nickname': 'subindo', 'estatisticas': {'mmr': 2200, 'vitorias': 30, 'derrotas': 0, 'partidas_jogadas': 30, 'kills': 300,
+                                             'mmr_historico': [1500.0] * 11}}
+]
+
+
+def test_registro_carrega_uma_vez_e_recarregar_troca_a_instancia(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registro = RegistroModelos()
+    obtidos = []
+    threads = [threading.Thread(target=lambda: obtidos.append(registro.obter())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len({id(sistema) for sistema in obtidos}) == 1
+    assert registro.estatisticas()['carregamentos'] == 1
+    assert registro.versao == 1
+    
+    novo = registro.recarregar()
+    assert novo is not obtidos[0]
+    assert registro.obter() is novo
+    assert (registro.versao, registro.estatisticas()['carregamentos']) == (2, 2)
+
+
+def test_pontuacao_em_lote_igual_a_individual(sistema_ia):
+    resultado = sistema_ia.pontuar_populacao(sistema_ia.colunas_moderacao(JOGADORES))
+    
+    for i, jogador in enumerate(JOGADORES):
+        assert sistema_ia.detectar_smurf(jogador) == (resultado['eh_smurf'][i], resultado['prob_smurf'][i])
+        assert sistema_ia.detectar_toxicidade(jogador) == (resultado['eh_toxico'][i], resultado['prob_toxicidade'][i])
+    assert list(np.flatnonzero(resultado['eh_smurf'])) == [1, 4]
+    assert list(np.flatnonzero(resultado['eh_toxico'])) == [2]
+
+
+def test_varredura_grava_flags_de_todos_os_jogadores(sistema_ia, tmp_path):
+    db = Database(str(tmp_path / 'matchmaking.db'))
+    db.adicionar_jogadores([
+        {'nickname': f'j{i}', 'plataforma': 'PC', 'regiao': 'BR', 'preferences': {},
+         'estatisticas': {'elo': 1000, 'kills': 100 * i, 'deaths': 10, 'vitorias': 9, 'derrotas': 1}}
+        for i in range(7)
+    ])
+    totais = varrer_moderacao(db, sistema_ia, tamanho_lote=3)
+    
+    assert totais['jogadores'] == totais['gravados'] == 7
+    # Win rate de 90% e poucas partidas; K/D acima de 5 a partir de j1
+    assert totais['smurfs'] == 6
+    assert db.buscar_flags_jogador('j0')['eh_smurf'] is False
+    assert db.buscar_flags_jogador('j6')['prob_smurf'] == 0.75
+    db.fechar()
+
+
+def test_varredura_igual_a_deteccao_individual_dos_jogadores_do_banco(sistema_ia, tmp_path):
+    db = Database(str(tmp_path / 'matchmaking.db'))
+    jogadores = [dict(jogador, plataforma='PC', regiao='BR', preferences={}) for jogador in JOGADORES]
+    # Histórico só no resumo, com o buffer já sem o primeiro valor, e resumo curto demais
+    jogadores.append({'nickname': 'resumo', 'plataforma': 'PC', 'regiao': 'BR', 'preferences': {},
+                      'estatisticas': {'mmr': 2100, 'vitorias': 20, 'derrotas': 5, 'kills': 50, 'deaths': 40,
+                                       'mmr_historico': [1900.0, 2000.0], 'mmr_inicial': 1400.0,
+                                       'mmr_historico_total': 40}})
+    jogadores.append({'nickname': 'curto', 'plataforma': 'PC', 'regiao': 'BR', 'preferences': {},
+                      'estatisticas': {'mmr': 2100, 'mmr_historico': [1000.0] * 30, 'mmr_inicial': 1000.0,
+                                       'mmr_historico_total': 5}})
+    db.adicionar_jogadores(jogadores)
+    
+    totais = varrer_moderacao(db, sistema_ia, tamanho_lote=3)
+    
+    assert totais['gravados'] == len(jogadores)
+    for jogador in jogadores:
+        do_banco = db.buscar_jogador(jogador['nickname'])
+        flags = db.buscar_flags_jogador(jogador['nickname'])
+        assert sistema_ia.detectar_smurf(do_banco) == (flags['eh_smurf'], flags['prob_smurf'])
+        assert sistema_ia.detectar_toxicidade(do_banco) == (flags['eh_toxico'], flags['prob_toxicidade'])
+    # O ganho de MMR vem do histórico guardado no JSON: pela lista ou, quando existe, pelo resumo
+    assert db.buscar_flags_jogador('subindo')['prob_smurf'] == 0.75
+    assert db.buscar_flags_jogador('resumo')['prob_smurf'] == 0.25
+    assert db.buscar_flags_jogador('curto')['prob_smurf'] == 0.25
+    db.fechar()
+
+
+def test_treinador_fechar_encerra_a_thread(sistema_ia):
+    dados = [{'nickname': f'j{i}', 'estatisticas': {'mmr': 1000 + 10 * i, 'kills': i, 'deaths': 1,
+                                                    'vitorias': i, 'derrotas': 1}} for i in range(20)]
+    threads = []
+
+    def fonte_dados():
+        threads.append(threading.current_thread())
+        return dados
+    
+    treinador = TreinadorSegundoPlano(fonte_dados, sistema_ia, partidas_por_treino=1, minimo_jogadores=1)
+    
+    assert treinador.registrar_partida()
+    assert treinador.aguardar(timeout=30)
+    assert treinador.estatisticas()['treinos'] == 1
+    # A cópia da população acontece na thread do treinador, fora do caminho da partida
+    assert threads == [treinador._thread]
+    
+    treinador.fechar()
+    assert not treinador._thread.is_alive()
+    # Depois de fechado, nenhum treino novo é agendado
+    assert not treinador.registrar_partida()
+
+
+def test_kmeans_so_e_treinado_junto_com_o_modelo(sistema_ia):
+    jogadores = [{'nickname': f'j{i}', 'regiao': 'BR',
+                  'estatisticas': {'elo': 800 + 50 * i, 'kills': i, 'deaths': 1, 'vitorias': i, 'derrotas': 1}}
+                 for i in range(30)]
+    matriz = MatrizCaracteristicas(sistema_ia)
+    for jogador in jogadores:
+        matriz.adicionar(jogador)
+    
+    # Só os dados iniciais: sem KMeans, todos ficam no mesmo grupo (pareamento por elo)
+    assert sistema_ia.modelo_clustering is None
+    assert set(matriz.clusters().values()) == {0}
+    assert list(sistema_ia.agrupar_jogadores(jogadores[:2])) == [0]
+    
+    assert sistema_ia.treinar_modelo_performance(jogadores)
+    clustering = sistema_ia.modelo_clustering
+    assert clustering.n_clusters == N_CLUSTERS
+    assert len(set(matriz.clusters().values())) > 1
+    
+    # Prever poucos jogadores usa o KMeans publicado, sem treinar outro
+    matriz.clusters(['j0', 'j1'])
+    sistema_ia.agrupar_jogadores(jogadores[:2])
+    assert sistema_ia.modelo_clustering is clustering
+
+
+def populacao(n, seed, escala_kills=1):
+    rng = np.random.default_rng(seed)
+    return [{'nickname': f'j{i}', 'regiao': 'BR' if i % 2 else 'EU',
+             'estatisticas': {'elo': int(rng.integers(500, 2500)), 'kills': int(rng.integers(0, 50) * escala_kills),
+                              'deaths': int(rng.integers(1, 20)), 'vitorias': int(rng.integers(0, 30)),
+                              'derrotas': int(rng.integers(0, 30)), 'ping_medio': float(rng.uniform(10, 150))}}
+            for i in range(n)]
+
+
+def vizinhos_forca_bruta(sistema_ia, jogador, jogadores, k):
+    escala = sistema_ia.modelos.scaler.scale_
+    ponto = np.array(sistema_ia.vetor_caracteristicas(jogador))
+    outros = [j for j in jogadores if j['regiao'] == jogador['regiao'] and j['nickname'] != jogador['nickname']]
+    distancias = [np.linalg.norm((np.array(sistema_ia.vetor_caracteristicas(j)) - ponto) / escala) for j in outros]
+    return [outros[i]['nickname'] for i in np.argsort(distancias)[:k]]
+
+
+def test_indice_continua_exato_depois_da_troca_de_scaler(sistema_ia):
+    jogadores = populacao(600, seed=1)
+    sistema_ia.treinar_modelo_performance(jogadores)
+    indice = IndiceVizinhos(sistema_ia, tamanho_buffer=16)
+    indice.adicionar_lote(jogadores[:500])
+    for jogador in jogadores[500:]:
+        indice.adicionar(jogador)
+    reconstrucoes = {regiao: p.reconstrucoes for regiao, p in indice.particoes.items()}
+    
+    # Retreino com outra amostra: escala parecida, as árvores são mantidas
+    sistema_ia.treinar_modelo_performance(populacao(600, seed=2))
+    for jogador in jogadores[::37]:
+        obtidos = [j['nickname'] for j in indice.vizinhos(jogador, 8)]
+        assert obtidos == vizinhos_forca_bruta(sistema_ia, jogador, jogadores, 8)
+    assert {regiao: p.reconstrucoes for regiao, p in indice.particoes.items()} == reconstrucoes
+    
+    # Escala de kills muito diferente: a partição consultada é reconstruída
+    sistema_ia.treinar_modelo_performance(populacao(600, seed=3, escala_kills=10))
+    jogador = jogadores[0]
+    obtidos = [j['nickname'] for j in indice.vizinhos(jogador, 8)]
+    assert obtidos == vizinhos_forca_bruta(sistema_ia, jogador, jogadores, 8)
+    assert indice.particoes[jogador['regiao']].reconstrucoes == reconstrucoes[jogador['regiao']] + 1
+
+
+def test_predicao_em_lote_igual_a_individual(sistema_ia):
+    jogadores = com_perfil(populacao(80, seed=8), seed=8)
+    sistema_ia.treinar_modelo_performance(jogadores)
+    lote = jogadores[:20] + [None, {'nickname': 'sem_estatisticas'}]
+    predicoes = sistema_ia.predizer_performance_lote(lote)
+    
+    assert len(predicoes) == len(lote)
+    assert list(predicoes[:20]) == pytest.approx([sistema_ia.predizer_performance(j) for j in jogadores[:20]])
+    assert list(predicoes[20:]) == [1000.0, 1000.0]
+
+
+def test_matriz_mantem_uma_linha_por_jogador_ao_entrar_sair_e_mudar_de_elo(sistema_ia):
+    jogadores = populacao(10, seed=6)
+    matriz = MatrizCaracteristicas(sistema_ia, capacidade=4)
+    for jogador in jogadores:
+        matriz.adicionar(jogador)
+    for nickname in ('j0', 'j9', 'j4', 'inexistente'):
+        matriz.remover(nickname)
+    matriz.atualizar_elo('j5', 2400)
+    matriz.adicionar(dict(jogadores[2], estatisticas=dict(jogadores[2]['estatisticas'], kills=77)))
+    
+    restantes = {j['nickname']: j for j in jogadores if j['nickname'] not in ('j0', 'j9', 'j4')}
+    restantes['j5']['estatisticas']['elo'] = 2400
+    restantes['j2']['estatisticas']['kills'] = 77
+    assert len(matriz) == 7 and sorted(matriz.nicknames) == sorted(restantes)
+    for nickname, jogador in restantes.items():
+        esperado = np.array(sistema_ia.vetor_caracteristicas(jogador), dtype=np.float32)
+        assert np.array_equal(matriz.dados[matriz.indices[nickname]], esperado)
+    
+    # Sem KMeans treinado todos ficam no mesmo grupo; com ele, o grupo vem do predict
+    assert set(matriz.clusters().values()) == {0}
+    sistema_ia.treinar_modelo_performance(populacao(60, seed=7))
+    grupos = matriz.clusters(['j1', 'j2', 'j4'])
+    assert sorted(grupos) == ['j1', 'j2'] and set(grupos.values()) <= set(range(N_CLUSTERS))
+
+
+def com_perfil(jogadores, seed):
+    """Acrescenta os campos usados no score de compatibilidade"""
+    rng = np.random.default_rng(seed)
+    for jogador in jogadores:
+        estatisticas = jogador['estatisticas']
+        estatisticas['mmr'] = estatisticas['elo']
+        estatisticas['estilo_jogo'] = str(rng.choice(['agressivo', 'defensivo', 'suporte']))
+        estatisticas['comportamento'] = int(rng.integers(1, 6))
+    return jogadores
+
+
+def test_recomendacao_pelo_indice_igual_a_forca_bruta(sistema_ia):
+    jogadores = com_perfil(populacao(400, seed=4), seed=4)
+    sistema_ia.treinar_modelo_performance(jogadores)
+    indice = IndiceVizinhos(sistema_ia, tamanho_buffer=16)
+    indice.adicionar_lote(jogadores)
+    por_nick = {j['nickname']: j for j in jogadores}
+    k = 5 * CANDIDATOS_POR_RECOMENDACAO
+    
+    for jogador in jogadores[::41]:
+        vizinhos = [por_nick[nick] for nick in vizinhos_forca_bruta(sistema_ia, jogador, jogadores, k)]
+        esperado = sorted(((v['nickname'], sistema_ia.calcular_score_compatibilidade(jogador, v)) for v in vizinhos),
+                          key=lambda par: -par[1])[:5]
+        obtido = [(j['nickname'], score) for j, score in indice.recomendar_com_scores(jogador, 5)]
+        
+        assert [nick for nick, _ in obtido] == [nick for nick, _ in esperado]
+        assert [score for _, score in obtido] == pytest.approx([score for _, score in esperado])
+        # A API antiga monta um índice temporário e chega às mesmas recomendações
+        assert ([j['nickname'] for j in sistema_ia.recomendar_teammates(jogador, jogadores)]
+                == [nick for nick, _ in obtido])
+
+
+def test_kernel_de_compatibilidade_igual_ao_score_escalar_e_isola_candidatos_malformados(sistema_ia):
+    jogadores = com_perfil(populacao(60, seed=5), seed=5)
+    jogador, candidatos = jogadores[0], jogadores[1:]
+    
+    scores = sistema_ia.scores_compatibilidade(jogador, candidatos)
+    assert list(scores) == [sistema_ia.calcular_score_compatibilidade(jogador, c) for c in candidatos]
+    
+    sem_mmr = {'nickname': 'sem_mmr', 'regiao': 'BR', 'estatisticas': {'estilo_jogo': 'suporte', 'comportamento': 3}}
+    texto = {'nickname': 'texto', 'regiao': 'BR',
+             'estatisticas': {'mmr': 1500, 'estilo_jogo': 'suporte', 'comportamento': 'ruim'}}
+    misturados = candidatos[:10] + [sem_mmr, None, texto] + candidatos[10:]
+    
+    scores = sistema_ia.scores_compatibilidade(jogador, misturados)
+    assert list(scores) == [sistema_ia.calcular_score_compatibilidade(jogador, c) for c in misturados]
+    assert list(scores[10:13]) == [0.5, 0.0, 0.5]
@@ -0,0 +1,65 @@
+import pytest
+
+from metricas import Contador, Histograma, Medidor, Metrica, RegistroMetricas, cronometrado
+
+
+def test_metrica_base_nao_pode_ser_instanciada():
+    with pytest.raises(TypeError):
+        Metrica('base', 'Sem amostras')
+
+
+def test_renderiza_contador_e_medidor_no_formato_de_exposicao():
+    registro = RegistroMetricas()
+    partidas = registro.contador('partidas_total', 'Partidas formadas')
+    erros = registro.contador('erros_total', 'Erros', ('origem',))
+    registro.medidor('fila', 'Jogadores na fila', ('regiao',), funcao=lambda: {('BR',): 3, ('EU',): 1.5})
+    partidas.inc()
+    partidas.inc(2)
+    erros.rotulado('tick').inc()
+    erros.rotulado('lo"gin').inc()
+    
+    assert registro.renderizar().splitlines() == [
+        '# HELP partidas_total Partidas formadas',
+        '# TYPE partidas_total counter',
+        'partidas_total 3',
+        '# HELP erros_total Erros',
+        '# TYPE erros_total counter',
+        'erros_total{origem="tick"} 1',
+        'erros_total{origem="lo\\"gin"} 1',
+        '# HELP fila Jogadores na fila',
+        '# TYPE fila gauge',
+        'fila{regiao="BR"} 3',
+        'fila{regiao="EU"} 1.5',
+    ]
+
+
+def test_histograma_acumula_buckets_e_cronometrado_mede_falhas():
+    histograma = Histograma('latencia', 'Latência', ('operacao',), limites=(0.5, 1))
+    serie = histograma.rotulado('ler')
+    for valor in (0.1, 0.7, 3):
+        serie.observe(valor)
+    
+    assert histograma.amostras() == [
+        'latencia_bucket{operacao="ler",le="0.5"} 1',
+        'latencia_bucket{operacao="ler",le="1"} 2',
+        'latencia_bucket{operacao="ler",le="+Inf"} 3',
+        'latencia_sum{operacao="ler"} 3.8',
+        'latencia_count{operacao="ler"} 3',
+    ]
+
+    @cronometrado(histograma, 'falhar')
+    def falhar():
+        raise RuntimeError('erro')
+    
+    with pytest.raises(RuntimeError):
+        falhar()
+    assert histograma.rotulado('falhar').instantaneo()[0][0] == 1
+
+
+def test_registro_recusa_nomes_repetidos_e_rotulos_errados():
+    registro = RegistroMetricas()
+    registro.registrar(Medidor('ativos', 'Ativos'))
+    with pytest.raises(ValueError):
+        registro.registrar(Contador('ativos', 'De novo'))
+    with pytest.raises(ValueError):
+        Contador('erros', 'Erros', ('origem',)).rotulado('a', 'b')
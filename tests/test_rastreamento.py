@@ -0,0 +1,36 @@
+import eventlet
+
+from rastreamento import Rastreador, etapa
+
+
+def test_green_threads_concorrentes_mantem_etapas_separadas():
+    rastreador = Rastreador(limite_lento=0)
+
+    def operacao(nome, etapas):
+        with rastreador.rastrear(nome):
+            for nome_etapa in etapas:
+                with etapa(nome_etapa):
+                    eventlet.sleep(0.01)
+    
+    a = eventlet.spawn(operacao, 'A', ['a1', 'a2'])
+    b = eventlet.spawn(operacao, 'B', ['b1'])
+    a.wait()
+    b.wait()
+    
+    etapas = {rastro['operacao']: sorted(rastro['etapas']) for rastro in rastreador.operacoes_lentas()}
+    assert etapas == {'A': ['a1', 'a2'], 'B': ['b1']}
+
+
+def test_etapa_sem_rastro_ativo_nao_registra():
+    rastreador = Rastreador(limite_lento=0)
+    with etapa('solta'):
+        pass
+    assert rastreador.operacoes_lentas() == []
+
+
+def test_buffer_de_operacoes_lentas_e_circular():
+    rastreador = Rastreador(limite_lento=0, capacidade=3)
+    for i in range(5):
+        with rastreador.rastrear(f'op{i}'):
+            pass
+    assert [rastro['operacao'] for rastro in rastreador.operacoes_lentas()] == ['op4', 'op3', 'op2']
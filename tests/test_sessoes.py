@@ -0,0 +1,39 @@
+from sessoes import RegistroSessoes
+
+
+def test_registro_busca_nos_dois_sentidos():
+    sessoes = RegistroSessoes()
+    assert sessoes.registrar('s1', 'a') is None
+    assert sessoes.registrar('s2', 'b') is None
+    
+    assert sessoes.sid_de('a') == 's1'
+    assert sessoes.nickname_de('s2') == 'b'
+    assert len(sessoes) == 2
+    assert sessoes.remover_sid('s1') == 'a'
+    assert sessoes.sid_de('a') is None and sessoes.nickname_de('s1') is None
+    assert sessoes.remover_sid('s1') is None
+
+
+def test_reconexao_substitui_a_sessao_e_ignora_o_disconnect_antigo():
+    sessoes = RegistroSessoes()
+    sessoes.registrar('s1', 'a')
+    
+    assert sessoes.registrar('s2', 'a') == 's1'
+    assert sessoes.sid_de('a') == 's2'
+    assert sessoes.nickname_de('s1') is None
+    
+    # O disconnect da sessão antiga chega depois e não derruba a nova
+    assert sessoes.remover_sid('s1') is None
+    assert sessoes.sid_de('a') == 's2'
+    assert sessoes.contagens() == {'sessoes_ativas': 1, 'total_logins': 2,
+                                   'total_reconexoes': 1, 'total_desconexoes': 0}
+
+
+def test_socket_que_troca_de_nickname_libera_o_anterior():
+    sessoes = RegistroSessoes()
+    sessoes.registrar('s1', 'a')
+    sessoes.registrar('s1', 'b')
+    
+    assert sessoes.sid_de('a') is None
+    assert sessoes.sid_de('b') == 's1'
+    assert len(sessoes) == 1
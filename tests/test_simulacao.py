@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from simulacao import MAX_KILLS, MotorSimulacao, calcular_novo_elo_lote
+
+
+def novo_elo_escalar(elo_vencedor, elo_perdedor, k=32):
+    """Mesma conta de server.calcular_novo_elo (sem importar o servidor e o eventlet)"""
+    esperado_vencedor = 1 / (1 + 10 ** ((elo_perdedor - elo_vencedor) / 400))
+    return (int(elo_vencedor + k * (1 - esperado_vencedor)),
+            int(elo_perdedor + k * (0 - (1 - esperado_vencedor))))
+
+
+def test_novo_elo_em_lote_igual_ao_escalar():
+    rng = np.random.default_rng(0)
+    vencedores = rng.integers(500, 2500, 200)
+    perdedores = rng.integers(500, 2500, 200)
+    
+    novos_vencedores, novos_perdedores = calcular_novo_elo_lote(vencedores, perdedores)
+    
+    assert list(zip(novos_vencedores.tolist(), novos_perdedores.tolist())) == [
+        novo_elo_escalar(int(v), int(p)) for v, p in zip(vencedores, perdedores)
+    ]
+
+
+def test_simular_e_reproduzivel_e_decide_pelas_kills():
+    elos_j1 = np.full(1000, 1200)
+    elos_j2 = np.full(1000, 1000)
+    a = MotorSimulacao(seed=7).simular(elos_j1, elos_j2)
+    b = MotorSimulacao(seed=7).simular(elos_j1, elos_j2)
+    
+    assert all(np.array_equal(a[chave], b[chave]) for chave in a)
+    assert np.array_equal(a['vitoria_j1'], a['kills_j1'] > a['kills_j2'])
+    assert a['kills_j1'].min() >= 0 and a['kills_j1'].max() <= MAX_KILLS
+    assert np.all(np.where(a['vitoria_j1'], a['novo_elo_j1'] > 1200, a['novo_elo_j2'] > 1000))
+
+
+def test_modo_elo_favorece_o_elo_maior():
+    resultado = MotorSimulacao(seed=1, modo_vitoria='elo').simular(np.full(5000, 1600), np.full(5000, 1200))
+    # Probabilidade esperada de 1600 contra 1200: ~0.91
+    assert 0.88 < resultado['vitoria_j1'].mean() < 0.94
+
+
+def test_temporada_joga_no_maximo_uma_partida_por_rodada():
+    elos = np.random.default_rng(3).integers(800, 2000, 101)
+    temporada = MotorSimulacao(seed=3).simular_temporada(elos, rodadas=12, registrar_historico=True)
+    
+    assert temporada['partidas'].max() <= 12
+    assert temporada['partidas'].sum() == 12 * 100
+    assert temporada['vitorias'].sum() == 12 * 50
+    assert temporada['historico'].shape == (13, 101)
+    assert np.array_equal(temporada['historico'][0], elos)
+    assert np.array_equal(temporada['historico'][-1], temporada['elos'])
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        MotorSimulacao(modo_vitoria='sorte')
+    with pytest.raises(ValueError):
+        MotorSimulacao().simular(np.zeros(3), np.zeros(2))
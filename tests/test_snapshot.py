@@ -0,0 +1,51 @@
+import json
+import random
+
+import pytest
+
+from game import Jogador, Plataforma, Regiao, SistemaMatchmaking, iterar_snapshot
+
+
+def criar_sistema(quantidade: int) -> SistemaMatchmaking:
+    rng = random.Random(7)
+    sistema = SistemaMatchmaking()
+    for i in range(quantidade):
+        jogador = Jogador(f'Jogador_{i}_ção', rng.choice(list(Plataforma)), rng.choice(list(Regiao)))
+        for _ in range(i % 4):
+            jogador.adicionar_partida(rng.random() < 0.5, rng.randint(0, 20), rng.randint(0, 10),
+                                      rng.randint(0, 15), rng.randint(600, 1800), rng.uniform(20, 100),
+                                      prever_mmr=False)
+            jogador.aplicar_mmr_previsto(rng.gauss(1500, 300))
+        if i % 3 == 0:
+            jogador.preferences = {'modo_jogo': 'ranqueada', 'idioma': 'pt'}
+        sistema.jogadores[jogador.nickname] = jogador
+    return sistema
+
+
+def serializar(jogador: Jogador) -> str:
+    return json.dumps(jogador.to_dict(), sort_keys=True)
+
+
+@pytest.mark.parametrize('nivel_compressao', [None, 6])
+def test_snapshot_ida_e_volta(tmp_path, nivel_compressao):
+    origem = criar_sistema(23)
+    caminho = str(tmp_path / ('estado' if nivel_compressao is None else 'estado.npz'))
+    origem.salvar_snapshot(caminho, nivel_compressao=nivel_compressao)
+    
+    # Lotes pequenos para atravessar várias fronteiras de lote
+    carregados = list(iterar_snapshot(caminho, tamanho_lote=5))
+    
+    assert [j.nickname for j in carregados] == list(origem.jogadores)
+    for jogador in carregados:
+        original = origem.jogadores[jogador.nickname]
+        assert serializar(jogador) == serializar(original)
+        assert jogador.historico_partidas == original.historico_partidas
+    origem.fechar()
+
+
+def test_snapshot_vazio(tmp_path):
+    caminho = str(tmp_path / 'vazio.npz')
+    sistema = SistemaMatchmaking()
+    sistema.salvar_snapshot(caminho, nivel_compressao=1)
+    sistema.fechar()
+    assert list(iterar_snapshot(caminho)) == []